@@ -17,14 +17,19 @@ import re
 import json
 import time
 import traceback
+import multiprocessing
+import threading
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib import request, error
-import numpy as np
 import cv2
-import mss
 
-# Windows API 相關
-import win32con 
+# Windows API 相關 (非 Windows 環境只拿來跑重播/效能測試，熱鍵不會註冊)
+try:
+    import win32con
+    WM_HOTKEY = win32con.WM_HOTKEY
+except ImportError:
+    WM_HOTKEY = 0x0312
 
 # Windows Runtime API
 try:
@@ -33,10 +38,13 @@ try:
     from winsdk.windows.graphics.imaging import BitmapDecoder
     from winsdk.windows.storage.streams import InMemoryRandomAccessStream, DataWriter
 except ImportError:
-    from winrt.windows.media.ocr import OcrEngine
-    from winrt.windows.globalization import Language
-    from winrt.windows.graphics.imaging import BitmapDecoder
-    from winrt.windows.storage.streams import InMemoryRandomAccessStream, DataWriter
+    try:
+        from winrt.windows.media.ocr import OcrEngine
+        from winrt.windows.globalization import Language
+        from winrt.windows.graphics.imaging import BitmapDecoder
+        from winrt.windows.storage.streams import InMemoryRandomAccessStream, DataWriter
+    except ImportError:
+        OcrEngine = None
 
 # 繁簡轉換
 try:
@@ -67,7 +75,34 @@ from themes import (
     build_settings_styles,
     resolve_theme,
 )
+from frame_sources import FrameSourceExhausted, MssFrameSource, create_frame_source
+from ocr_atlas import AtlasSlot, CropAtlas, plan_atlases, render_atlas, split_atlas_result
+from ocr_backend_race import (
+    DEFAULT_BACKEND_DEADLINE_MS,
+    DEFAULT_GOOD_ENOUGH_SCORE,
+    BackendRaceStats,
+    race_backends,
+    race_backends_batch,
+)
+from ocr_backend_selector import BackendSelector
 from ocr_backends import discover_backends
+from ocr_binary_memo import BINARY_MEMO_TOLERANCE, BinaryMaskMemo
+from ocr_frame_diff import FrameChangeDetector, compute_frame_fingerprint
+from ocr_orientation import OrientationClassifier
+from ocr_line_boxes import KnownLineBoxes, accept_line_result, fit_line_boxes
+from ocr_preprocess import OCRPreprocessCache, choose_ocr_scale, estimate_text_height, rotate_for_ocr
+from ocr_regions import detect_manga_page_region, detect_text_dense_regions
+from ocr_scene_cache import SceneThresholdCache, compute_scene_signature
+from ocr_threshold_search import (
+    DEFAULT_THRESHOLD_SEARCH_STRATEGY,
+    create_threshold_search,
+    normalize_threshold_search_name,
+)
+from ocr_process_pool import DEFAULT_OCR_PROCESS_WORKERS, MAX_OCR_PROCESS_WORKERS, ProcessBackendPool, ProcessBackendProxy
+from ocr_result_cache import RESULT_CACHE_DIRNAME, RESULT_CACHE_MAX_BYTES, OCRResultCache, result_cache_key
+from ocr_script import DEFAULT_TESSERACT_LANG_MAP
+from ocr_text_gate import DEFAULT_TEXT_GATE_THRESHOLD, TextPresenceGate
+from ocr_tile_cache import DirtyTileCache
 from ocr_quality import (
     score_ocr_items as quality_score_ocr_items,
     summarize_threshold_candidate as quality_summarize_threshold_candidate,
@@ -97,12 +132,18 @@ HUD_MEMORY_LIMIT = 160
 HUD_OBSERVATION_LIMIT = 6
 PREFERRED_TEXT_MEMORY_LIMIT = 256
 API_KEY_ENV_VAR = "CLOUDHIME_GOOGLE_API_KEY"
+FRAME_SOURCE_ENV_VAR = "CLOUDHIME_FRAME_SOURCE"
 AUTO_THRESHOLD_MIN = 50
 AUTO_THRESHOLD_MAX = 250
 AUTO_THRESHOLD_CANDIDATES = (50, 70, 90, 110, 130, 150, 170, 190, 220, 250)
 AUTO_THRESHOLD_LOCAL_OFFSETS = (-10, 0, 10)
 MAX_OCR_SCALE_FACTOR = 3.0
+MAX_OCR_WORKER_COUNT = 16
+DEFAULT_OCR_WORKER_COUNT = max(1, min(4, (os.cpu_count() or 2) // 2))
 MIN_OCR_SCALE_FACTOR = 1.0
+OCR_TARGET_TEXT_HEIGHT_PX = 40
+OCR_PIXEL_BUDGET = 8_000_000
+OCR_SELECTION_SCALE_FACTOR = 1.25
 AI_IMAGE_MAX_WIDTH = 1536
 AI_TOP_CONTEXT_RATIO = 0.22
 NOISE_ONLY_PATTERN = re.compile(r'^[-_=.,|/\\:;~^]+$')
@@ -139,7 +180,6 @@ GOOGLE_BATCH_SIZE = 12
 SMART_FULLSCREEN_MAX_REGIONS = 3
 SMART_FULLSCREEN_MIN_AREA_RATIO = 0.015
 SMART_FULLSCREEN_MAX_AREA_RATIO = 0.82
-AUTO_THRESHOLD_REFRESH_INTERVAL_MS = 60 * 1000
 GEMMA_RATE_LIMIT_WINDOW_SEC = 60
 GEMMA_RATE_LIMIT_MAX_CALLS = 15
 RELIEF_BUBBLE_OPACITY = 40
@@ -188,7 +228,7 @@ class GlobalHotKeyFilter(QAbstractNativeEventFilter):
         if eventType == b"windows_generic_MSG":
             # 這裡直接用 ctypes.wintypes，不需要額外 import wintypes
             msg = ctypes.wintypes.MSG.from_address(message.__int__())
-            if msg.message == win32con.WM_HOTKEY:
+            if msg.message == WM_HOTKEY:
                 if msg.wParam == self.hotkey_id:
                     self.callback() # 觸發回呼
                     return True, 0
@@ -309,9 +349,43 @@ class OCRWorker(QObject):
         self.scan_mode = SCAN_MODE_FULLSCREEN
         self.region_render_mode = REGION_RENDER_BUBBLE
         self.scan_region = None
+        self.frame_source = MssFrameSource()
+        self.frame_source_spec = ""
         self.auto_threshold_enabled = True
-        self.last_auto_threshold_refresh_ms = 0.0
+        self.scene_threshold_cache = SceneThresholdCache()
+        self.force_threshold_refresh = False
         self.translation_registry = None
+        self.frame_change_detector = FrameChangeDetector()
+        self.tile_cache = DirtyTileCache()
+        self.preprocess_cache = OCRPreprocessCache()
+        self.binary_memo = BinaryMaskMemo()
+        self.orientation_classifier = OrientationClassifier()
+        self.text_gate = TextPresenceGate()
+        self.ocr_atlas_enabled = True
+        self.tesseract_lang_map = dict(DEFAULT_TESSERACT_LANG_MAP)
+        self.line_boxes = KnownLineBoxes()
+        self.line_recognition_enabled = True
+        self.ocr_batch_enabled = True
+        self.result_cache = OCRResultCache()
+        self.result_cache_enabled = True
+        self.result_cache_disk_enabled = False
+        self.process_pool = None
+        self.ocr_backends_in_process = []
+        self.process_pool_enabled = False
+        self.process_pool_workers = DEFAULT_OCR_PROCESS_WORKERS
+        self.atlas_calls_saved = 0
+        self.counter_lock = threading.Lock()
+        self.ocr_worker_count = DEFAULT_OCR_WORKER_COUNT
+        self.threshold_search_strategy = DEFAULT_THRESHOLD_SEARCH_STRATEGY
+        self.two_phase_threshold_enabled = True
+        self.ocr_pool = None
+        self.backend_pool = None
+        self.backend_pool_lock = threading.Lock()
+        self.backend_race_stats = BackendRaceStats()
+        self.backend_deadline_ms = DEFAULT_BACKEND_DEADLINE_MS
+        self.backend_good_enough_score = DEFAULT_GOOD_ENOUGH_SCORE
+        self.backend_selector = BackendSelector()
+        self.backend_context = None
         
         # 狀態標記
         
@@ -352,7 +426,24 @@ class OCRWorker(QObject):
             backend_chain if backend_chain is not None else self.ocr_backend_chain
         )
         self.ocr_backend_chain = chain
-        self.ocr_backends = discover_backends(chain)
+        previous_backends = list(self.ocr_backends or [])
+        # 後端實例由 ocr_backends 的登錄表共用，這裡只是決定哪些要放進辨識鏈
+        backends = discover_backends(chain)
+        self.ocr_backends = backends
+        self.apply_tesseract_lang_map()
+        backends = self.wrap_process_backends(backends)
+        self.ocr_backends = backends
+        unchanged = len(backends) == len(previous_backends) and all(
+            backend is previous for backend, previous in zip(backends, previous_backends)
+        )
+        # 後端沒換就不用清快取，但照樣印出目前可用的後端
+        if not unchanged:
+            self.shutdown_backend_pool()
+            self.backend_selector.reset()
+            self.frame_change_detector.reset()
+            self.tile_cache.clear()
+            self.binary_memo.clear()
+            self.line_boxes.clear()
         if not log:
             return
         if self.ocr_backends:
@@ -400,24 +491,82 @@ class OCRWorker(QObject):
             return None
         return provider
 
+    def score_backend_result(self, result):
+        score, filtered_items = self.score_ocr_items(self.extract_raw_items(result, 1.0, 0, 0))
+        return score if filtered_items else -1
+
+    def _race_backends(self, backends, img_np):
+        return race_backends(
+            backends,
+            img_np,
+            self.score_backend_result,
+            self.get_backend_pool(),
+            self.backend_race_stats,
+            self.backend_deadline_ms,
+            self.backend_good_enough_score,
+        )
+
     def _recognize_with_backends(self, img_np):
+        return self._recognize_with_backends_outcome(img_np)[0]
+
+    def _recognize_with_backends_outcome(self, img_np):
+        # 回傳 (結果, 是否完整)；有後端因為期限被放掉的結果只能這一次用，不能進快取
         if not self.ocr_backends:
-            return None
-        best_result = None
-        best_score = -1
-        for backend in self.ocr_backends:
-            try:
-                result = backend.recognize(img_np)
-            except Exception:
-                continue
-            if not result or not result.lines:
-                continue
-            raw_items = self.extract_raw_items(result, 1.0, 0, 0)
-            score, filtered_items = self.score_ocr_items(raw_items)
-            if score > best_score and filtered_items:
-                best_score = score
-                best_result = result
-        return best_result
+            return None, False
+        # 這個場景一直是同一個後端贏的話就只跑它，偶爾全部跑一次確認勝率
+        context = self.backend_context
+        backends, exploring = self.backend_selector.choose(context, self.ocr_backends)
+        result, timed_out = self._race_backends(backends, img_np)
+        if exploring:
+            # 被期限截斷的回合不知道誰真的比較好，不算勝場
+            if result is not None and not timed_out:
+                self.backend_selector.tally(context, result.backend_name)
+            return result, not timed_out
+        if result is None and len(backends) < len(self.ocr_backends):
+            others = [backend for backend in self.ocr_backends if backend not in backends]
+            result, timed_out = self._race_backends(others, img_np)
+            if result is not None:
+                self.backend_selector.tally_fallback(context)
+        return result, not timed_out
+
+    def _recognize_batch_with_backends(self, images):
+        # 回傳 (各張結果, 各張是否完整)
+        if not self.ocr_backends:
+            return [None] * len(images), [False] * len(images)
+        context = self.backend_context
+        backends, exploring = self.backend_selector.choose(context, self.ocr_backends)
+        results, timed_out = race_backends_batch(
+            backends,
+            images,
+            self.score_backend_result,
+            self.get_backend_pool(),
+            self.backend_race_stats,
+            self.backend_deadline_ms,
+        )
+        complete = [not timed_out] * len(images)
+        if exploring:
+            if not timed_out:
+                for result in results:
+                    if result is not None:
+                        self.backend_selector.tally(context, result.backend_name)
+            return results, complete
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing and len(backends) < len(self.ocr_backends):
+            others = [backend for backend in self.ocr_backends if backend not in backends]
+            retried, retry_timed_out = race_backends_batch(
+                others,
+                [images[index] for index in missing],
+                self.score_backend_result,
+                self.get_backend_pool(),
+                self.backend_race_stats,
+                self.backend_deadline_ms,
+            )
+            for index, result in zip(missing, retried):
+                complete[index] = not retry_timed_out
+                if result is not None:
+                    results[index] = result
+                    self.backend_selector.tally_fallback(context)
+        return results, complete
 
     def convert_to_trad(self, text):
         return translation_tools.convert_to_trad(text, self.cc)
@@ -451,10 +600,199 @@ class OCRWorker(QObject):
     def set_scan_region(self, rect):
         self.scan_region = rect if rect and rect[2] > 0 and rect[3] > 0 else None
 
+    def set_binary_memo_tolerance(self, tolerance):
+        try:
+            tolerance = float(tolerance)
+        except Exception:
+            tolerance = BINARY_MEMO_TOLERANCE
+        self.binary_memo.set_tolerance(max(0.0, min(0.05, tolerance)))
+
+    def set_text_gate_threshold(self, threshold):
+        try:
+            threshold = float(threshold)
+        except Exception:
+            threshold = DEFAULT_TEXT_GATE_THRESHOLD
+        self.text_gate.set_threshold(threshold)
+
+    def set_adaptive_backend_selection(self, enabled):
+        self.backend_selector.enabled = bool(enabled)
+
+    def apply_tesseract_lang_map(self):
+        for backend in self.ocr_backends:
+            if hasattr(backend, "set_lang_map"):
+                backend.set_lang_map(self.tesseract_lang_map)
+
+    def set_tesseract_lang_map(self, lang_map):
+        merged = dict(DEFAULT_TESSERACT_LANG_MAP)
+        if isinstance(lang_map, dict):
+            for script, lang in lang_map.items():
+                if script in merged and str(lang or "").strip():
+                    merged[script] = str(lang).strip()
+        self.tesseract_lang_map = merged
+        self.apply_tesseract_lang_map()
+        if self.process_pool is not None and merged != self.process_pool.backend_options.get("tesseract", {}).get("lang_map"):
+            self.reload_ocr_backends(log=False)
+
+    def set_process_pool_options(self, enabled, workers=DEFAULT_OCR_PROCESS_WORKERS):
+        # 下次 reload_ocr_backends 才生效
+        self.process_pool_enabled = bool(enabled)
+        try:
+            self.process_pool_workers = max(1, min(MAX_OCR_PROCESS_WORKERS, int(workers)))
+        except (TypeError, ValueError):
+            self.process_pool_workers = DEFAULT_OCR_PROCESS_WORKERS
+
+    def set_result_cache_options(self, enabled, memory_mb=RESULT_CACHE_MAX_BYTES // (1024 * 1024), use_disk=False):
+        self.result_cache_enabled = bool(enabled)
+        self.result_cache_disk_enabled = bool(use_disk)
+        try:
+            memory_mb = max(1, min(1024, int(memory_mb)))
+        except (TypeError, ValueError):
+            memory_mb = RESULT_CACHE_MAX_BYTES // (1024 * 1024)
+        self.result_cache.set_max_bytes(memory_mb * 1024 * 1024)
+        disk_dir = None
+        if self.result_cache_enabled and self.result_cache_disk_enabled:
+            disk_dir = os.path.join(os.path.dirname(SETTINGS_PATHS.appdata_file), RESULT_CACHE_DIRNAME)
+        if disk_dir != self.result_cache.disk_dir:
+            self.result_cache.set_disk_dir(disk_dir)
+        if not self.result_cache_enabled:
+            self.result_cache.clear()
+
+    def set_ocr_batch_enabled(self, enabled):
+        self.ocr_batch_enabled = bool(enabled)
+
+    def set_line_recognition_enabled(self, enabled):
+        self.line_recognition_enabled = bool(enabled)
+        if not self.line_recognition_enabled:
+            self.line_boxes.clear()
+
+    def set_ocr_atlas_enabled(self, enabled):
+        self.ocr_atlas_enabled = bool(enabled)
+
+    def set_two_phase_threshold_enabled(self, enabled):
+        self.two_phase_threshold_enabled = bool(enabled)
+
+    def set_threshold_search_strategy(self, name):
+        self.threshold_search_strategy = normalize_threshold_search_name(name)
+
+    def get_threshold_search(self):
+        return create_threshold_search(
+            self.threshold_search_strategy,
+            AUTO_THRESHOLD_MIN,
+            AUTO_THRESHOLD_MAX,
+            AUTO_THRESHOLD_CANDIDATES,
+            AUTO_THRESHOLD_LOCAL_OFFSETS,
+        )
+
+    def set_ocr_worker_count(self, count):
+        try:
+            count = int(count)
+        except Exception:
+            count = DEFAULT_OCR_WORKER_COUNT
+        count = max(1, min(MAX_OCR_WORKER_COUNT, count))
+        if count == self.ocr_worker_count and (self.ocr_pool is not None or count == 1):
+            return
+        self.ocr_worker_count = count
+        # 只換掃描用的執行緒；子行程裡的模型跟執行緒數量無關，不用重開
+        self.shutdown_ocr_pool()
+
+    def get_ocr_pool(self):
+        if self.ocr_worker_count <= 1:
+            return None
+        if self.ocr_pool is None:
+            self.ocr_pool = ThreadPoolExecutor(max_workers=self.ocr_worker_count, thread_name_prefix="cloudhime-ocr")
+        return self.ocr_pool
+
+    def get_backend_pool(self):
+        # 後端各自一條執行緒同時跑；跟掃描用的 pool 分開，免得互相等待卡死
+        if len(self.ocr_backends) <= 1:
+            return None
+        # 好幾條掃描執行緒可能同時走到這裡，建立跟替換都要在鎖裡
+        with self.backend_pool_lock:
+            if self.backend_pool is None:
+                workers = len(self.ocr_backends) * max(1, self.ocr_worker_count)
+                self.backend_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cloudhime-backend")
+            return self.backend_pool
+
+    def set_backend_race_options(self, deadline_ms=None, good_enough_score=None):
+        try:
+            self.backend_deadline_ms = max(0, int(DEFAULT_BACKEND_DEADLINE_MS if deadline_ms is None else deadline_ms))
+        except Exception:
+            self.backend_deadline_ms = DEFAULT_BACKEND_DEADLINE_MS
+        try:
+            self.backend_good_enough_score = max(0, int(DEFAULT_GOOD_ENOUGH_SCORE if good_enough_score is None else good_enough_score))
+        except Exception:
+            self.backend_good_enough_score = DEFAULT_GOOD_ENOUGH_SCORE
+
+    def shutdown_ocr_pool(self):
+        pool = self.ocr_pool
+        self.ocr_pool = None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        self.shutdown_backend_pool()
+
+    def wrap_process_backends(self, backends):
+        if not self.process_pool_enabled or not backends:
+            self.shutdown_process_pool()
+            return backends
+        names = tuple(backend.name for backend in backends)
+        options = {"tesseract": {"lang_map": dict(self.tesseract_lang_map)}}
+        pool = self.process_pool
+        if pool is not None and pool.backend_names == names and pool.backend_options == options and pool.max_workers == self.process_pool_workers:
+            # 設定沒變就沿用同一組子行程和代理物件，子行程裡已載入的模型不用重來
+            return list(self.ocr_backends_in_process)
+        self.shutdown_process_pool()
+        # 辨識搬到子行程：不跟 Qt 搶 GIL，後端當掉也只會掉一個子行程
+        self.process_pool = ProcessBackendPool(names, self.process_pool_workers, options)
+        self.ocr_backends_in_process = [ProcessBackendProxy(self.process_pool, backend) for backend in backends]
+        return list(self.ocr_backends_in_process)
+
+    def shutdown_process_pool(self):
+        pool = self.process_pool
+        self.process_pool = None
+        self.ocr_backends_in_process = []
+        if pool is not None:
+            pool.shutdown()
+
+    def shutdown_backend_pool(self):
+        with self.backend_pool_lock:
+            pool = self.backend_pool
+            self.backend_pool = None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def map_ocr_tasks(self, func, tasks):
+        self.binary_memo.begin_round()
+        pool = self.get_ocr_pool()
+        if pool is None or len(tasks) <= 1:
+            return [func(task) for task in tasks]
+        # pool.map 會照 tasks 順序回傳，後面挑最佳結果的規則跟單執行緒一樣
+        return list(pool.map(func, tasks))
+
+    def set_frame_source(self, spec=None):
+        spec = str(spec or "").strip()
+        try:
+            source = create_frame_source(spec)
+        except Exception as exc:
+            print(f"[Capture] frame source '{spec}' unavailable, falling back to screen: {exc}")
+            spec = ""
+            source = MssFrameSource()
+        previous = self.frame_source
+        self.frame_source = source
+        self.frame_source_spec = spec
+        self.frame_change_detector.reset()
+        self.tile_cache.clear()
+        if previous is not None and previous is not source:
+            previous.close()
+        if spec:
+            print(f"[Capture] Frame source: {source.describe()}")
+
     def set_auto_threshold_enabled(self, enabled):
         self.auto_threshold_enabled = bool(enabled)
         if not self.auto_threshold_enabled:
-            self.last_auto_threshold_refresh_ms = 0.0
+            self.scene_threshold_cache.clear()
+
+    def request_threshold_refresh(self):
+        self.force_threshold_refresh = True
 
     def has_multimodal_ai(self):
         return self.use_gemma_translation and bool(self.google_api_key)
@@ -711,7 +1049,8 @@ class OCRWorker(QObject):
         if not self.ocr_backends:
             return ""
         try:
-            img_for_ocr, scale_factor = self.build_ocr_image(img_np, self.binary_threshold, scale_factor=2.0)
+            scale_factor = self.choose_ocr_scale(img_np, estimate_text_height(img_np), 2.0)
+            img_for_ocr, scale_factor = self.build_ocr_image(img_np, self.binary_threshold, scale_factor=scale_factor)
             ocr_result = self._recognize_with_backends(img_for_ocr)
         except Exception:
             return ""
@@ -756,6 +1095,7 @@ class OCRWorker(QObject):
                     "w": w,
                     "h": h,
                     "confidence": confidence,
+                    "backend": getattr(ocr_result, "backend_name", None),
                 })
         if not raw_items:
             return ""
@@ -1117,251 +1457,19 @@ class OCRWorker(QObject):
         )
 
     def capture_scan_area(self):
-        with mss.mss() as sct:
-            if self.scan_mode == SCAN_MODE_REGION and self.scan_region:
-                left, top, width, height = self.scan_region
-                capture_rect = {
-                    "left": max(0, int(left)),
-                    "top": max(0, int(top)),
-                    "width": max(1, int(width)),
-                    "height": max(1, int(height)),
-                }
-            else:
-                capture_rect = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
-
-            screenshot = sct.grab(capture_rect)
-            img = np.array(screenshot)
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-            return img, capture_rect["left"], capture_rect["top"]
-
-    def clip_region_rect(self, x, y, w, h, img_w, img_h):
-        x = max(0, int(x))
-        y = max(0, int(y))
-        w = max(1, int(w))
-        h = max(1, int(h))
-        if x >= img_w or y >= img_h:
-            return None
-        w = min(w, img_w - x)
-        h = min(h, img_h - y)
-        if w <= 0 or h <= 0:
-            return None
-        return (x, y, w, h)
-
-    def expand_region_rect(self, rect, pad_x, pad_y, img_w, img_h):
-        x, y, w, h = rect
-        return self.clip_region_rect(x - pad_x, y - pad_y, w + pad_x * 2, h + pad_y * 2, img_w, img_h)
-
-    def union_region_rect(self, first, second):
-        x1 = min(first[0], second[0])
-        y1 = min(first[1], second[1])
-        x2 = max(first[0] + first[2], second[0] + second[2])
-        y2 = max(first[1] + first[3], second[1] + second[3])
-        return (x1, y1, x2 - x1, y2 - y1)
-
-    def rect_overlap_ratio(self, first, second):
-        ax1, ay1, aw, ah = first
-        bx1, by1, bw, bh = second
-        ax2, ay2 = ax1 + aw, ay1 + ah
-        bx2, by2 = bx1 + bw, by1 + bh
-        ix1 = max(ax1, bx1)
-        iy1 = max(ay1, by1)
-        ix2 = min(ax2, bx2)
-        iy2 = min(ay2, by2)
-        if ix2 <= ix1 or iy2 <= iy1:
-            return 0.0
-        inter = (ix2 - ix1) * (iy2 - iy1)
-        min_area = max(1, min(aw * ah, bw * bh))
-        return inter / min_area
-
-    def should_merge_region_rects(self, first, second):
-        if self.rect_overlap_ratio(first, second) >= 0.18:
-            return True
-        fx1, fy1, fw, fh = first
-        sx1, sy1, sw, sh = second
-        fx2, fy2 = fx1 + fw, fy1 + fh
-        sx2, sy2 = sx1 + sw, sy1 + sh
-        horizontal_gap = max(0, max(sx1 - fx2, fx1 - sx2))
-        vertical_gap = max(0, max(sy1 - fy2, fy1 - sy2))
-        avg_h = max(1, int((fh + sh) / 2))
-        if horizontal_gap <= avg_h * 2 and vertical_gap <= avg_h:
-            return True
-        if vertical_gap <= avg_h * 2 and min(fw, sw) >= avg_h * 4:
-            return True
-        return False
+        region = self.scan_region if self.scan_mode == SCAN_MODE_REGION and self.scan_region else None
+        return self.frame_source.grab(region)
 
     def detect_text_dense_regions(self, img):
-        img_h, img_w = img.shape[:2]
-        if img_h <= 0 or img_w <= 0:
-            return []
-
-        scale = 1.0
-        work = img
-        max_side = max(img_w, img_h)
-        if max_side > 1440:
-            scale = 1440.0 / max_side
-            work = cv2.resize(img, (int(img_w * scale), int(img_h * scale)), interpolation=cv2.INTER_AREA)
-
-        work_h, work_w = work.shape[:2]
-        gray = cv2.cvtColor(work, cv2.COLOR_BGR2GRAY)
-        grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
-        grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
-        gradient = cv2.convertScaleAbs(cv2.addWeighted(cv2.convertScaleAbs(grad_x), 0.7, cv2.convertScaleAbs(grad_y), 0.3, 0))
-        _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-        kernel_w = max(12, int(work_w * 0.018))
-        kernel_h = max(3, int(work_h * 0.008))
-        close_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, kernel_h))
-        morph = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, close_kernel, iterations=2)
-        morph = cv2.dilate(morph, cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, kernel_w // 3), max(2, kernel_h))), iterations=1)
-
-        contours, _ = cv2.findContours(morph, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
-            return []
-
-        min_area = max(600, int(work_w * work_h * 0.0022))
-        regions = []
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            if area < min_area:
-                continue
-            if w < max(40, int(work_w * 0.08)) or h < max(16, int(work_h * 0.025)):
-                continue
-            if h > int(work_h * 0.55):
-                continue
-
-            roi = morph[y:y + h, x:x + w]
-            density = cv2.countNonZero(roi) / max(1, area)
-            if density < 0.045:
-                continue
-
-            area_ratio = area / max(1, work_w * work_h)
-            if area_ratio > 0.88:
-                continue
-
-            center_y_ratio = (y + h / 2) / max(1, work_h)
-            edge_penalty = 0.0
-            if center_y_ratio < 0.10 or center_y_ratio > 0.93:
-                edge_penalty += 8.0
-            if x < work_w * 0.04 or (x + w) > work_w * 0.96:
-                edge_penalty += 4.0
-
-            wide_bonus = 10.0 if (w / max(1, h)) >= 3.0 else 0.0
-            dialogue_bonus = 8.0 if center_y_ratio >= 0.58 and w >= work_w * 0.28 else 0.0
-            score = (density * 140.0) + (area_ratio * 100.0) + wide_bonus + dialogue_bonus - edge_penalty
-
-            rect = (
-                int(x / scale),
-                int(y / scale),
-                max(1, int(w / scale)),
-                max(1, int(h / scale)),
-            )
-            pad_x = max(10, int(rect[2] * 0.06))
-            pad_y = max(8, int(rect[3] * 0.20))
-            expanded = self.expand_region_rect(rect, pad_x, pad_y, img_w, img_h)
-            if expanded:
-                regions.append({"rect": expanded, "score": score})
-
-        if not regions:
-            return []
-
-        regions.sort(key=lambda item: item["score"], reverse=True)
-        merged_regions = []
-        for region in regions:
-            rect = region["rect"]
-            score = region["score"]
-            merged = False
-            for existing in merged_regions:
-                if self.should_merge_region_rects(existing["rect"], rect):
-                    existing["rect"] = self.union_region_rect(existing["rect"], rect)
-                    existing["score"] = max(existing["score"], score) + min(existing["score"], score) * 0.35
-                    merged = True
-                    break
-            if not merged:
-                merged_regions.append({"rect": rect, "score": score})
-
-        refined = []
-        full_area = img_w * img_h
-        for region in merged_regions:
-            rect = self.expand_region_rect(region["rect"], 6, 6, img_w, img_h)
-            if not rect:
-                continue
-            area_ratio = (rect[2] * rect[3]) / max(1, full_area)
-            if area_ratio < SMART_FULLSCREEN_MIN_AREA_RATIO:
-                continue
-            refined.append({"rect": rect, "score": region["score"], "area_ratio": area_ratio})
-
-        if not refined:
-            return []
-
-        refined.sort(key=lambda item: (item["score"], item["rect"][2] * item["rect"][3]), reverse=True)
-        top_regions = refined[:SMART_FULLSCREEN_MAX_REGIONS]
-        total_area_ratio = sum(item["area_ratio"] for item in top_regions)
-        if total_area_ratio < SMART_FULLSCREEN_MIN_AREA_RATIO or total_area_ratio > SMART_FULLSCREEN_MAX_AREA_RATIO:
-            return []
-        return [item["rect"] for item in top_regions]
+        return detect_text_dense_regions(
+            img,
+            SMART_FULLSCREEN_MIN_AREA_RATIO,
+            SMART_FULLSCREEN_MAX_AREA_RATIO,
+            SMART_FULLSCREEN_MAX_REGIONS,
+        )
 
     def detect_manga_page_region(self, img):
-        img_h, img_w = img.shape[:2]
-        if img_h <= 0 or img_w <= 0:
-            return None
-
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        img_area = img_w * img_h
-        top_ignores = [120, 100, 80, 60, 40, 0]
-        candidates = []
-
-        for top_ignore in top_ignores:
-            if top_ignore >= img_h - 20:
-                continue
-            roi = gray[top_ignore:, :]
-            if roi.size == 0:
-                continue
-            blur = cv2.GaussianBlur(roi, (5, 5), 0)
-
-            # 漫畫頁通常是整塊偏白的頁面，先找大面積亮區，比抓細文字更穩
-            _, white_mask = cv2.threshold(blur, 220, 255, cv2.THRESH_BINARY)
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (21, 21))
-            white_mask = cv2.morphologyEx(white_mask, cv2.MORPH_CLOSE, kernel, iterations=2)
-            white_mask = cv2.dilate(white_mask, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9)), iterations=1)
-
-            contours, _ = cv2.findContours(white_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                area = w * h
-                if area < img_area * 0.05:
-                    continue
-                if area > img_area * 0.90:
-                    continue
-                aspect = w / max(1, h)
-                if aspect < 0.25 or aspect > 1.25:
-                    continue
-
-                crop = roi[y:y + h, x:x + w]
-                if crop.size == 0:
-                    continue
-                bright_ratio = float(np.mean(crop > 180))
-                if bright_ratio < 0.60:
-                    continue
-
-                page_score = (area / max(1, img_area)) * 120.0 + bright_ratio * 80.0
-                candidates.append({
-                    "rect": (x, y + top_ignore, w, h),
-                    "score": page_score,
-                })
-
-        if not candidates:
-            return None
-
-        candidates.sort(key=lambda item: item["score"], reverse=True)
-        x, y, w, h = candidates[0]["rect"]
-        pad_x = max(8, int(w * 0.015))
-        pad_y = max(8, int(h * 0.015))
-        x = max(0, x - pad_x)
-        y = max(0, y - pad_y)
-        w = min(img_w - x, w + pad_x * 2)
-        h = min(img_h - y, h + pad_y * 2)
-        return (x, y, w, h)
+        return detect_manga_page_region(img)
 
     def split_region_into_tiles(self, rect, cols=2, rows=3, overlap=0.12):
         x, y, w, h = [int(v) for v in rect]
@@ -1395,7 +1503,18 @@ class OCRWorker(QObject):
         regions = self.detect_text_dense_regions(img)
         return regions or [full_rect]
 
-    def build_ocr_image(self, img, threshold, scale_factor=3.0):
+    def choose_ocr_scale(self, crop, text_height, max_scale=MAX_OCR_SCALE_FACTOR):
+        return choose_ocr_scale(
+            crop.shape[1],
+            crop.shape[0],
+            text_height,
+            max_scale,
+            MIN_OCR_SCALE_FACTOR,
+            OCR_TARGET_TEXT_HEIGHT_PX,
+            OCR_PIXEL_BUDGET,
+        )
+
+    def build_ocr_image(self, img, threshold, scale_factor=MAX_OCR_SCALE_FACTOR):
         h, w = img.shape[:2]
         img_scaled = cv2.resize(img, (int(w * scale_factor), int(h * scale_factor)), interpolation=cv2.INTER_CUBIC)
         gray = cv2.cvtColor(img_scaled, cv2.COLOR_BGR2GRAY)
@@ -1404,12 +1523,12 @@ class OCRWorker(QObject):
         img_for_ocr = cv2.cvtColor(img_final, cv2.COLOR_GRAY2BGR)
         return img_for_ocr, scale_factor
 
+    def prepare_ocr_image(self, crop, crop_key, orientation, threshold, scale_factor=MAX_OCR_SCALE_FACTOR):
+        gray = self.preprocess_cache.scaled_gray(crop_key, crop, orientation, scale_factor)
+        return self.preprocess_cache.binarize(gray, threshold), scale_factor
+
     def rotate_crop_for_ocr(self, img, orientation):
-        if orientation == 90:
-            return cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
-        if orientation == 270:
-            return cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        return img
+        return rotate_for_ocr(img, orientation)
 
     def remap_items_from_orientation(self, items, orientation, crop_w, crop_h, offset_x, offset_y):
         if orientation == 0:
@@ -1428,6 +1547,8 @@ class OCRWorker(QObject):
                     'y': offset_y + max(0, crop_h - (x + w)),
                     'w': h,
                     'h': w,
+                    'confidence': item.get('confidence'),
+                    'backend': item.get('backend'),
                 })
             elif orientation == 270:
                 remapped.append({
@@ -1436,6 +1557,8 @@ class OCRWorker(QObject):
                     'y': offset_y + x,
                     'w': h,
                     'h': w,
+                    'confidence': item.get('confidence'),
+                    'backend': item.get('backend'),
                 })
         return remapped
 
@@ -1477,15 +1600,203 @@ class OCRWorker(QObject):
                 x_min, y_min, w, h = line_rect
                 x_max = x_min + w
                 y_max = y_min + h
+            confidence = getattr(line, "confidence", None)
+            if confidence is None and words:
+                word_confidences = [word.confidence for word in words if getattr(word, "confidence", None) is not None]
+                confidence = sum(word_confidences) / len(word_confidences) if word_confidences else None
             raw_items.append({
                 'text': line_text,
                 'x': int(x_min / scale_factor) + offset_x,
                 'y': int(y_min / scale_factor) + offset_y,
                 'w': int((x_max - x_min) / scale_factor),
                 'h': int((y_max - y_min) / scale_factor),
+                'confidence': confidence,
+                'backend': getattr(ocr_result, "backend_name", None),
             })
         return raw_items
 
+    def get_atlas_max_side(self):
+        if not self.ocr_atlas_enabled or not self.ocr_backends:
+            return 0
+        return min(int(getattr(backend, "max_atlas_side", 0) or 0) for backend in self.ocr_backends)
+
+    def batch_recognition_available(self):
+        # 拼圖或後端原生批次推論，兩者都能把多個裁切併成一次呼叫
+        if self.get_atlas_max_side() > 0:
+            return True
+        return self.ocr_batch_enabled and any(backend.supports_batch for backend in self.ocr_backends)
+
+    def recognize_crop_images(self, images):
+        # 多張小圖疊成一張送 OCR，省掉每次呼叫的固定成本；後端不支援就一張一張跑
+        # 回傳 (各張結果, 各張是否完整)；不完整的結果只給這次用
+        results = [None] * len(images)
+        complete = [False] * len(images)
+        max_side = self.get_atlas_max_side()
+        if max_side <= 0 and len(images) > 1 and self.batch_recognition_available():
+            try:
+                return self._recognize_batch_with_backends(images)
+            except Exception:
+                return results, complete
+        if max_side > 0 and len(images) > 1:
+            atlases = plan_atlases([(image.shape[1], image.shape[0]) for image in images], max_side, OCR_PIXEL_BUDGET)
+        else:
+            atlases = [CropAtlas(image.shape[1], image.shape[0], (AtlasSlot(index, 0, 0, image.shape[1], image.shape[0]),)) for index, image in enumerate(images)]
+        for atlas in atlases:
+            canvas = images[atlas.slots[0].index] if len(atlas.slots) == 1 else render_atlas(atlas, images)
+            try:
+                ocr_result, finished = self._recognize_with_backends_outcome(canvas)
+            except Exception:
+                ocr_result, finished = None, False
+            for slot in atlas.slots:
+                complete[slot.index] = finished
+            if len(atlas.slots) == 1:
+                results[atlas.slots[0].index] = ocr_result
+                continue
+            with self.counter_lock:
+                self.atlas_calls_saved += len(atlas.slots) - 1
+            for index, split_result in split_atlas_result(ocr_result, atlas).items():
+                results[index] = split_result
+        return results, complete
+
+    def ocr_crop_jobs(self, jobs):
+        return self._ocr_crop_jobs(jobs)[0]
+
+    def _ocr_crop_jobs(self, jobs):
+        # 回傳 (各個 job 的文字項目, 各個 job 是否辨識失敗)
+        ocr_results = [None] * len(jobs)
+        scales = [None] * len(jobs)
+        pending = []
+        batched = len(jobs) > 1 and self.batch_recognition_available()
+        for index, (crop, threshold, orientation, origin_x, origin_y, scale_factor) in enumerate(jobs):
+            crop_key = (origin_x, origin_y, crop.shape[1], crop.shape[0])
+            img_for_ocr, scales[index] = self.prepare_ocr_image(crop, crop_key, orientation, threshold, scale_factor)
+            # 相鄰閥值二值化出來幾乎一樣的圖，直接沿用上一次的辨識結果
+            memo_key = (crop_key, int(orientation), round(float(scales[index]), 3))
+            hit, ocr_result, fingerprint = self.binary_memo.lookup(memo_key, img_for_ocr[:, :, 0])
+            if not hit:
+                # 完全一樣的輸入圖（HUD、選單、重播的對話）不管出現在哪都直接拿快取
+                hit, ocr_result = self.lookup_result_cache(fingerprint[0])
+                if hit:
+                    self.binary_memo.remember(memo_key, fingerprint, ocr_result)
+            # 行位置依閥值分開記；只辨識已知行的結果只給這一個 job 用，不進任何快取
+            line_key = memo_key + (int(threshold),)
+            if not hit:
+                ocr_result = self.recognize_known_lines(line_key, img_for_ocr)
+                hit = ocr_result is not None
+            if hit:
+                ocr_results[index] = ocr_result
+            else:
+                # binarize 的 buffer 會被下一張蓋掉，要疊圖就先複製一份
+                pending.append((index, memo_key, line_key, fingerprint, img_for_ocr.copy() if batched else img_for_ocr))
+            if not batched and pending:
+                self._finish_crop_jobs(pending, ocr_results)
+                pending = []
+        if pending:
+            self._finish_crop_jobs(pending, ocr_results)
+
+        outputs = []
+        for (crop, _, orientation, origin_x, origin_y, _), ocr_result, scale_factor in zip(jobs, ocr_results, scales):
+            items = self.extract_raw_items(ocr_result, scale_factor, origin_x, origin_y)
+            outputs.append(self.remap_items_from_orientation(items, orientation, crop.shape[1], crop.shape[0], origin_x, origin_y))
+        failed = [ocr_result is None or bool(ocr_result.error) for ocr_result in ocr_results]
+        return outputs, failed
+
+    def _finish_crop_jobs(self, pending, ocr_results):
+        recognized, complete = self.recognize_crop_images([image for _, _, _, _, image in pending])
+        for (index, memo_key, line_key, fingerprint, _), ocr_result, finished in zip(pending, recognized, complete):
+            ocr_results[index] = ocr_result
+            self.binary_memo.remember(memo_key, fingerprint, ocr_result)
+            if finished:
+                self.remember_result_cache(fingerprint[0], ocr_result)
+            if self.line_recognition_enabled:
+                self.line_boxes.remember(line_key, ocr_result)
+
+    def result_cache_config(self):
+        # 會改變辨識結果的後端設定都放進來
+        config = {}
+        if "tesseract" in self.ocr_backend_chain:
+            config["tesseract_lang_map"] = self.tesseract_lang_map
+        return json.dumps(config, sort_keys=True)
+
+    def lookup_result_cache(self, digest):
+        if not self.result_cache_enabled:
+            return False, None
+        return self.result_cache.lookup(result_cache_key(digest, self.ocr_backend_chain, self.result_cache_config()))
+
+    def remember_result_cache(self, digest, ocr_result):
+        if self.result_cache_enabled:
+            self.result_cache.remember(result_cache_key(digest, self.ocr_backend_chain, self.result_cache_config()), ocr_result)
+
+    def recognize_known_lines(self, line_key, img_for_ocr):
+        # 同一塊區域上次已經知道每一行在哪，就只請後端辨識那幾行，省掉偵測
+        if not self.line_recognition_enabled:
+            return None
+        known = self.line_boxes.lookup(line_key)
+        if known is None:
+            return None
+        backend_name, bands = known
+        backend = next((backend for backend in self.ocr_backends if backend.name == backend_name), None)
+        if backend is None or not backend.supports_line_recognition:
+            return None
+        boxes = fit_line_boxes(img_for_ocr, bands)
+        ocr_result = None
+        if boxes is not None:
+            try:
+                ocr_result = backend.recognize_lines(img_for_ocr, boxes)
+            except Exception:
+                ocr_result = None
+        if not accept_line_result(ocr_result, len(boxes or ())):
+            self.line_boxes.record(False)
+            return None
+        self.line_boxes.record(True, len(boxes))
+        return ocr_result
+
+    def ocr_crop_items(self, crop, threshold, orientation, origin_x, origin_y, scale_factor=MAX_OCR_SCALE_FACTOR):
+        return self.ocr_crop_jobs([(crop, threshold, orientation, origin_x, origin_y, scale_factor)])[0]
+
+    def plan_region_jobs(self, crop, threshold, orientation, origin_x, origin_y, scale_factor=MAX_OCR_SCALE_FACTOR):
+        # 依字高決定放大倍率，大字不用硬放三倍，整張圖也不能超過像素預算
+        text_height = self.preprocess_cache.text_height((origin_x, origin_y, crop.shape[1], crop.shape[0]), crop)
+        scale_factor = self.choose_ocr_scale(crop, text_height, scale_factor)
+        if orientation != 0:
+            return None, [], [(crop, threshold, orientation, origin_x, origin_y, scale_factor)]
+
+        # 只重新辨識有變動的格子，沒變的格子沿用上次的結果
+        cache_key = (origin_x, origin_y, crop.shape[1], crop.shape[0], int(threshold), float(scale_factor), tuple(self.ocr_backend_chain))
+        plan = self.tile_cache.plan(cache_key, crop, origin_x, origin_y)
+        if plan.full:
+            return (cache_key, plan), [], [(crop, threshold, 0, origin_x, origin_y, scale_factor)]
+        jobs = []
+        for rect_x, rect_y, rect_w, rect_h in plan.dirty_rects:
+            sub_crop = crop[rect_y:rect_y + rect_h, rect_x:rect_x + rect_w]
+            if sub_crop.size == 0:
+                continue
+            jobs.append((sub_crop, threshold, 0, origin_x + rect_x, origin_y + rect_y, scale_factor))
+        return (cache_key, plan), list(plan.kept_items), jobs
+
+    def ocr_regions_items(self, region_specs):
+        planned = [self.plan_region_jobs(*spec) for spec in region_specs]
+        job_items, job_failed = self._ocr_crop_jobs([job for _, _, jobs in planned for job in jobs])
+        outputs = []
+        cursor = 0
+        for tile_entry, kept_items, jobs in planned:
+            items = list(kept_items)
+            for chunk in job_items[cursor:cursor + len(jobs)]:
+                items.extend(chunk)
+            failed = any(job_failed[cursor:cursor + len(jobs)])
+            cursor += len(jobs)
+            if tile_entry is not None:
+                # 有格子沒辨識成功就不能記成「這裡沒字」，下一張要整塊重跑
+                if failed:
+                    self.tile_cache.invalidate(tile_entry[0])
+                else:
+                    self.tile_cache.commit(tile_entry[0], tile_entry[1], items)
+            outputs.append(items)
+        return outputs
+
+    def ocr_region_items(self, crop, threshold, orientation, origin_x, origin_y, scale_factor=MAX_OCR_SCALE_FACTOR):
+        return self.ocr_regions_items([(crop, threshold, orientation, origin_x, origin_y, scale_factor)])[0]
+
     def score_ocr_items(self, raw_items):
         return quality_score_ocr_items(raw_items)
 
@@ -1583,52 +1894,94 @@ class OCRWorker(QObject):
         return best_threshold
 
     def run_ocr_with_best_threshold(self, img, offset_x, offset_y, ocr_regions=None, candidate_thresholds=None, orientation_candidates=None):
+        # 後端勝負整次掃描結算一次，不是每個區塊/閥值/角度各算一場
+        try:
+            return self._run_ocr_with_best_threshold(img, offset_x, offset_y, ocr_regions, candidate_thresholds, orientation_candidates)
+        finally:
+            if self.backend_context is not None:
+                self.backend_selector.finish_scan(self.backend_context)
+                self.backend_context = None
+
+    def _run_ocr_with_best_threshold(self, img, offset_x, offset_y, ocr_regions=None, candidate_thresholds=None, orientation_candidates=None):
         base_threshold = int(self.binary_threshold)
-        now_ms = time.monotonic() * 1000.0
-        should_refresh_auto_threshold = (
-            self.auto_threshold_enabled
-            and (
-                self.last_auto_threshold_refresh_ms <= 0.0
-                or (now_ms - self.last_auto_threshold_refresh_ms) >= AUTO_THRESHOLD_REFRESH_INTERVAL_MS
-            )
-        )
+        self.preprocess_cache.bind_frame(img)
+        self.binary_memo.bind_frame(img)
+        self.line_boxes.bind_frame(img)
+        self.orientation_classifier.bind_frame(img)
+        self.text_gate.bind_frame(img)
+        # 閥值跟著場景走：看過的場景直接套用當時的最佳閥值，沒看過或亮度分布飄掉了才重新搜尋
+        scene_signature = None
+        should_refresh_auto_threshold = False
+        if self.auto_threshold_enabled and not candidate_thresholds:
+            scene_signature = compute_scene_signature(img, ocr_regions)
+            known_threshold = self.scene_threshold_cache.lookup(scene_signature)
+            if known_threshold is None or self.force_threshold_refresh:
+                should_refresh_auto_threshold = True
+            else:
+                base_threshold = known_threshold
+        if self.backend_selector.enabled and len(self.ocr_backends) > 1:
+            if scene_signature is None:
+                scene_signature = compute_scene_signature(img, ocr_regions)
+            self.backend_context = self.backend_selector.context_for(self.scan_mode, scene_signature)
+            self.backend_selector.begin_scan(self.backend_context, self.ocr_backends)
+        else:
+            self.backend_context = None
 
-        def evaluate_thresholds(threshold_values, current_best_threshold, current_best_items, current_best_score):
+        def evaluate_thresholds(threshold_values, current_best_threshold, current_best_items, current_best_score, scale_factor=MAX_OCR_SCALE_FACTOR):
             candidate_results = []
             regions = ocr_regions or [(0, 0, img.shape[1], img.shape[0])]
             orientations = orientation_candidates or [0]
 
+            crops = []
+            region_orientations = []
+            for region_x, region_y, region_w, region_h in regions:
+                crop = img[region_y:region_y + region_h, region_x:region_x + region_w]
+                crops.append((crop, offset_x + region_x, offset_y + region_y))
+                if crop.size == 0:
+                    region_orientations.append([])
+                    continue
+                # 看起來完全沒有字的區塊直接跳過，不送進 OCR
+                crop_key = (region_x, region_y, crop.shape[1], crop.shape[0])
+                backend_calls = len(threshold_values) * len(orientations) * max(1, len(self.ocr_backends))
+                if not self.text_gate.allows(crop_key, crop, backend_calls):
+                    region_orientations.append([])
+                    continue
+                # 先用字的排列猜方向，有把握就只跑那個角度，沒把握才全部試
+                region_orientations.append(self.orientation_classifier.candidates_for(crop_key, crop, orientations))
+
+            def run_task_group(group):
+                specs = []
+                for threshold, region_index, orientation in group:
+                    crop, origin_x, origin_y = crops[region_index]
+                    specs.append((crop, threshold, orientation, origin_x, origin_y, scale_factor))
+                return [self.score_ocr_items(region_items) for region_items in self.ocr_regions_items(specs)]
+
+            tasks = [
+                (threshold, region_index, orientation)
+                for threshold in threshold_values
+                for region_index, (crop, _, _) in enumerate(crops)
+                if crop.size > 0
+                for orientation in region_orientations[region_index]
+            ]
+            # 後端吃得下拼圖或能批次推論時，同一個閥值的所有區塊/角度併成一次 OCR
+            if self.batch_recognition_available():
+                groups = [[task for task in tasks if task[0] == threshold] for threshold in threshold_values]
+                groups = [group for group in groups if group]
+            else:
+                groups = [[task] for task in tasks]
+            outcomes = {}
+            for group, scores in zip(groups, self.map_ocr_tasks(run_task_group, groups)):
+                outcomes.update(zip(group, scores))
+
             for threshold in threshold_values:
                 raw_items = []
-                for region_x, region_y, region_w, region_h in regions:
-                    crop = img[region_y:region_y + region_h, region_x:region_x + region_w]
+                for region_index, (crop, _, _) in enumerate(crops):
                     if crop.size == 0:
                         continue
                     crop_best_items = []
                     crop_best_score = -1
-                    crop_w, crop_h = crop.shape[1], crop.shape[0]
-                    for orientation in orientations:
-                        rotated_crop = self.rotate_crop_for_ocr(crop, orientation)
-                        img_for_ocr, scale_factor = self.build_ocr_image(rotated_crop, threshold)
-                        try:
-                            ocr_result = self._recognize_with_backends(img_for_ocr)
-                        except Exception:
-                            ocr_result = None
-                        region_items = self.extract_raw_items(
-                            ocr_result,
-                            scale_factor,
-                            offset_x + region_x,
-                            offset_y + region_y,
-                        )
-                        region_items = self.remap_items_from_orientation(
-                            region_items,
-                            orientation,
-                            crop_w,
-                            crop_h,
-                            offset_x + region_x,
-                            offset_y + region_y,
-                        )
-                        score, filtered_items = self.score_ocr_items(region_items)
+                    for orientation in region_orientations[region_index]:
+                        score, filtered_items = outcomes[(threshold, region_index, orientation)]
                         if score > crop_best_score:
                             crop_best_score = score
                             crop_best_items = filtered_items
@@ -1645,38 +1998,41 @@ class OCRWorker(QObject):
                     current_best_items = filtered_items
             return candidate_results, current_best_threshold, current_best_items, current_best_score
 
-        if candidate_thresholds:
-            candidates = [int(value) for value in candidate_thresholds if value is not None]
-        elif should_refresh_auto_threshold:
-            candidates = list(AUTO_THRESHOLD_CANDIDATES)
-        else:
-            candidates = [base_threshold]
-        candidates = sorted({max(AUTO_THRESHOLD_MIN, min(AUTO_THRESHOLD_MAX, value)) for value in candidates})
-
+        candidate_results = []
+        evaluated_scores = {}
         best_threshold = base_threshold
         best_items = []
         best_score = -1
-        candidate_results, best_threshold, best_items, best_score = evaluate_thresholds(
-            candidates,
-            best_threshold,
-            best_items,
-            best_score,
-        )
-
-        if self.auto_threshold_enabled and should_refresh_auto_threshold:
-            local_candidates = sorted({
-                max(AUTO_THRESHOLD_MIN, min(AUTO_THRESHOLD_MAX, best_threshold + offset))
-                for offset in AUTO_THRESHOLD_LOCAL_OFFSETS
-            })
-            if len(local_candidates) > 1:
-                self.status_msg.emit("🔎 局部微調閥值中...")
-                local_results, best_threshold, best_items, best_score = evaluate_thresholds(
-                    local_candidates,
+        explicit_thresholds = {int(value) for value in candidate_thresholds or [] if value is not None}
+        # 兩段式：多個閥值先用低倍率比排名，選出來的那個再用完整倍率跑一次拿最終結果
+        two_phase = self.two_phase_threshold_enabled and (should_refresh_auto_threshold or len(explicit_thresholds) > 1)
+        selection_scale = OCR_SELECTION_SCALE_FACTOR if two_phase else MAX_OCR_SCALE_FACTOR
+
+        def evaluate(threshold_values):
+            nonlocal best_threshold, best_items, best_score
+            requested = sorted({max(AUTO_THRESHOLD_MIN, min(AUTO_THRESHOLD_MAX, int(value))) for value in threshold_values})
+            pending = [value for value in requested if value not in evaluated_scores]
+            if pending:
+                results, best_threshold, best_items, best_score = evaluate_thresholds(
+                    pending,
                     best_threshold,
                     best_items,
                     best_score,
+                    selection_scale,
                 )
-                candidate_results.extend(local_results)
+                candidate_results.extend(results)
+                for result in results:
+                    evaluated_scores[result["threshold"]] = result["score"]
+            return {value: evaluated_scores[value] for value in requested}
+
+        if candidate_thresholds:
+            evaluate([value for value in candidate_thresholds if value is not None])
+        elif should_refresh_auto_threshold:
+            search = self.get_threshold_search()
+            self.status_msg.emit(f"🔎 搜尋最佳閥值中 ({search.name})...")
+            search.search(evaluate, base_threshold)
+        else:
+            evaluate([base_threshold])
 
         if self.auto_threshold_enabled and self.google_api_key:
             top_candidates = sorted(candidate_results, key=lambda item: item["score"], reverse=True)[:3]
@@ -1696,11 +2052,21 @@ class OCRWorker(QObject):
                         best_score = candidate["score"]
                         break
 
+        if two_phase and candidate_results:
+            # 完整倍率那次沒讀到字或出錯，就沿用低倍率選出來的結果，不要整次回報沒有字
+            try:
+                _, final_threshold, final_items, final_score = evaluate_thresholds([best_threshold], best_threshold, [], -1)
+            except Exception:
+                final_items = []
+            if final_items:
+                best_threshold, best_items, best_score = final_threshold, final_items, final_score
+
         if best_threshold != self.binary_threshold:
             self.binary_threshold = best_threshold
             self.threshold_suggested.emit(best_threshold)
         if should_refresh_auto_threshold:
-            self.last_auto_threshold_refresh_ms = now_ms
+            self.force_threshold_refresh = False
+            self.scene_threshold_cache.remember(scene_signature, best_threshold)
         return best_threshold, best_items
 
     def collapse_region_items(self, items):
@@ -1721,6 +2087,10 @@ class OCRWorker(QObject):
             'h': y2 - y1,
         }]
 
+    def get_frame_context_key(self):
+        region = tuple(int(v) for v in self.scan_region) if self.scan_region else None
+        return (self.scan_mode, region, tuple(self.ocr_backend_chain))
+
     def run_scan_once(self):
         is_screenshot_mode = self.scan_mode == SCAN_MODE_REGION and self.region_render_mode == REGION_RENDER_SCREENSHOT
         if not is_screenshot_mode and not self.ocr_backends:
@@ -1732,6 +2102,35 @@ class OCRWorker(QObject):
         self.hide_ui.emit()
         try:
             img, offset_x, offset_y = self.capture_scan_area()
+        except FrameSourceExhausted:
+            self.status_msg.emit("📼 重播來源已播完")
+            self.finished.emit([])
+            self.show_ui.emit()
+            return
+        except Exception:
+            self.finished.emit([])
+            self.show_ui.emit()
+            return
+
+        frame_fingerprint = None
+        frame_context_key = self.get_frame_context_key()
+        if not is_screenshot_mode:
+            try:
+                frame_fingerprint = compute_frame_fingerprint(img)
+            except Exception:
+                frame_fingerprint = None
+            if frame_fingerprint is not None and self.frame_change_detector.is_unchanged(frame_fingerprint, frame_context_key):
+                current_provider = self.get_current_ai_provider() if (self.use_gemma_translation and self.google_api_key) else "google"
+                is_upgrade_needed = self.get_translation_provider_priority(current_provider) > self.get_translation_provider_priority(self.last_provider)
+                if not is_upgrade_needed:
+                    # 畫面沒變就直接沿用上次結果，連 OCR 都不用跑
+                    skipped = self.frame_change_detector.record_skip()
+                    self.status_msg.emit(f"♻️ 畫面靜止 (已略過 {skipped} 次 OCR)")
+                    self.finished.emit(self.last_results)
+                    self.show_ui.emit()
+                    return
+
+        try:
             ai_image_parts = self.build_ai_image_parts(img)
         except Exception:
             self.finished.emit([])
@@ -1787,7 +2186,7 @@ class OCRWorker(QObject):
                     ocr_regions = [page_region]
                     ocr_orientations = [0, 90, 270]
                 else:
-                    ocr_regions = self.get_ocr_regions(img)
+                    ocr_regions = self.detect_text_dense_regions(img) or [(0, 0, img.shape[1], img.shape[0])]
             except Exception:
                 ocr_regions = None
                 ocr_orientations = [0]
@@ -1867,6 +2266,7 @@ class OCRWorker(QObject):
                     filtered_items = []
             if not filtered_items and self.scan_mode == SCAN_MODE_REGION:
                 self.status_msg.emit("框選區域沒有掃到文字，請框大一點或換個角度。")
+            self.frame_change_detector.remember(frame_fingerprint, frame_context_key)
             self.handle_empty()
             return
 
@@ -1890,6 +2290,7 @@ class OCRWorker(QObject):
 
         # 🌟 邏輯修正：畫面靜止且無翻譯升級需求時才跳過
         if current_combined_text == self.last_combined_text and not is_upgrade_needed:
+            self.frame_change_detector.remember(frame_fingerprint, frame_context_key)
             self.status_msg.emit("♻️ 畫面靜止")
             self.finished.emit(self.last_results) 
             return
@@ -1959,6 +2360,7 @@ class OCRWorker(QObject):
                 final_results.append((trans_text, item['x'], item['y'], item['w'], item['h']))
 
             self.last_results = final_results
+            self.frame_change_detector.remember(frame_fingerprint, frame_context_key)
             self.status_msg.emit("✅ 翻譯完成")
             self.finished.emit(final_results)
 
@@ -1967,6 +2369,8 @@ class OCRWorker(QObject):
             self.status_msg.emit("⚠️ 翻譯失敗")
             fallback = [(item['text'], item['x'], item['y'], item['w'], item['h']) for item in merged_items]
             self.last_results = fallback
+            # 參考畫面還是上一張成功的；不清掉的話畫面回到那張時會把這次沒翻譯的結果當成它的重播
+            self.frame_change_detector.reset()
             self.finished.emit(fallback)
 
     def handle_empty(self):
@@ -3960,6 +4364,24 @@ class Controller(QWidget):
             "is_dark_mode": self.is_dark_mode,
             "theme_mode": self.theme_mode,
             "binary_threshold": int(self.worker.binary_threshold),
+            "ocr_worker_count": int(self.worker.ocr_worker_count),
+            "threshold_search_strategy": self.worker.threshold_search_strategy,
+            "two_phase_threshold": bool(self.worker.two_phase_threshold_enabled),
+            "binary_memo_tolerance": self.worker.binary_memo.tolerance,
+            "text_gate_threshold": self.worker.text_gate.threshold,
+            "ocr_atlas": bool(self.worker.ocr_atlas_enabled),
+            "tesseract_lang_map": dict(self.worker.tesseract_lang_map),
+            "ocr_line_recognition": bool(self.worker.line_recognition_enabled),
+            "ocr_batch": bool(self.worker.ocr_batch_enabled),
+            "ocr_result_cache": bool(self.worker.result_cache_enabled),
+            "ocr_result_cache_mb": self.worker.result_cache.max_bytes // (1024 * 1024),
+            "ocr_result_cache_disk": bool(self.worker.result_cache_disk_enabled),
+            "ocr_process_pool": bool(self.worker.process_pool_enabled),
+            "ocr_process_workers": self.worker.process_pool_workers,
+            "ocr_backend_deadline_ms": self.worker.backend_deadline_ms,
+            "ocr_good_enough_score": self.worker.backend_good_enough_score,
+            "adaptive_backend_selection": bool(self.worker.backend_selector.enabled),
+            "frame_source": str(self.settings_data.get("frame_source", "") or ""),
         }
         return normalize_settings_payload(payload, int(self.region_frame_opacity))
 
@@ -3980,6 +4402,33 @@ class Controller(QWidget):
         self.update_threshold(threshold)
 
         self.worker.set_auto_threshold_enabled(True)
+        self.worker.set_ocr_worker_count(settings.get("ocr_worker_count", DEFAULT_OCR_WORKER_COUNT))
+        self.worker.set_threshold_search_strategy(settings.get("threshold_search_strategy", DEFAULT_THRESHOLD_SEARCH_STRATEGY))
+        self.worker.set_two_phase_threshold_enabled(settings.get("two_phase_threshold", True))
+        self.worker.set_binary_memo_tolerance(settings.get("binary_memo_tolerance", BINARY_MEMO_TOLERANCE))
+        self.worker.set_text_gate_threshold(settings.get("text_gate_threshold", DEFAULT_TEXT_GATE_THRESHOLD))
+        self.worker.set_ocr_atlas_enabled(settings.get("ocr_atlas", True))
+        self.worker.set_tesseract_lang_map(settings.get("tesseract_lang_map"))
+        self.worker.set_line_recognition_enabled(settings.get("ocr_line_recognition", True))
+        self.worker.set_ocr_batch_enabled(settings.get("ocr_batch", True))
+        self.worker.set_result_cache_options(
+            settings.get("ocr_result_cache", True),
+            settings.get("ocr_result_cache_mb", RESULT_CACHE_MAX_BYTES // (1024 * 1024)),
+            # 磁碟上會留下辨識到的畫面文字，使用者自己打開才寫
+            settings.get("ocr_result_cache_disk", False),
+        )
+        self.worker.set_process_pool_options(
+            settings.get("ocr_process_pool", False),
+            settings.get("ocr_process_workers", DEFAULT_OCR_PROCESS_WORKERS),
+        )
+        self.worker.set_backend_race_options(
+            settings.get("ocr_backend_deadline_ms", DEFAULT_BACKEND_DEADLINE_MS),
+            settings.get("ocr_good_enough_score", DEFAULT_GOOD_ENOUGH_SCORE),
+        )
+        self.worker.set_adaptive_backend_selection(settings.get("adaptive_backend_selection", True))
+        frame_source_spec = str(os.getenv(FRAME_SOURCE_ENV_VAR, "") or settings.get("frame_source", "") or "").strip()
+        if frame_source_spec:
+            self.worker.set_frame_source(frame_source_spec)
         backend_chain = extract_backend_chain(settings)
         if backend_chain is None:
             backend_chain = ["windows"]
@@ -4398,7 +4847,7 @@ class Controller(QWidget):
             return
         self.display_timer.stop()
         self.lbl_status.setText("⚡ 立即掃描中...")
-        self.worker.last_auto_threshold_refresh_ms = 0.0
+        self.worker.request_threshold_refresh()
         self.trigger_scan_sequence()
         self.btn_now.setEnabled(False)
         self.btn_now.setText("⚡ 充電中 0%")
@@ -4622,6 +5071,8 @@ class Controller(QWidget):
         self.cooldown_progress_timer.stop()
         self.ocr_thread.quit()
         self.ocr_thread.wait()
+        self.worker.shutdown_ocr_pool()
+        self.worker.shutdown_process_pool()
         if self.settings_window is not None:
             self.settings_window.close()
         self.region_frame.close()
@@ -4641,6 +5092,8 @@ class Controller(QWidget):
     def mouseReleaseEvent(self, event): self.old_pos = None
 
 if __name__ == "__main__":
+    # 打包成執行檔時，OCR 子行程要靠這行才不會又開一個主視窗
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     overlay = OverlayWindow()
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CloudHime  # noqa: E402
+from frame_sources import create_frame_source  # noqa: E402
+from ocr_regions import detect_manga_page_region, detect_text_dense_regions  # noqa: E402
+
+RESOLUTIONS = {"1080p": (1920, 1080), "4k": (3840, 2160)}
+
+
+# 舊版逐輪廓實作，留在這裡當對照組
+def legacy_clip_region_rect(x, y, w, h, img_w, img_h):
+    x = max(0, int(x))
+    y = max(0, int(y))
+    w = max(1, int(w))
+    h = max(1, int(h))
+    if x >= img_w or y >= img_h:
+        return None
+    w = min(w, img_w - x)
+    h = min(h, img_h - y)
+    if w <= 0 or h <= 0:
+        return None
+    return (x, y, w, h)
+
+def legacy_expand_region_rect(rect, pad_x, pad_y, img_w, img_h):
+    x, y, w, h = rect
+    return legacy_clip_region_rect(x - pad_x, y - pad_y, w + pad_x * 2, h + pad_y * 2, img_w, img_h)
+
+def legacy_union_region_rect(first, second):
+    x1 = min(first[0], second[0])
+    y1 = min(first[1], second[1])
+    x2 = max(first[0] + first[2], second[0] + second[2])
+    y2 = max(first[1] + first[3], second[1] + second[3])
+    return (x1, y1, x2 - x1, y2 - y1)
+
+def legacy_rect_overlap_ratio(first, second):
+    ax1, ay1, aw, ah = first
+    bx1, by1, bw, bh = second
+    ax2, ay2 = ax1 + aw, ay1 + ah
+    bx2, by2 = bx1 + bw, by1 + bh
+    ix1 = max(ax1, bx1)
+    iy1 = max(ay1, by1)
+    ix2 = min(ax2, bx2)
+    iy2 = min(ay2, by2)
+    if ix2 <= ix1 or iy2 <= iy1:
+        return 0.0
+    inter = (ix2 - ix1) * (iy2 - iy1)
+    min_area = max(1, min(aw * ah, bw * bh))
+    return inter / min_area
+
+def legacy_should_merge_region_rects(first, second):
+    if legacy_rect_overlap_ratio(first, second) >= 0.18:
+        return True
+    fx1, fy1, fw, fh = first
+    sx1, sy1, sw, sh = second
+    fx2, fy2 = fx1 + fw, fy1 + fh
+    sx2, sy2 = sx1 + sw, sy1 + sh
+    horizontal_gap = max(0, max(sx1 - fx2, fx1 - sx2))
+    vertical_gap = max(0, max(sy1 - fy2, fy1 - sy2))
+    avg_h = max(1, int((fh + sh) / 2))
+    if horizontal_gap <= avg_h * 2 and vertical_gap <= avg_h:
+        return True
+    if vertical_gap <= avg_h * 2 and min(fw, sw) >= avg_h * 4:
+        return True
+    return False
+
+def legacy_detect_text_dense_regions(img):
+    img_h, img_w = img.shape[:2]
+    if img_h <= 0 or img_w <= 0:
+        return []
+
+    scale = 1.0
+    work = img
+    max_side = max(img_w, img_h)
+    if max_side > 1440:
+        scale = 1440.0 / max_side
+        work = cv2.resize(img, (int(img_w * scale), int(img_h * scale)), interpolation=cv2.INTER_AREA)
+
+    work_h, work_w = work.shape[:2]
+    gray = cv2.cvtColor(work, cv2.COLOR_BGR2GRAY)
+    grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    gradient = cv2.convertScaleAbs(cv2.addWeighted(cv2.convertScaleAbs(grad_x), 0.7, cv2.convertScaleAbs(grad_y), 0.3, 0))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    kernel_w = max(12, int(work_w * 0.018))
+    kernel_h = max(3, int(work_h * 0.008))
+    close_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, kernel_h))
+    morph = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, close_kernel, iterations=2)
+    morph = cv2.dilate(morph, cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, kernel_w // 3), max(2, kernel_h))), iterations=1)
+
+    contours, _ = cv2.findContours(morph, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return []
+
+    min_area = max(600, int(work_w * work_h * 0.0022))
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        area = w * h
+        if area < min_area:
+            continue
+        if w < max(40, int(work_w * 0.08)) or h < max(16, int(work_h * 0.025)):
+            continue
+        if h > int(work_h * 0.55):
+            continue
+
+        roi = morph[y:y + h, x:x + w]
+        density = cv2.countNonZero(roi) / max(1, area)
+        if density < 0.045:
+            continue
+
+        area_ratio = area / max(1, work_w * work_h)
+        if area_ratio > 0.88:
+            continue
+
+        center_y_ratio = (y + h / 2) / max(1, work_h)
+        edge_penalty = 0.0
+        if center_y_ratio < 0.10 or center_y_ratio > 0.93:
+            edge_penalty += 8.0
+        if x < work_w * 0.04 or (x + w) > work_w * 0.96:
+            edge_penalty += 4.0
+
+        wide_bonus = 10.0 if (w / max(1, h)) >= 3.0 else 0.0
+        dialogue_bonus = 8.0 if center_y_ratio >= 0.58 and w >= work_w * 0.28 else 0.0
+        score = (density * 140.0) + (area_ratio * 100.0) + wide_bonus + dialogue_bonus - edge_penalty
+
+        rect = (
+            int(x / scale),
+            int(y / scale),
+            max(1, int(w / scale)),
+            max(1, int(h / scale)),
+        )
+        pad_x = max(10, int(rect[2] * 0.06))
+        pad_y = max(8, int(rect[3] * 0.20))
+        expanded = legacy_expand_region_rect(rect, pad_x, pad_y, img_w, img_h)
+        if expanded:
+            regions.append({"rect": expanded, "score": score})
+
+    if not regions:
+        return []
+
+    regions.sort(key=lambda item: item["score"], reverse=True)
+    merged_regions = []
+    for region in regions:
+        rect = region["rect"]
+        score = region["score"]
+        merged = False
+        for existing in merged_regions:
+            if legacy_should_merge_region_rects(existing["rect"], rect):
+                existing["rect"] = legacy_union_region_rect(existing["rect"], rect)
+                existing["score"] = max(existing["score"], score) + min(existing["score"], score) * 0.35
+                merged = True
+                break
+        if not merged:
+            merged_regions.append({"rect": rect, "score": score})
+
+    refined = []
+    full_area = img_w * img_h
+    for region in merged_regions:
+        rect = legacy_expand_region_rect(region["rect"], 6, 6, img_w, img_h)
+        if not rect:
+            continue
+        area_ratio = (rect[2] * rect[3]) / max(1, full_area)
+        if area_ratio < CloudHime.SMART_FULLSCREEN_MIN_AREA_RATIO:
+            continue
+        refined.append({"rect": rect, "score": region["score"], "area_ratio": area_ratio})
+
+    if not refined:
+        return []
+
+    refined.sort(key=lambda item: (item["score"], item["rect"][2] * item["rect"][3]), reverse=True)
+    top_regions = refined[:CloudHime.SMART_FULLSCREEN_MAX_REGIONS]
+    total_area_ratio = sum(item["area_ratio"] for item in top_regions)
+    if total_area_ratio < CloudHime.SMART_FULLSCREEN_MIN_AREA_RATIO or total_area_ratio > CloudHime.SMART_FULLSCREEN_MAX_AREA_RATIO:
+        return []
+    return [item["rect"] for item in top_regions]
+
+def legacy_detect_manga_page_region(img):
+    img_h, img_w = img.shape[:2]
+    if img_h <= 0 or img_w <= 0:
+        return None
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    img_area = img_w * img_h
+    top_ignores = [120, 100, 80, 60, 40, 0]
+    candidates = []
+
+    for top_ignore in top_ignores:
+        if top_ignore >= img_h - 20:
+            continue
+        roi = gray[top_ignore:, :]
+        if roi.size == 0:
+            continue
+        blur = cv2.GaussianBlur(roi, (5, 5), 0)
+
+        # 漫畫頁通常是整塊偏白的頁面，先找大面積亮區，比抓細文字更穩
+        _, white_mask = cv2.threshold(blur, 220, 255, cv2.THRESH_BINARY)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (21, 21))
+        white_mask = cv2.morphologyEx(white_mask, cv2.MORPH_CLOSE, kernel, iterations=2)
+        white_mask = cv2.dilate(white_mask, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9)), iterations=1)
+
+        contours, _ = cv2.findContours(white_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            area = w * h
+            if area < img_area * 0.05:
+                continue
+            if area > img_area * 0.90:
+                continue
+            aspect = w / max(1, h)
+            if aspect < 0.25 or aspect > 1.25:
+                continue
+
+            crop = roi[y:y + h, x:x + w]
+            if crop.size == 0:
+                continue
+            bright_ratio = float(np.mean(crop > 180))
+            if bright_ratio < 0.60:
+                continue
+
+            page_score = (area / max(1, img_area)) * 120.0 + bright_ratio * 80.0
+            candidates.append({
+                "rect": (x, y + top_ignore, w, h),
+                "score": page_score,
+            })
+
+    if not candidates:
+        return None
+
+    candidates.sort(key=lambda item: item["score"], reverse=True)
+    x, y, w, h = candidates[0]["rect"]
+    pad_x = max(8, int(w * 0.015))
+    pad_y = max(8, int(h * 0.015))
+    x = max(0, x - pad_x)
+    y = max(0, y - pad_y)
+    w = min(img_w - x, w + pad_x * 2)
+    h = min(img_h - y, h + pad_y * 2)
+    return (x, y, w, h)
+
+
+def synth_game_frame(width, height, seed=0):
+    rng = np.random.RandomState(seed)
+    img = cv2.resize(rng.randint(30, 120, (18, 32, 3)).astype(np.uint8), (width, height), interpolation=cv2.INTER_CUBIC)
+    unit = height / 1080.0
+    cv2.rectangle(img, (int(width * 0.06), int(height * 0.72)), (int(width * 0.94), int(height * 0.96)), (18, 18, 24), -1)
+    for row in range(3):
+        cv2.putText(
+            img,
+            "Dialogue line %d: the quick brown fox jumps over" % row,
+            (int(width * 0.09), int(height * 0.78 + row * 48 * unit)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.3 * unit,
+            (235, 235, 235),
+            max(1, int(3 * unit)),
+        )
+    for index in range(6):
+        cv2.putText(img, "HP 1%02d" % index, (int(width * 0.02), int((40 + index * 36) * unit)), cv2.FONT_HERSHEY_SIMPLEX, 0.8 * unit, (220, 220, 220), max(1, int(2 * unit)))
+    return img
+
+
+def synth_manga_frame(width, height, seed=0):
+    rng = np.random.RandomState(seed)
+    img = np.full((height, width, 3), 40, np.uint8)
+    page_w = int(height * 0.68)
+    left = (width - page_w) // 2
+    top = int(height * 0.05)
+    cv2.rectangle(img, (left, top), (left + page_w, height - 10), (250, 250, 250), -1)
+    for _ in range(40):
+        x = left + rng.randint(0, page_w - 40)
+        y = top + rng.randint(0, height - top - 60)
+        cv2.line(img, (x, y), (x + rng.randint(5, 40), y + rng.randint(5, 40)), (30, 30, 30), 2)
+    return img
+
+
+def time_call(func, img, repeat):
+    func(img)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(img)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def rect_iou(first, second):
+    if not first or not second:
+        return 1.0 if first == second else 0.0
+    ax, ay, aw, ah = first
+    bx, by, bw, bh = second
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    return inter / max(1, aw * ah + bw * bh - inter)
+
+
+def report(label, img, repeat):
+    legacy_text_time, legacy_text = time_call(legacy_detect_text_dense_regions, img, repeat)
+    text_time, text = time_call(
+        lambda frame: detect_text_dense_regions(
+            frame,
+            CloudHime.SMART_FULLSCREEN_MIN_AREA_RATIO,
+            CloudHime.SMART_FULLSCREEN_MAX_AREA_RATIO,
+            CloudHime.SMART_FULLSCREEN_MAX_REGIONS,
+        ),
+        img,
+        repeat,
+    )
+    legacy_page_time, legacy_page = time_call(legacy_detect_manga_page_region, img, repeat)
+    page_time, page = time_call(detect_manga_page_region, img, repeat)
+    print(f"[{label}] {img.shape[1]}x{img.shape[0]}")
+    print(
+        f"  text regions : legacy {legacy_text_time * 1000:7.1f} ms / vectorized {text_time * 1000:7.1f} ms "
+        f"({legacy_text_time / max(1e-9, text_time):.2f}x)  identical={legacy_text == text}"
+    )
+    print(
+        f"  manga page   : legacy {legacy_page_time * 1000:7.1f} ms / single-pass {page_time * 1000:7.1f} ms "
+        f"({legacy_page_time / max(1e-9, page_time):.2f}x)  iou={rect_iou(legacy_page, page):.3f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare legacy and vectorized OCR region detection.")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per detector")
+    parser.add_argument("--source", default="", help="optional frame source to benchmark instead of synthetic frames")
+    args = parser.parse_args(argv)
+
+    frames = []
+    if args.source:
+        source = create_frame_source(args.source)
+        try:
+            img, _, _ = source.grab()
+            frames.append(("source", img))
+        finally:
+            source.close()
+    else:
+        for name, (width, height) in RESOLUTIONS.items():
+            frames.append((f"{name} game", synth_game_frame(width, height)))
+            frames.append((f"{name} manga", synth_manga_frame(width, height)))
+
+    for label, img in frames:
+        report(label, img, max(1, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_sources import FrameSourceExhausted, create_frame_source  # noqa: E402
+from ocr_backends import TesseractBackend  # noqa: E402
+
+SAMPLE_LINES = (
+    "Press any key to continue",
+    "HP 120 / 150   MP 48 / 60",
+    "The door is locked.",
+    "Quest updated: Find the lost map",
+)
+
+
+def synthetic_crops(count):
+    crops = []
+    for index in range(count):
+        text = SAMPLE_LINES[index % len(SAMPLE_LINES)]
+        (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2)
+        crop = np.full((h + baseline + 24, w + 24, 3), 255, dtype=np.uint8)
+        cv2.putText(crop, text, (12, h + 12), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2, cv2.LINE_AA)
+        crops.append(crop)
+    return crops
+
+
+def frame_crops(spec, count, crop_height):
+    source = create_frame_source(spec)
+    crops = []
+    try:
+        while len(crops) < count:
+            img, _, _ = source.grab()
+            h = img.shape[0]
+            # 取畫面下方一條，通常是對話框
+            crops.append(np.ascontiguousarray(img[max(0, h - crop_height):h]))
+            if source.name == "image":
+                break
+    except FrameSourceExhausted:
+        pass
+    finally:
+        source.close()
+    return crops
+
+
+def run_mode(backend, crops, repeat):
+    durations = []
+    texts = []
+    for crop in crops:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = backend.recognize(crop)
+            durations.append(time.perf_counter() - started)
+        texts.append(" ".join(line.text for line in result.lines))
+    return durations, texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-call latency of the tesseract subprocess and the in-process engine.")
+    parser.add_argument("source", nargs="?", default="", help='optional frame source, e.g. "dir:frames/"; synthetic text crops otherwise')
+    parser.add_argument("--crops", type=int, default=12, help="number of crops")
+    parser.add_argument("--repeat", type=int, default=3, help="recognize calls per crop")
+    parser.add_argument("--crop-height", type=int, default=220, help="height of the bottom strip taken from each frame")
+    args = parser.parse_args(argv)
+
+    crops = frame_crops(args.source, args.crops, args.crop_height) if args.source else synthetic_crops(args.crops)
+    if not crops:
+        print("No crops loaded.")
+        return 1
+
+    subprocess_backend = TesseractBackend(persistent=False)
+    engine_backend = TesseractBackend(persistent=True)
+    if not subprocess_backend.available():
+        print("pytesseract / tesseract executable not available.")
+        return 1
+    if engine_backend.engine_mode != "engine":
+        print("tesserocr engine not available; install tesserocr to compare.")
+        return 1
+
+    started = time.perf_counter()
+    engine_backend.recognize(crops[0])
+    warmup_ms = (time.perf_counter() - started) * 1000
+    subprocess_times, subprocess_texts = run_mode(subprocess_backend, crops, args.repeat)
+    engine_times, engine_texts = run_mode(engine_backend, crops, args.repeat)
+
+    print(f"{'mode':<10} {'calls':>5} {'mean ms':>8} {'median ms':>9} {'max ms':>8}")
+    for label, times in (("subprocess", subprocess_times), ("engine", engine_times)):
+        print(
+            f"{label:<10} {len(times):>5} {statistics.mean(times) * 1000:>8.1f} "
+            f"{statistics.median(times) * 1000:>9.1f} {max(times) * 1000:>8.1f}"
+        )
+    same = sum(1 for a, b in zip(subprocess_texts, engine_texts) if a == b)
+    print(f"engine first call (language data load): {warmup_ms:.1f} ms")
+    print(f"identical text: {same}/{len(crops)}")
+    print(f"speedup: {statistics.mean(subprocess_times) / max(1e-9, statistics.mean(engine_times)):.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+import CloudHime  # noqa: E402
+from frame_sources import FrameSourceExhausted, create_frame_source  # noqa: E402
+
+
+def load_frames(spec, limit):
+    source = create_frame_source(spec)
+    frames = []
+    try:
+        while limit <= 0 or len(frames) < limit:
+            img, _, _ = source.grab()
+            frames.append(img)
+            if source.name == "image":
+                break
+    except FrameSourceExhausted:
+        pass
+    finally:
+        source.close()
+    return frames
+
+
+def build_worker(backends, two_phase, strategy):
+    worker = CloudHime.OCRWorker()
+    worker.reload_ocr_backends(backends)
+    worker.set_two_phase_threshold_enabled(two_phase)
+    worker.set_threshold_search_strategy(strategy)
+    return worker
+
+
+def run_mode(frames, backends, two_phase, strategy):
+    worker = build_worker(backends, two_phase, strategy)
+    thresholds = []
+    durations = []
+    for img in frames:
+        # 每張都強制重新搜尋閥值，比的是搜尋本身的成本
+        worker.request_threshold_refresh()
+        worker.tile_cache.clear()
+        regions = worker.get_ocr_regions(img)
+        started = time.perf_counter()
+        threshold, items = worker.run_ocr_with_best_threshold(img, 0, 0, regions, None, [0])
+        durations.append(time.perf_counter() - started)
+        thresholds.append((threshold, len(items)))
+    return thresholds, durations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare single-phase and two-phase auto-threshold selection.")
+    parser.add_argument("source", help='frame source, e.g. "dir:frames/" or "video:session.mp4@1"')
+    parser.add_argument("--frames", type=int, default=20, help="number of frames to sample (0 = all)")
+    parser.add_argument("--backends", default="windows", help="comma separated OCR backend chain")
+    parser.add_argument("--strategy", default="grid", help="threshold search strategy used by both modes")
+    args = parser.parse_args(argv)
+
+    QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print("No frames loaded.")
+        return 1
+
+    baseline, baseline_times = run_mode(frames, args.backends, False, args.strategy)
+    two_phase, two_phase_times = run_mode(frames, args.backends, True, args.strategy)
+
+    print(f"{'frame':>5} {'1-phase thr':>11} {'items':>5} {'2-phase thr':>11} {'items':>5} {'1-phase ms':>10} {'2-phase ms':>10}")
+    for index, ((thr_a, items_a), (thr_b, items_b)) in enumerate(zip(baseline, two_phase)):
+        print(
+            f"{index:>5} {thr_a:>11} {items_a:>5} {thr_b:>11} {items_b:>5} "
+            f"{baseline_times[index] * 1000:>10.1f} {two_phase_times[index] * 1000:>10.1f}"
+        )
+    same = sum(1 for a, b in zip(baseline, two_phase) if abs(a[0] - b[0]) <= 10)
+    print(f"threshold agreement (±10): {same}/{len(frames)}")
+    print(
+        f"mean latency: 1-phase {statistics.mean(baseline_times) * 1000:.1f} ms, "
+        f"2-phase {statistics.mean(two_phase_times) * 1000:.1f} ms "
+        f"({statistics.mean(baseline_times) / max(1e-9, statistics.mean(two_phase_times)):.2f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+import CloudHime  # noqa: E402
+
+
+def parse_region(text):
+    if not text:
+        return None
+    values = [int(part) for part in text.split(",")]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("region must be x,y,w,h")
+    return tuple(values)
+
+
+def disable_translation(worker):
+    worker.translate_items_with_ai_and_providers = lambda texts, image_parts: (list(texts), ["ocr"] * len(texts))
+    worker.translate_items_in_batches_with_providers = lambda texts, batch_size=8: (list(texts), ["ocr"] * len(texts))
+    worker.translate_text_preferred_with_provider = lambda text: (text, "ocr")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded frames through the CloudHime OCR/translation pipeline.")
+    parser.add_argument("source", help='frame source, e.g. "video:session.mp4@2", "dir:frames/" or "image:shot.png"')
+    parser.add_argument("--scans", type=int, default=0, help="stop after N scans (0 = until the source runs out)")
+    parser.add_argument("--backends", default="windows", help="comma separated OCR backend chain")
+    parser.add_argument("--region", type=parse_region, default=None, help="scan only x,y,w,h (region mode)")
+    parser.add_argument("--ocr-only", action="store_true", help="skip translation and measure OCR throughput only")
+    parser.add_argument("--process-workers", type=int, default=0, help="run OCR backends in N worker processes (0 = in-process)")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    worker = CloudHime.OCRWorker()
+    worker.set_process_pool_options(args.process_workers > 0, args.process_workers or 1)
+    worker.reload_ocr_backends(args.backends)
+    worker.set_frame_source(args.source)
+    if args.region:
+        worker.set_scan_region(args.region)
+        worker.set_scan_mode(CloudHime.SCAN_MODE_REGION)
+    if args.ocr_only:
+        disable_translation(worker)
+
+    statuses = []
+    results = []
+    worker.status_msg.connect(statuses.append)
+    worker.finished.connect(results.append)
+
+    durations = []
+    exhausted = False
+    while not exhausted and (args.scans <= 0 or len(durations) < args.scans):
+        status_count = len(statuses)
+        started = time.perf_counter()
+        worker.run_scan_once()
+        elapsed = time.perf_counter() - started
+        exhausted = any(msg.startswith("📼") for msg in statuses[status_count:])
+        if not exhausted:
+            durations.append(elapsed)
+            app.processEvents()
+
+    worker.frame_source.close()
+    if not durations:
+        print("No frames replayed.")
+        return 1
+
+    total = sum(durations)
+    ordered = sorted(durations)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"source        : {worker.frame_source.describe()}")
+    print(f"backends      : {', '.join(backend.name for backend in worker.ocr_backends) or '(none)'}")
+    print(f"scans         : {len(durations)}")
+    print(f"throughput    : {len(durations) / total:.2f} scans/s")
+    print(f"latency (ms)  : mean {statistics.mean(durations) * 1000:.1f} / median {statistics.median(durations) * 1000:.1f} / p95 {p95 * 1000:.1f}")
+    print(f"frame skips   : {worker.frame_change_detector.stats()}")
+    print(f"tile cache    : {worker.tile_cache.stats()}")
+    print(f"preprocess    : {worker.preprocess_cache.stats()}")
+    print(f"binary memo   : {worker.binary_memo.stats()}")
+    print(f"orientation   : {worker.orientation_classifier.stats()}")
+    print(f"text gate     : {worker.text_gate.stats()}")
+    print(f"atlas         : calls_saved={worker.atlas_calls_saved}")
+    print(f"line boxes    : {worker.line_boxes.stats()}")
+    print(f"result cache  : {worker.result_cache.stats()}")
+    if worker.process_pool is not None:
+        print(f"process pool  : {worker.process_pool.stats()}")
+    print(f"selector      : {worker.backend_selector.stats()}")
+    for name, backend_stats in worker.backend_race_stats.stats().items():
+        print(f"backend {name:<6}: {backend_stats}")
+    print(f"scene cache   : {worker.scene_threshold_cache.stats()}")
+    for backend in worker.ocr_backends:
+        if hasattr(backend, "script_router"):
+            print(f"script route  : {backend.script_router.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
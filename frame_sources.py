@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import os
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff")
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".webm", ".wmv", ".flv")
+DEFAULT_VIDEO_SAMPLE_FPS = 1.0
+
+Frame = Tuple[np.ndarray, int, int]
+Region = Optional[Sequence[int]]
+
+
+class FrameSourceExhausted(Exception):
+    pass
+
+
+class FrameSource:
+    name = "unknown"
+
+    def grab(self, region: Region = None) -> Frame:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+    def describe(self) -> str:
+        return self.name
+
+
+def crop_frame_to_region(img: np.ndarray, region: Region) -> Frame:
+    if not region:
+        return img, 0, 0
+    left, top, width, height = (int(v) for v in region)
+    img_h, img_w = img.shape[:2]
+    left = max(0, min(img_w - 1, left))
+    top = max(0, min(img_h - 1, top))
+    right = max(left + 1, min(img_w, left + max(1, width)))
+    bottom = max(top + 1, min(img_h, top + max(1, height)))
+    return img[top:bottom, left:right].copy(), left, top
+
+
+def _read_image(path: str) -> np.ndarray:
+    # cv2.imread 不吃非 ASCII 路徑，Windows 上改用 imdecode
+    data = np.fromfile(path, dtype=np.uint8)
+    img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Cannot decode image: {path}")
+    return img
+
+
+class MssFrameSource(FrameSource):
+    name = "screen"
+
+    def grab(self, region: Region = None) -> Frame:
+        import mss
+
+        with mss.mss() as sct:
+            if region:
+                left, top, width, height = region
+                capture_rect = {
+                    "left": max(0, int(left)),
+                    "top": max(0, int(top)),
+                    "width": max(1, int(width)),
+                    "height": max(1, int(height)),
+                }
+            else:
+                capture_rect = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+
+            screenshot = sct.grab(capture_rect)
+            img = np.array(screenshot)
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            return img, capture_rect["left"], capture_rect["top"]
+
+
+class ImageFileFrameSource(FrameSource):
+    name = "image"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._img = _read_image(path)
+
+    def grab(self, region: Region = None) -> Frame:
+        return crop_frame_to_region(self._img, region)
+
+    def describe(self) -> str:
+        return f"image:{self.path}"
+
+
+class ImageDirectoryFrameSource(FrameSource):
+    name = "directory"
+
+    def __init__(self, path: str, loop: bool = False):
+        self.path = path
+        self.loop = bool(loop)
+        self._files = sorted(
+            os.path.join(path, filename)
+            for filename in os.listdir(path)
+            if filename.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self._files:
+            raise ValueError(f"No images found in: {path}")
+        self._index = 0
+
+    def grab(self, region: Region = None) -> Frame:
+        if self._index >= len(self._files):
+            if not self.loop:
+                raise FrameSourceExhausted(self.path)
+            self._index = 0
+        img = _read_image(self._files[self._index])
+        self._index += 1
+        return crop_frame_to_region(img, region)
+
+    def describe(self) -> str:
+        return f"dir:{self.path}"
+
+
+class VideoFrameSource(FrameSource):
+    name = "video"
+
+    def __init__(self, path: str, sample_fps: float = DEFAULT_VIDEO_SAMPLE_FPS, loop: bool = False):
+        self.path = path
+        self.loop = bool(loop)
+        self.sample_fps = max(0.01, float(sample_fps))
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise ValueError(f"Cannot open video: {path}")
+        native_fps = float(self._capture.get(cv2.CAP_PROP_FPS) or 0.0)
+        if native_fps <= 0.0:
+            native_fps = 30.0
+        self._frame_step = max(1, int(round(native_fps / self.sample_fps)))
+        self._started = False
+
+    def _read_next(self) -> Optional[np.ndarray]:
+        # 第一張直接讀，之後每次跳過 frame_step - 1 張來達成取樣頻率
+        skip = self._frame_step - 1 if self._started else 0
+        for _ in range(skip):
+            if not self._capture.grab():
+                return None
+        ok, frame = self._capture.read()
+        self._started = True
+        return frame if ok else None
+
+    def grab(self, region: Region = None) -> Frame:
+        frame = self._read_next()
+        if frame is None and self.loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._started = False
+            frame = self._read_next()
+        if frame is None:
+            raise FrameSourceExhausted(self.path)
+        return crop_frame_to_region(frame, region)
+
+    def close(self) -> None:
+        self._capture.release()
+
+    def describe(self) -> str:
+        return f"video:{self.path}@{self.sample_fps:g}"
+
+
+def create_frame_source(spec: Optional[str] = None, loop: bool = False) -> FrameSource:
+    # spec 格式: "screen" / "image:<path>" / "dir:<path>" / "video:<path>[@fps]"，或直接給路徑自動判斷
+    spec = str(spec or "").strip()
+    if not spec or spec.lower() in {"screen", "mss"}:
+        return MssFrameSource()
+
+    kind, _, target = spec.partition(":")
+    kind = kind.lower()
+    if kind not in {"image", "dir", "video"} or not target:
+        kind, target = "", spec
+
+    if kind == "video" or (not kind and target.lower().rsplit("@", 1)[0].endswith(VIDEO_EXTENSIONS)):
+        path, sample_fps = target, DEFAULT_VIDEO_SAMPLE_FPS
+        if "@" in target:
+            head, _, tail = target.rpartition("@")
+            try:
+                path, sample_fps = head, float(tail)
+            except ValueError:
+                path = target
+        return VideoFrameSource(path, sample_fps, loop=loop)
+    if kind == "dir" or (not kind and os.path.isdir(target)):
+        return ImageDirectoryFrameSource(target, loop=loop)
+    return ImageFileFrameSource(target)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Sequence
+
+import numpy as np
+
+from ocr_backends import OCRBox, OCRResult
+
+ATLAS_GAP_PX = 48
+ATLAS_MAX_SLOTS = 16
+
+
+@dataclass(frozen=True)
+class AtlasSlot:
+    index: int
+    x: int
+    y: int
+    w: int
+    h: int
+
+
+@dataclass(frozen=True)
+class CropAtlas:
+    width: int
+    height: int
+    slots: tuple[AtlasSlot, ...]
+
+
+def plan_atlases(
+    sizes: Sequence[tuple[int, int]],
+    max_side: int,
+    max_pixels: int,
+    gap: int = ATLAS_GAP_PX,
+    max_slots: int = ATLAS_MAX_SLOTS,
+) -> list[CropAtlas]:
+    # 只往下疊不並排，上下用空白隔開，避免不同區塊的字被接成同一行
+    atlases: list[CropAtlas] = []
+    slots: list[AtlasSlot] = []
+    width = height = 0
+
+    def flush():
+        nonlocal slots, width, height
+        if slots:
+            atlases.append(CropAtlas(width, height, tuple(slots)))
+        slots, width, height = [], 0, 0
+
+    for index, (w, h) in enumerate(sizes):
+        w, h = int(w), int(h)
+        top = height + gap if slots else 0
+        next_width = max(width, w)
+        next_height = top + h
+        if slots and (
+            len(slots) >= max_slots
+            or next_height > max_side
+            or next_width > max_side
+            or next_width * next_height > max_pixels
+        ):
+            flush()
+            top, next_width, next_height = 0, w, h
+        slots.append(AtlasSlot(index, 0, top, w, h))
+        width, height = next_width, next_height
+    flush()
+    return atlases
+
+
+def border_value(image: np.ndarray) -> np.ndarray:
+    # 取外框像素的中位數當背景色；二值化後的圖只有黑白兩色，中位數就是外框佔多數的那一色
+    edges = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]], axis=0)
+    return np.median(edges, axis=0).astype(np.uint8)
+
+
+def render_atlas(atlas: CropAtlas, images: Sequence[np.ndarray]) -> np.ndarray:
+    channels = images[atlas.slots[0].index].shape[2] if images[atlas.slots[0].index].ndim == 3 else None
+    shape = (atlas.height, atlas.width, channels) if channels else (atlas.height, atlas.width)
+    canvas = np.empty(shape, dtype=np.uint8)
+    # 每格連同上下各半個間隔、右邊留白都填成自己的背景色，黑底的格子旁邊不會多出白框被當成字
+    slots = atlas.slots
+    for position, slot in enumerate(slots):
+        top = 0 if position == 0 else (slots[position - 1].y + slots[position - 1].h + slot.y) // 2
+        bottom = atlas.height if position == len(slots) - 1 else (slot.y + slot.h + slots[position + 1].y) // 2
+        canvas[top:bottom] = border_value(images[slot.index])
+        canvas[slot.y:slot.y + slot.h, slot.x:slot.x + slot.w] = images[slot.index]
+    return canvas
+
+
+def _shift_box(box: OCRBox, slot: AtlasSlot) -> OCRBox:
+    return OCRBox(box.x - slot.x, box.y - slot.y, box.w, box.h)
+
+
+def _slot_for_box(box: OCRBox, slots: Sequence[AtlasSlot]) -> AtlasSlot | None:
+    best_slot = None
+    best_overlap = 0
+    for slot in slots:
+        overlap = min(box.y + box.h, slot.y + slot.h) - max(box.y, slot.y)
+        if overlap > best_overlap:
+            best_slot = slot
+            best_overlap = overlap
+    return best_slot
+
+
+def split_atlas_result(result: OCRResult | None, atlas: CropAtlas) -> dict[int, OCRResult | None]:
+    # 每一行依垂直重疊最多的格子分回去，座標換回該格自己的原點
+    if result is None:
+        return {slot.index: None for slot in atlas.slots}
+    grouped: dict[int, list] = {slot.index: [] for slot in atlas.slots}
+    for line in result.lines:
+        slot = _slot_for_box(line.box, atlas.slots)
+        if slot is None:
+            continue
+        words = tuple(replace(word, box=_shift_box(word.box, slot)) for word in line.words)
+        grouped[slot.index].append(replace(line, box=_shift_box(line.box, slot), words=words))
+    return {
+        index: OCRResult(result.backend_name, tuple(lines), result.error)
+        for index, lines in grouped.items()
+    }
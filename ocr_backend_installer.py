@@ -65,15 +65,22 @@ def detect_backend_state(name: str) -> BackendRuntimeState:
         return BackendRuntimeState(True, True, "Built into Windows.")
     if backend_name == "tesseract":
         python_ready = _has_module("pytesseract")
-        binary_ready = shutil.which("tesseract") is not None
+        binary_ready = False
+        if python_ready:
+            try:
+                from ocr_backends import probe_tesseract_runtime
+
+                binary_ready = probe_tesseract_runtime()
+            except Exception:
+                binary_ready = False
         detail = "Ready" if python_ready and binary_ready else "Needs tesseract.exe"
         return BackendRuntimeState(python_ready and binary_ready, python_ready and binary_ready, detail)
     if backend_name == "easyocr":
         try:
-            from ocr_backends import EasyOCRBackend
+            from ocr_backends import get_backend
 
-            backend = EasyOCRBackend()
-            available = backend.available()
+            backend = get_backend("easyocr")
+            available = backend is not None and backend.available()
             if available:
                 detail = "Ready (GPU)" if backend._can_use_gpu() else "Ready (CPU)"
                 return BackendRuntimeState(available, available, detail)
@@ -91,6 +98,15 @@ def detect_backend_state(name: str) -> BackendRuntimeState:
     return BackendRuntimeState(False, False, "Unsupported")
 
 
+def _reset_backend_probe(backend_name: str) -> None:
+    try:
+        from ocr_backends import release_backends, reset_backend_probes
+    except Exception:
+        return
+    reset_backend_probes(backend_name)
+    release_backends(backend_name)
+
+
 def install_backend_packages(name: str) -> Tuple[bool, str]:
     backend_name = normalize_backend_name(name)
     spec = backend_spec(backend_name)
@@ -106,6 +122,7 @@ def install_backend_packages(name: str) -> Tuple[bool, str]:
             return False, output or f"{spec.label} install failed."
         if output:
             messages.append(output)
+    _reset_backend_probe(backend_name)
 
     if backend_name == "tesseract":
         state = detect_backend_state(backend_name)
@@ -115,6 +132,7 @@ def install_backend_packages(name: str) -> Tuple[bool, str]:
                 return False, runtime_output
             if runtime_output:
                 messages.append(runtime_output)
+            _reset_backend_probe(backend_name)
             state = detect_backend_state(backend_name)
             if not state.available:
                 note = spec.install_note or "Requires tesseract.exe."
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Optional, Sequence
+
+from ocr_backends import OCRBackend, OCRResult
+
+DEFAULT_BACKEND_DEADLINE_MS = 4000
+DEFAULT_GOOD_ENOUGH_SCORE = 0
+
+ResultScorer = Callable[[OCRResult], int]
+
+
+class BackendRaceStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backends: dict[str, dict[str, float]] = {}
+
+    def _entry(self, name: str) -> dict[str, float]:
+        entry = self._backends.get(name)
+        if entry is None:
+            entry = {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "wins": 0, "ignored": 0}
+            self._backends[name] = entry
+        return entry
+
+    def record_call(self, name: str, elapsed_ms: float, ok: bool) -> None:
+        with self._lock:
+            entry = self._entry(name)
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            if not ok:
+                entry["errors"] += 1
+
+    def record_win(self, name: str) -> None:
+        with self._lock:
+            self._entry(name)["wins"] += 1
+
+    def record_ignored(self, name: str) -> None:
+        with self._lock:
+            self._entry(name)["ignored"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._backends.clear()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": int(entry["calls"]),
+                    "errors": int(entry["errors"]),
+                    "mean_ms": entry["total_ms"] / max(1, entry["calls"]),
+                    "max_ms": entry["max_ms"],
+                    "wins": int(entry["wins"]),
+                    "ignored": int(entry["ignored"]),
+                }
+                for name, entry in self._backends.items()
+            }
+
+
+def timed_recognize(backend: OCRBackend, image, stats: BackendRaceStats) -> Optional[OCRResult]:
+    started = time.perf_counter()
+    try:
+        result = backend.recognize(image)
+    except Exception:
+        stats.record_call(backend.name, (time.perf_counter() - started) * 1000.0, False)
+        return None
+    stats.record_call(backend.name, (time.perf_counter() - started) * 1000.0, not getattr(result, "error", ""))
+    return result
+
+
+def _submit_all(executor: Optional[Executor], fn, backends: Sequence[OCRBackend], payload, stats: BackendRaceStats):
+    # pool 被 reload 關掉時 submit 會丟 RuntimeError，這時改成逐一呼叫，不要讓整輪掃描失敗
+    if executor is None or len(backends) <= 1:
+        return None
+    futures: dict[Future, tuple[int, OCRBackend]] = {}
+    try:
+        for rank, backend in enumerate(backends):
+            futures[executor.submit(fn, backend, payload, stats)] = (rank, backend)
+    except RuntimeError:
+        for future in futures:
+            future.cancel()
+        return None
+    return futures
+
+
+def race_backends(
+    backends: Sequence[OCRBackend],
+    image,
+    score_result: ResultScorer,
+    executor: Optional[Executor],
+    stats: BackendRaceStats,
+    deadline_ms: int = DEFAULT_BACKEND_DEADLINE_MS,
+    good_enough_score: int = DEFAULT_GOOD_ENOUGH_SCORE,
+) -> tuple[Optional[OCRResult], bool]:
+    # 多個後端同時跑：夠好的結果先回來就直接用，過了期限就拿目前最好的，慢的不等
+    # 回傳 (結果, 是否因為期限放掉了還沒跑完的後端)
+    timed_out = False
+    best_result = None
+    best_score = -1
+    best_rank = len(backends)
+    best_name = ""
+
+    def consider(rank: int, backend: OCRBackend, result: Optional[OCRResult]) -> None:
+        nonlocal best_result, best_score, best_rank, best_name
+        if not result or not result.lines:
+            return
+        score = score_result(result)
+        if score < 0:
+            return
+        # 分數一樣時照後端順序，跟逐一呼叫時挑出來的一樣
+        if score > best_score or (score == best_score and rank < best_rank):
+            best_result, best_score, best_rank, best_name = result, score, rank, backend.name
+
+    # 提早回傳後，被放著不管的後端還會繼續讀這張圖；呼叫端的 buffer 可能馬上被下一張蓋掉，所以給它們一份自己的
+    futures = _submit_all(executor, timed_recognize, backends, image.copy() if executor is not None and len(backends) > 1 else image, stats)
+    if futures is None:
+        for rank, backend in enumerate(backends):
+            consider(rank, backend, timed_recognize(backend, image, stats))
+            if good_enough_score > 0 and best_score >= good_enough_score:
+                break
+    else:
+        deadline = time.monotonic() + max(0, int(deadline_ms)) / 1000.0 if deadline_ms and deadline_ms > 0 else None
+        pending = set(futures)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank, backend = futures[future]
+                consider(rank, backend, future.result())
+            if good_enough_score > 0 and best_score >= good_enough_score:
+                break
+            if not done and best_result is not None:
+                timed_out = True
+                break
+            if not done:
+                # 期限到了卻一個結果都沒有，只好等第一個回來
+                deadline = None
+        for future in pending:
+            future.cancel()
+            stats.record_ignored(futures[future][1].name)
+
+    if best_result is not None:
+        stats.record_win(best_name)
+    return best_result, timed_out
+
+
+def timed_recognize_batch(backend: OCRBackend, images, stats: BackendRaceStats) -> list[Optional[OCRResult]]:
+    started = time.perf_counter()
+    try:
+        results = list(backend.recognize_batch(images))
+    except Exception:
+        stats.record_call(backend.name, (time.perf_counter() - started) * 1000.0, False)
+        return [None] * len(images)
+    stats.record_call(backend.name, (time.perf_counter() - started) * 1000.0, True)
+    if len(results) != len(images):
+        return [None] * len(images)
+    return results
+
+
+def race_backends_batch(
+    backends: Sequence[OCRBackend],
+    images: Sequence,
+    score_result: ResultScorer,
+    executor: Optional[Executor],
+    stats: BackendRaceStats,
+    deadline_ms: int = DEFAULT_BACKEND_DEADLINE_MS,
+) -> tuple[list[Optional[OCRResult]], bool]:
+    # 每個後端一次吃整批圖，各張圖再分別挑分數最高的結果；期限規則跟單張相同
+    timed_out = False
+    best: list[tuple[int, int, Optional[OCRResult], str]] = [(-1, len(backends), None, "")] * len(images)
+
+    def consider(rank: int, backend: OCRBackend, results: list[Optional[OCRResult]]) -> None:
+        for index, result in enumerate(results):
+            if not result or not result.lines:
+                continue
+            score = score_result(result)
+            best_score, best_rank, _, _ = best[index]
+            if score < 0:
+                continue
+            if score > best_score or (score == best_score and rank < best_rank):
+                best[index] = (score, rank, result, backend.name)
+
+    futures = _submit_all(executor, timed_recognize_batch, backends, list(images), stats)
+    if futures is None:
+        for rank, backend in enumerate(backends):
+            consider(rank, backend, timed_recognize_batch(backend, images, stats))
+    else:
+        deadline = time.monotonic() + max(0, int(deadline_ms)) / 1000.0 if deadline_ms and deadline_ms > 0 else None
+        pending = set(futures)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank, backend = futures[future]
+                consider(rank, backend, future.result())
+            if not done and any(entry[2] is not None for entry in best):
+                timed_out = True
+                break
+            if not done:
+                deadline = None
+        for future in pending:
+            future.cancel()
+            stats.record_ignored(futures[future][1].name)
+
+    for _, _, result, name in best:
+        if result is not None:
+            stats.record_win(name)
+    return [entry[2] for entry in best], timed_out
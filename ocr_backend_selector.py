@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import random
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Hashable, Optional, Sequence
+
+from ocr_backends import OCRBackend
+from ocr_scene_cache import SceneSignature
+
+SELECTOR_SCENE_TOLERANCE = 0.18
+SELECTOR_SCENE_LIMIT = 32
+SELECTOR_MIN_TRIALS = 8
+SELECTOR_MIN_WIN_RATE = 0.7
+SELECTOR_EXPLORE_RATE = 0.05
+SELECTOR_DECAY = 0.98
+
+
+class _ContextRecord:
+    def __init__(self):
+        self.trials = 0.0
+        self.wins: dict[str, float] = {}
+        self.exploits = 0
+        self.explores = 0
+        self.fallbacks = 0
+
+    def leader(self) -> tuple[Optional[str], float]:
+        if not self.wins or self.trials <= 0:
+            return None, 0.0
+        name = max(self.wins, key=self.wins.get)
+        return name, self.wins[name] / self.trials
+
+
+class _ScanTally:
+    def __init__(self, exploring: bool):
+        self.exploring = exploring
+        self.winners: Counter[str] = Counter()
+        self.fell_back = False
+
+
+class BackendSelector:
+    def __init__(
+        self,
+        min_trials: int = SELECTOR_MIN_TRIALS,
+        min_win_rate: float = SELECTOR_MIN_WIN_RATE,
+        explore_rate: float = SELECTOR_EXPLORE_RATE,
+        seed: Optional[int] = None,
+    ):
+        self.enabled = True
+        self.min_trials = max(1, int(min_trials))
+        self.min_win_rate = float(min_win_rate)
+        self.explore_rate = max(0.0, min(1.0, float(explore_rate)))
+        self._random = random.Random(seed)
+        self._scenes: OrderedDict[int, SceneSignature] = OrderedDict()
+        self._next_scene_id = 0
+        self._records: dict[Hashable, _ContextRecord] = {}
+        self._scans: dict[Hashable, _ScanTally] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._scenes.clear()
+            self._records.clear()
+            self._scans.clear()
+
+    def context_for(self, scan_mode: Any, signature: Optional[SceneSignature]) -> Hashable:
+        # 亮度分布相近的畫面歸成同一個場景，勝率依「掃描模式 + 場景」分開記
+        if signature is None:
+            return (scan_mode, None)
+        with self._lock:
+            best_id = None
+            best_distance = SELECTOR_SCENE_TOLERANCE
+            for scene_id, known in self._scenes.items():
+                distance = signature.distance(known)
+                if distance <= best_distance:
+                    best_id, best_distance = scene_id, distance
+            if best_id is None:
+                best_id = self._next_scene_id
+                self._next_scene_id += 1
+                self._scenes[best_id] = signature
+                while len(self._scenes) > SELECTOR_SCENE_LIMIT:
+                    stale_id, _ = self._scenes.popitem(last=False)
+                    for key in [key for key in self._records if key[1] == stale_id]:
+                        del self._records[key]
+            self._scenes.move_to_end(best_id)
+            return (scan_mode, best_id)
+
+    def begin_scan(self, context: Hashable, backends: Sequence[OCRBackend]) -> None:
+        # 一次掃描（所有區塊、閥值、角度）只決定一次要探索還是只跑贏家，結果在 finish_scan 算一回合
+        if not self.enabled or len(backends) <= 1 or context is None:
+            return
+        with self._lock:
+            record = self._records.setdefault(context, _ContextRecord())
+            leader, win_rate = record.leader()
+            names = [backend.name for backend in backends]
+            settled = record.trials >= self.min_trials and win_rate >= self.min_win_rate and leader in names
+            exploring = not (settled and self._random.random() >= self.explore_rate)
+            if exploring:
+                record.explores += 1
+            else:
+                record.exploits += 1
+            self._scans[context] = _ScanTally(exploring)
+
+    def choose(self, context: Hashable, backends: Sequence[OCRBackend]) -> tuple[list[OCRBackend], bool]:
+        # 回傳 (要跑的後端, 是否為探索回合)；探索回合全部都跑，結果才拿來更新勝率
+        backends = list(backends)
+        if not self.enabled or len(backends) <= 1 or context is None:
+            return backends, False
+        with self._lock:
+            scan = self._scans.get(context)
+            if scan is None:
+                return backends, False
+            record = self._records.get(context)
+            if scan.exploring or record is None:
+                return backends, scan.exploring
+            leader, _ = record.leader()
+        names = [backend.name for backend in backends]
+        if leader not in names:
+            return backends, False
+        return [backends[names.index(leader)]], False
+
+    def tally(self, context: Hashable, winner: Optional[str]) -> None:
+        with self._lock:
+            scan = self._scans.get(context)
+            if scan is not None and winner:
+                scan.winners[winner] += 1
+
+    def tally_fallback(self, context: Hashable) -> None:
+        with self._lock:
+            scan = self._scans.get(context)
+            if scan is not None:
+                scan.fell_back = True
+
+    def finish_scan(self, context: Hashable) -> None:
+        with self._lock:
+            scan = self._scans.pop(context, None)
+        if scan is None:
+            return
+        if scan.exploring and scan.winners:
+            self.record_round(context, scan.winners.most_common(1)[0][0])
+        if scan.fell_back:
+            self.record_fallback(context)
+
+    def record_round(self, context: Hashable, winner: Optional[str]) -> None:
+        with self._lock:
+            record = self._records.setdefault(context, _ContextRecord())
+            # 舊的回合慢慢淡出，遊戲換了字型時勝率才跟得上
+            record.trials = record.trials * SELECTOR_DECAY + 1.0
+            for name in record.wins:
+                record.wins[name] *= SELECTOR_DECAY
+            if winner:
+                record.wins[winner] = record.wins.get(winner, 0.0) + 1.0
+
+    def record_fallback(self, context: Hashable) -> None:
+        # 只跑預期贏家卻沒讀到字、其他後端卻讀到了，當成它輸一場
+        with self._lock:
+            record = self._records.setdefault(context, _ContextRecord())
+            record.fallbacks += 1
+            record.trials = record.trials * SELECTOR_DECAY + 1.0
+            for name in record.wins:
+                record.wins[name] *= SELECTOR_DECAY
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            contexts = {}
+            for key, record in self._records.items():
+                leader, win_rate = record.leader()
+                contexts[str(key)] = {
+                    "leader": leader,
+                    "win_rate": round(win_rate, 3),
+                    "exploits": record.exploits,
+                    "explores": record.explores,
+                    "fallbacks": record.fallbacks,
+                }
+            exploits = sum(record.exploits for record in self._records.values())
+            explores = sum(record.explores for record in self._records.values())
+            return {
+                "enabled": self.enabled,
+                "exploit_rate": exploits / max(1, exploits + explores),
+                "contexts": contexts,
+            }
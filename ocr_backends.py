@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Optional, Sequence, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 
+from ocr_script import DEFAULT_TESSERACT_LANG_MAP, SCRIPT_MIXED, ScriptRouter
 
 @dataclass(frozen=True)
 class OCRBox:
@@ -44,6 +47,12 @@ class OCRResult:
 
 class OCRBackend:
     name = "unknown"
+    # 可以把多個裁切疊成一張大圖一次辨識時的最大邊長；0 表示不支援
+    max_atlas_side = 0
+    # 已知每一行的位置時，能不能跳過偵測只跑辨識
+    supports_line_recognition = False
+    # recognize_batch 是否真的一次推論多張，而不是逐張呼叫
+    supports_batch = False
 
     def available(self) -> bool:
         return False
@@ -51,6 +60,49 @@ class OCRBackend:
     def recognize(self, image: np.ndarray) -> OCRResult:
         raise NotImplementedError
 
+    def recognize_lines(self, image: np.ndarray, boxes: Sequence[OCRBox]) -> Optional[OCRResult]:
+        return None
+
+    def recognize_batch(self, images: Sequence[np.ndarray]) -> List[OCRResult]:
+        return [self.recognize(image) for image in images]
+
+
+_PROBE_LOCK = threading.Lock()
+_PROBE_RESULTS: Dict[str, bool] = {}
+
+
+def cached_probe(key: str, probe: Callable[[], bool], refresh: bool = False) -> bool:
+    # 後端能不能用只探測一次，之後辨識都直接查表；裝完套件後用 reset_backend_probes 重新探測
+    key = normalize_backend_name(key)
+    with _PROBE_LOCK:
+        if not refresh and key in _PROBE_RESULTS:
+            return _PROBE_RESULTS[key]
+        try:
+            result = bool(probe())
+        except Exception:
+            result = False
+        _PROBE_RESULTS[key] = result
+        return result
+
+
+def reset_backend_probes(name: Optional[str] = None) -> None:
+    with _PROBE_LOCK:
+        if name is None:
+            _PROBE_RESULTS.clear()
+        else:
+            _PROBE_RESULTS.pop(normalize_backend_name(name), None)
+
+
+def _probe_tesseract_binary() -> bool:
+    import pytesseract  # type: ignore
+
+    pytesseract.get_tesseract_version()
+    return True
+
+
+def probe_tesseract_runtime(refresh: bool = False) -> bool:
+    return cached_probe("tesseract", _probe_tesseract_binary, refresh)
+
 
 def _to_int_box(x: float, y: float, w: float, h: float) -> OCRBox:
     return OCRBox(int(x), int(y), max(1, int(w)), max(1, int(h)))
@@ -64,6 +116,36 @@ def _box_from_points(points: Sequence[Sequence[float]]) -> OCRBox:
     return _to_int_box(x1, y1, x2 - x1, y2 - y1)
 
 
+def _batch_buckets(sizes: Sequence[Tuple[int, int]], max_waste: float, max_batch: int) -> List[List[int]]:
+    # 尺寸相近的放同一批，補白的面積不超過原圖總面積的 max_waste 倍
+    order = sorted(range(len(sizes)), key=lambda index: (sizes[index][1], sizes[index][0]))
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    max_w = max_h = area = 0
+    for index in order:
+        w, h = sizes[index]
+        next_w, next_h = max(max_w, w), max(max_h, h)
+        next_area = area + w * h
+        if current and (len(current) >= max_batch or next_w * next_h * (len(current) + 1) > next_area * max_waste):
+            buckets.append(current)
+            current, next_w, next_h, next_area = [], w, h, w * h
+        current.append(index)
+        max_w, max_h, area = next_w, next_h, next_area
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _pad_to(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    h, w = image.shape[:2]
+    if w == width and h == height:
+        return image
+    # 用邊緣最常見的顏色補，補出來的部分才不會多一條邊被當成字
+    border = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]])
+    fill = tuple(int(value) for value in np.median(border, axis=0))
+    return cv2.copyMakeBorder(image, 0, height - h, 0, width - w, cv2.BORDER_CONSTANT, value=fill)
+
+
 def _ensure_bgr(image: np.ndarray) -> np.ndarray:
     if image is None:
         return image
@@ -74,12 +156,14 @@ def _ensure_bgr(image: np.ndarray) -> np.ndarray:
 
 class WindowsOCRBackend(OCRBackend):
     name = "windows"
+    max_atlas_side = 10000
 
     def __init__(self):
         self._available = False
         self._engine = None
         self._language = None
         self._mode = "winrt"
+        self._init_lock = threading.Lock()
         try:
             try:
                 from winsdk.windows.media.ocr import OcrEngine  # type: ignore
@@ -109,15 +193,18 @@ class WindowsOCRBackend(OCRBackend):
             return self._engine
         if not self._available:
             return None
-        lang = self._Language("ja-JP")
-        try:
-            if not self._OcrEngine.is_language_supported(lang):
-                self._engine = self._OcrEngine.try_create_from_user_profile_languages()
-            else:
-                self._engine = self._OcrEngine.try_create_from_language(lang)
-        except Exception:
-            self._engine = None
-        return self._engine
+        with self._init_lock:
+            if self._engine is not None:
+                return self._engine
+            lang = self._Language("ja-JP")
+            try:
+                if not self._OcrEngine.is_language_supported(lang):
+                    self._engine = self._OcrEngine.try_create_from_user_profile_languages()
+                else:
+                    self._engine = self._OcrEngine.try_create_from_language(lang)
+            except Exception:
+                self._engine = None
+            return self._engine
 
     async def _recognize_async(self, image: np.ndarray):
         engine = self._init_engine()
@@ -174,13 +261,24 @@ class WindowsOCRBackend(OCRBackend):
         return OCRResult(self.name, tuple(lines))
 
 
+TESSERACT_ROUTED_MIN_CONFIDENCE = 40.0
+
+
 class TesseractBackend(OCRBackend):
     name = "tesseract"
+    max_atlas_side = 8192
 
-    def __init__(self):
+    def __init__(self, persistent: bool = True, lang_map=None, route_scripts: bool = True):
         self._available = False
         self._pytesseract = None
         self._output_type = None
+        self._tesserocr = None
+        self._engines: dict = {}
+        self._engine_locks: dict = {}
+        self._engine_failed: set = set()
+        self._engine_lock = threading.Lock()
+        self.route_scripts = bool(route_scripts)
+        self.script_router = ScriptRouter(lang_map)
         try:
             import pytesseract  # type: ignore
             from pytesseract import Output  # type: ignore
@@ -190,53 +288,139 @@ class TesseractBackend(OCRBackend):
             self._available = True
         except Exception:
             self._available = False
+        if persistent:
+            try:
+                import tesserocr  # type: ignore
+
+                self._tesserocr = tesserocr
+            except Exception:
+                self._tesserocr = None
+
+    @property
+    def engine_mode(self) -> str:
+        return "engine" if self._get_engine() is not None else "subprocess"
 
     def available(self) -> bool:
-        if not self._available:
-            return False
+        # 只做便宜的檢查，跟 detect_backend_state 看的一樣；tesserocr 引擎等第一次辨識才建
+        # get_tesseract_version 每次都會開一個 tesseract 子行程，所以結果共用快取
+        return self._available and probe_tesseract_runtime()
+
+    def set_lang_map(self, lang_map) -> None:
+        self.script_router.set_lang_map(lang_map or DEFAULT_TESSERACT_LANG_MAP)
+
+    def _get_engine(self, lang: str = ""):
+        # 有 tesserocr 就每種語言常駐一個引擎，語言資料只載入一次；建不起來就退回 pytesseract
+        lang = lang or self.script_router.fallback_lang
+        engine = self._engines.get(lang)
+        if engine is not None or self._tesserocr is None or lang in self._engine_failed:
+            return engine
+        with self._engine_lock:
+            if lang not in self._engines and lang not in self._engine_failed:
+                try:
+                    self._engines[lang] = self._tesserocr.PyTessBaseAPI(lang=lang)
+                    self._engine_locks[lang] = threading.Lock()
+                except Exception as exc:
+                    print(f"[OCR] tesserocr engine unavailable for {lang}: {exc}")
+                    self._engine_failed.add(lang)
+            return self._engines.get(lang)
+
+    def _recognize_engine(self, engine, lang: str, rgb: np.ndarray) -> list[tuple[str, float, int, int, int, int]]:
+        rgb = np.ascontiguousarray(rgb)
+        h, w = rgb.shape[:2]
+        level = self._tesserocr.RIL.WORD
+        words = []
+        # 同一個引擎不能同時辨識兩張圖
+        with self._engine_locks[lang]:
+            engine.SetImageBytes(rgb.tobytes(), w, h, 3, w * 3)
+            engine.Recognize()
+            iterator = engine.GetIterator()
+            if iterator is None:
+                return words
+            for word in self._tesserocr.iterate_level(iterator, level):
+                text = word.GetUTF8Text(level)
+                bbox = word.BoundingBox(level)
+                if not text or bbox is None:
+                    continue
+                x1, y1, x2, y2 = bbox
+                words.append((text, word.Confidence(level), x1, y1, x2 - x1, y2 - y1))
+        return words
+
+    def _recognize_subprocess(self, lang: str, rgb: np.ndarray) -> list[tuple[str, object, int, int, int, int]]:
+        data = self._pytesseract.image_to_data(rgb, output_type=self._output_type.DICT, lang=lang)
+        words = []
+        n = len(data.get("text", []))
+        for i in range(n):
+            conf_raw = data.get("conf", ["-1"])[i]
+            words.append((
+                str(data["text"][i]),
+                conf_raw,
+                int(data["left"][i]),
+                int(data["top"][i]),
+                int(data["width"][i]),
+                int(data["height"][i]),
+            ))
+        return words
+
+    def _recognize_lang(self, lang: str, rgb: np.ndarray, fallback: bool = False) -> OCRResult:
+        started = time.perf_counter()
+        engine = self._get_engine(lang)
         try:
-            _ = self._pytesseract.get_tesseract_version()
-            return True
-        except Exception:
-            return False
+            if engine is not None:
+                words = self._recognize_engine(engine, lang, rgb)
+            else:
+                words = self._recognize_subprocess(lang, rgb)
+        except Exception as exc:
+            return OCRResult(self.name, (), error=str(exc))
+        finally:
+            self.script_router.record(lang, (time.perf_counter() - started) * 1000.0, fallback)
+        return self._words_to_result(words)
 
     def recognize(self, image: np.ndarray) -> OCRResult:
         if not self.available():
             return OCRResult(self.name, ())
         image = _ensure_bgr(image)
         rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        try:
-            data = self._pytesseract.image_to_data(rgb, output_type=self._output_type.DICT, lang="chi_tra+jpn+eng")
-        except Exception as exc:
-            return OCRResult(self.name, (), error=str(exc))
+        fallback_lang = self.script_router.fallback_lang
+        _, lang = self.script_router.route(image) if self.route_scripts else (SCRIPT_MIXED, fallback_lang)
+        result = self._recognize_lang(lang, rgb)
+        if lang != fallback_lang:
+            # 單一語言讀不到字或信心太低，就當作分類猜錯，回頭用合併模型再跑一次
+            confidences = [line.confidence for line in result.lines if line.confidence is not None]
+            mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+            if not result.lines or mean_confidence < TESSERACT_ROUTED_MIN_CONFIDENCE:
+                result = self._recognize_lang(fallback_lang, rgb, fallback=True)
+        self.script_router.observe(" ".join(line.text for line in result.lines))
+        return result
+
+    def _words_to_result(self, words) -> OCRResult:
         lines: list[OCRLine] = []
-        n = len(data.get("text", []))
-        for i in range(n):
-            text = str(data["text"][i]).strip()
+        for text, conf_raw, x, y, w, h in words:
+            text = text.strip()
             if not text:
                 continue
-            conf_raw = data.get("conf", ["-1"])[i]
             try:
                 confidence = float(conf_raw)
             except Exception:
                 confidence = None
-            x = int(data["left"][i])
-            y = int(data["top"][i])
-            w = int(data["width"][i])
-            h = int(data["height"][i])
             box = OCRBox(x, y, max(1, w), max(1, h))
             lines.append(OCRLine(text, box, confidence, (OCRWord(text, box, confidence),)))
         return OCRResult(self.name, tuple(lines))
 
 
+EASYOCR_BATCH_SIZE = 8
+EASYOCR_BATCH_MAX_WASTE = 1.5
+
+
 class EasyOCRBackend(OCRBackend):
     name = "easyocr"
+    supports_batch = True
 
     def __init__(self):
         self._available = False
         self._reader = None
         self._gpu_enabled = False
         self._import_error = None
+        self._init_lock = threading.Lock()
         try:
             import easyocr  # type: ignore
 
@@ -263,6 +447,12 @@ class EasyOCRBackend(OCRBackend):
             return self._reader
         if not self._available:
             return None
+        with self._init_lock:
+            if self._reader is None:
+                self._load_reader()
+        return self._reader
+
+    def _load_reader(self):
         gpu_enabled = self._can_use_gpu()
         self._gpu_enabled = gpu_enabled
         for langs in (["ch_tra", "en"], ["ja", "en"], ["ch_sim", "en"]):
@@ -281,7 +471,6 @@ class EasyOCRBackend(OCRBackend):
                         break
                     except Exception:
                         self._reader = None
-        return self._reader
 
     def recognize(self, image: np.ndarray) -> OCRResult:
         reader = self._get_reader()
@@ -293,6 +482,36 @@ class EasyOCRBackend(OCRBackend):
             items = reader.readtext(rgb, detail=1, paragraph=False)
         except Exception as exc:
             return OCRResult(self.name, (), error=str(exc))
+        return self._items_to_result(items)
+
+    def recognize_batch(self, images: Sequence[np.ndarray]) -> List[OCRResult]:
+        reader = self._get_reader()
+        if reader is None:
+            return [OCRResult(self.name, ()) for _ in images]
+        if len(images) <= 1 or not hasattr(reader, "readtext_batched"):
+            return [self.recognize(image) for image in images]
+        # readtext_batched 只吃同尺寸的圖：相近尺寸分一批，往右下補齊，座標原點不變
+        rgbs = [cv2.cvtColor(_ensure_bgr(image), cv2.COLOR_BGR2RGB) for image in images]
+        results: List[OCRResult] = [OCRResult(self.name, ())] * len(rgbs)
+        sizes = [(rgb.shape[1], rgb.shape[0]) for rgb in rgbs]
+        for bucket in _batch_buckets(sizes, EASYOCR_BATCH_MAX_WASTE, EASYOCR_BATCH_SIZE):
+            if len(bucket) == 1:
+                results[bucket[0]] = self.recognize(images[bucket[0]])
+                continue
+            width = max(sizes[index][0] for index in bucket)
+            height = max(sizes[index][1] for index in bucket)
+            batch = [_pad_to(rgbs[index], width, height) for index in bucket]
+            try:
+                batch_items = reader.readtext_batched(batch, batch_size=len(batch), detail=1, paragraph=False)
+            except Exception as exc:
+                for index in bucket:
+                    results[index] = OCRResult(self.name, (), error=str(exc))
+                continue
+            for index, items in zip(bucket, batch_items):
+                results[index] = self._items_to_result(items, sizes[index])
+        return results
+
+    def _items_to_result(self, items, size: Optional[Tuple[int, int]] = None) -> OCRResult:
         lines: list[OCRLine] = []
         for item in items or []:
             if not item or len(item) < 2:
@@ -308,16 +527,36 @@ class EasyOCRBackend(OCRBackend):
                 except Exception:
                     confidence = None
             box = _box_from_points(box_points)
+            if size is not None and (box.x >= size[0] or box.y >= size[1]):
+                continue
             lines.append(OCRLine(text, box, confidence, (OCRWord(text, box, confidence),)))
         return OCRResult(self.name, tuple(lines))
 
 
+def _rec_pairs(output) -> Optional[list[tuple[str, Optional[float]]]]:
+    # rapidocr_onnxruntime 回傳 ([(text, score), ...], elapse)，新版 rapidocr 回傳有 txts / scores 的物件
+    txts = getattr(output, "txts", None)
+    if txts is not None:
+        scores = getattr(output, "scores", None) or [None] * len(txts)
+        return [(str(text), score) for text, score in zip(txts, scores)]
+    if isinstance(output, tuple) and output and isinstance(output[0], (list, tuple)):
+        output = output[0]
+    pairs = []
+    for item in output or []:
+        if not isinstance(item, (list, tuple)) or not item:
+            return None
+        pairs.append((str(item[0]), item[1] if len(item) > 1 else None))
+    return pairs
+
+
 class RapidOCRBackend(OCRBackend):
     name = "rapidocr"
+    supports_line_recognition = True
 
     def __init__(self):
         self._available = False
         self._ocr = None
+        self._init_lock = threading.Lock()
         try:
             from rapidocr_onnxruntime import RapidOCR  # type: ignore
 
@@ -340,11 +579,39 @@ class RapidOCRBackend(OCRBackend):
             return self._ocr
         if not self._available:
             return None
+        with self._init_lock:
+            if self._ocr is None:
+                try:
+                    self._ocr = self._RapidOCR()
+                except Exception:
+                    self._ocr = None
+        return self._ocr
+
+    def recognize_lines(self, image: np.ndarray, boxes: Sequence[OCRBox]) -> Optional[OCRResult]:
+        # 只跑辨識模型，所有行一次丟給 text_rec 批次推論，跳過偵測與方向分類
+        ocr = self._get_ocr()
+        text_rec = getattr(ocr, "text_rec", None)
+        if text_rec is None or not boxes:
+            return None
+        image = _ensure_bgr(image)
+        crops = [image[box.y:box.y + box.h, box.x:box.x + box.w] for box in boxes]
+        if any(crop.size == 0 for crop in crops):
+            return None
         try:
-            self._ocr = self._RapidOCR()
+            pairs = _rec_pairs(text_rec(crops))
         except Exception:
-            self._ocr = None
-        return self._ocr
+            return None
+        if pairs is None or len(pairs) != len(boxes):
+            return None
+        lines: list[OCRLine] = []
+        for box, (text, score) in zip(boxes, pairs):
+            try:
+                confidence = float(score) if score is not None else None
+            except Exception:
+                confidence = None
+            text = text.strip()
+            lines.append(OCRLine(text, box, confidence, (OCRWord(text, box, confidence),)))
+        return OCRResult(self.name, tuple(lines))
 
     def recognize(self, image: np.ndarray) -> OCRResult:
         ocr = self._get_ocr()
@@ -403,13 +670,37 @@ def resolve_preferred_backends(preferred: Optional[Sequence[str]] = None) -> Lis
     return order
 
 
+_REGISTRY_LOCK = threading.Lock()
+_BACKEND_REGISTRY: Dict[str, OCRBackend] = {}
+
+
+def get_backend(name: str) -> Optional[OCRBackend]:
+    # 整個行程共用同一個後端實例，已載入的 reader / ONNX session 在切換後端鏈時不會被丟掉
+    name = normalize_backend_name(name)
+    backend_cls = BACKEND_CLASSES.get(name)
+    if backend_cls is None:
+        return None
+    with _REGISTRY_LOCK:
+        backend = _BACKEND_REGISTRY.get(name)
+        if backend is None or type(backend) is not backend_cls:
+            backend = backend_cls()
+            _BACKEND_REGISTRY[name] = backend
+        return backend
+
+
+def release_backends(name: Optional[str] = None) -> None:
+    # 安裝或移除套件後呼叫，下次取用時重新建立
+    with _REGISTRY_LOCK:
+        if name is None:
+            _BACKEND_REGISTRY.clear()
+        else:
+            _BACKEND_REGISTRY.pop(normalize_backend_name(name), None)
+
+
 def discover_backends(preferred: Optional[Sequence[str]] = None) -> List[OCRBackend]:
     backends: List[OCRBackend] = []
     for name in resolve_preferred_backends(preferred):
-        backend_cls = BACKEND_CLASSES.get(name)
-        if backend_cls is None:
-            continue
-        backend = backend_cls()
-        if backend.available():
+        backend = get_backend(name)
+        if backend is not None and backend.available():
             backends.append(backend)
     return backends
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+import cv2
+import numpy as np
+
+BINARY_MEMO_TOLERANCE = 0.002
+BINARY_MEMO_SAMPLE_MAX_SIDE = 256
+BINARY_MEMO_KEY_LIMIT = 12
+
+
+@dataclass
+class _MemoEntry:
+    digest: bytes
+    thumbnail: np.ndarray
+    result: Any
+    round: int
+
+
+def binary_digest(mask: np.ndarray) -> bytes:
+    mask = np.ascontiguousarray(mask)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(mask.shape).encode("ascii"))
+    hasher.update(memoryview(mask).cast("B"))
+    return hasher.digest()
+
+
+def binary_thumbnail(mask: np.ndarray, max_side: int = BINARY_MEMO_SAMPLE_MAX_SIDE) -> np.ndarray:
+    h, w = mask.shape[:2]
+    scale = min(1.0, max_side / max(1, h, w))
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(mask, size, interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+
+def differing_fraction(previous: np.ndarray, current: np.ndarray) -> float:
+    # 閥值只會讓遮罩單調地變胖或變瘦，面積平均後的差值剛好就是不同像素的比例
+    if previous.shape != current.shape:
+        return 1.0
+    return float(np.abs(previous - current).mean())
+
+
+class BinaryMaskMemo:
+    def __init__(self, tolerance: float = BINARY_MEMO_TOLERANCE, key_limit: int = BINARY_MEMO_KEY_LIMIT):
+        self.tolerance = max(0.0, float(tolerance))
+        self.key_limit = max(1, int(key_limit))
+        self._frame: Optional[np.ndarray] = None
+        self._entries: dict[Hashable, list[_MemoEntry]] = {}
+        self._round = 0
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def set_tolerance(self, tolerance: float) -> None:
+        self.tolerance = max(0.0, float(tolerance))
+
+    def bind_frame(self, frame: np.ndarray) -> None:
+        # 換一張截圖就清掉，同一張圖裡相鄰閥值的結果才拿來共用
+        with self._lock:
+            if frame is self._frame:
+                return
+            self._frame = frame
+            self._entries.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frame = None
+            self._entries.clear()
+
+    def begin_round(self) -> None:
+        # 同一輪的候選可能平行跑，誰先記進來不固定；近似命中只借前幾輪已經跑完的結果，
+        # 不管單執行緒還是平行，每個候選拿到的結果都一樣
+        with self._lock:
+            self._round += 1
+
+    def lookup(self, memo_key: Hashable, mask: np.ndarray) -> tuple[bool, Any, tuple[bytes, np.ndarray]]:
+        digest = binary_digest(mask)
+        thumbnail = binary_thumbnail(mask)
+        with self._lock:
+            entries = list(self._entries.get(memo_key, ()))
+            current_round = self._round
+        for entry in entries:
+            if entry.digest == digest:
+                self._count("exact_hits")
+                return True, entry.result, (digest, thumbnail)
+        earlier = [entry for entry in entries if entry.round < current_round]
+        if self.tolerance > 0.0 and earlier:
+            nearest = min(earlier, key=lambda entry: differing_fraction(entry.thumbnail, thumbnail))
+            if differing_fraction(nearest.thumbnail, thumbnail) <= self.tolerance:
+                self._count("near_hits")
+                return True, nearest.result, (digest, thumbnail)
+        self._count("misses")
+        return False, None, (digest, thumbnail)
+
+    def remember(self, memo_key: Hashable, fingerprint: tuple[bytes, np.ndarray], result: Any) -> None:
+        digest, thumbnail = fingerprint
+        with self._lock:
+            entries = self._entries.setdefault(memo_key, [])
+            entries.append(_MemoEntry(digest, thumbnail, result, self._round))
+            del entries[:-self.key_limit]
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.near_hits) / max(1, lookups),
+        }
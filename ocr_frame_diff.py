@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+import cv2
+import numpy as np
+
+FRAME_HASH_SIZE = 16
+FRAME_TILE_GRID = (8, 8)
+FRAME_TILE_SAMPLE = 16
+FRAME_HASH_TOLERANCE = 6
+FRAME_TILE_TOLERANCE = 18
+
+
+@dataclass(frozen=True)
+class FrameFingerprint:
+    shape: tuple[int, int]
+    dhash: np.ndarray
+    thumbnail: np.ndarray
+    grid: tuple[int, int]
+
+
+def _to_gray(img: np.ndarray) -> np.ndarray:
+    if img.ndim == 2:
+        return img
+    if img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def compute_dhash(gray: np.ndarray, hash_size: int = FRAME_HASH_SIZE) -> np.ndarray:
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+def hamming_distance(first: np.ndarray, second: np.ndarray) -> int:
+    return int(np.unpackbits(np.bitwise_xor(first, second)).sum())
+
+
+def compute_frame_fingerprint(
+    img: np.ndarray,
+    grid: tuple[int, int] = FRAME_TILE_GRID,
+    hash_size: int = FRAME_HASH_SIZE,
+) -> FrameFingerprint:
+    gray = _to_gray(img)
+    rows, cols = max(1, int(grid[0])), max(1, int(grid[1]))
+    thumbnail = cv2.resize(
+        gray,
+        (cols * FRAME_TILE_SAMPLE, rows * FRAME_TILE_SAMPLE),
+        interpolation=cv2.INTER_AREA,
+    )
+    return FrameFingerprint(
+        shape=(int(gray.shape[0]), int(gray.shape[1])),
+        dhash=compute_dhash(gray, hash_size),
+        thumbnail=thumbnail,
+        grid=(rows, cols),
+    )
+
+
+def tile_difference_mask(
+    previous: FrameFingerprint,
+    current: FrameFingerprint,
+    tolerance: int = FRAME_TILE_TOLERANCE,
+) -> np.ndarray:
+    rows, cols = current.grid
+    if previous.grid != current.grid or previous.shape != current.shape:
+        return np.ones((rows, cols), dtype=bool)
+    diff = cv2.absdiff(previous.thumbnail, current.thumbnail)
+    per_tile = diff.reshape(rows, FRAME_TILE_SAMPLE, cols, FRAME_TILE_SAMPLE).max(axis=(1, 3))
+    return per_tile > int(tolerance)
+
+
+class FrameChangeDetector:
+    def __init__(self, hash_tolerance: int = FRAME_HASH_TOLERANCE, tile_tolerance: int = FRAME_TILE_TOLERANCE):
+        self.hash_tolerance = int(hash_tolerance)
+        self.tile_tolerance = int(tile_tolerance)
+        self._reference: FrameFingerprint | None = None
+        self._reference_key: Hashable | None = None
+        self.checked_scans = 0
+        self.skipped_scans = 0
+
+    def reset(self) -> None:
+        self._reference = None
+        self._reference_key = None
+
+    def remember(self, fingerprint: FrameFingerprint | None, context_key: Hashable) -> None:
+        self._reference = fingerprint
+        self._reference_key = context_key if fingerprint is not None else None
+
+    def dirty_tiles(self, fingerprint: FrameFingerprint) -> np.ndarray:
+        if self._reference is None:
+            rows, cols = fingerprint.grid
+            return np.ones((rows, cols), dtype=bool)
+        return tile_difference_mask(self._reference, fingerprint, self.tile_tolerance)
+
+    def is_unchanged(self, fingerprint: FrameFingerprint, context_key: Hashable) -> bool:
+        self.checked_scans += 1
+        reference = self._reference
+        if reference is None or self._reference_key != context_key:
+            return False
+        if reference.shape != fingerprint.shape:
+            return False
+        if hamming_distance(reference.dhash, fingerprint.dhash) > self.hash_tolerance:
+            return False
+        return not bool(self.dirty_tiles(fingerprint).any())
+
+    def record_skip(self) -> int:
+        self.skipped_scans += 1
+        return self.skipped_scans
+
+    def stats(self) -> dict[str, Any]:
+        checked = max(1, self.checked_scans)
+        return {
+            "checked_scans": self.checked_scans,
+            "skipped_scans": self.skipped_scans,
+            "skip_rate": self.skipped_scans / checked,
+        }
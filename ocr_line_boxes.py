@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence
+
+import numpy as np
+
+from ocr_backends import OCRBox, OCRResult
+
+LINE_BOX_MEMORY_LIMIT = 256
+LINE_BAND_PAD_RATIO = 0.25
+LINE_STRAY_INK_RATIO = 0.02
+LINE_MIN_CONFIDENCE = 0.5
+
+
+def merge_line_bands(boxes: Sequence[OCRBox]) -> list[OCRBox]:
+    # 同一列被拆成好幾段的，合成一條，之後每條只辨識一次
+    bands: list[list[int]] = []
+    for box in sorted(boxes, key=lambda b: b.y):
+        if box.h <= 0 or box.w <= 0:
+            continue
+        if bands:
+            top, bottom = bands[-1][1], bands[-1][1] + bands[-1][3]
+            overlap = min(bottom, box.y + box.h) - max(top, box.y)
+            if overlap >= min(bands[-1][3], box.h) * 0.5:
+                x1 = min(bands[-1][0], box.x)
+                x2 = max(bands[-1][0] + bands[-1][2], box.x + box.w)
+                y1 = min(top, box.y)
+                y2 = max(bottom, box.y + box.h)
+                bands[-1] = [x1, y1, x2 - x1, y2 - y1]
+                continue
+        bands.append([box.x, box.y, box.w, box.h])
+    return [OCRBox(*band) for band in bands]
+
+
+def fit_line_boxes(image: np.ndarray, bands: Sequence[OCRBox]) -> Optional[list[OCRBox]]:
+    # 沿用上次的行位置，但左右依這次的墨水重新量，句子變長也不會被切掉；
+    # 行外面多出字（多了一行）或某一行整個空了，就回傳 None 讓它跑完整流程
+    gray = image[:, :, 0] if image.ndim == 3 else image
+    h, w = gray.shape[:2]
+    if not bands or h == 0 or w == 0:
+        return None
+    background = 255 if np.count_nonzero(gray > 127) * 2 > gray.size else 0
+    ink = (gray > 127) != (background == 255)
+    total_ink = int(np.count_nonzero(ink))
+    if total_ink == 0:
+        return None
+    covered = np.zeros(h, dtype=bool)
+    fitted = []
+    for band in bands:
+        pad = max(2, int(band.h * LINE_BAND_PAD_RATIO))
+        y1 = max(0, band.y - pad)
+        y2 = min(h, band.y + band.h + pad)
+        if y2 <= y1:
+            return None
+        columns = np.flatnonzero(ink[y1:y2].any(axis=0))
+        if columns.size == 0:
+            return None
+        pad_x = max(2, band.h // 2)
+        x1 = max(0, int(columns[0]) - pad_x)
+        x2 = min(w, int(columns[-1]) + 1 + pad_x)
+        covered[y1:y2] = True
+        fitted.append(OCRBox(x1, y1, x2 - x1, y2 - y1))
+    stray = int(np.count_nonzero(ink[~covered]))
+    if stray > total_ink * LINE_STRAY_INK_RATIO:
+        return None
+    return fitted
+
+
+def accept_line_result(result: Optional[OCRResult], expected: int) -> bool:
+    if result is None or len(result.lines) != expected:
+        return False
+    for line in result.lines:
+        if not line.text.strip():
+            return False
+        if line.confidence is not None and line.confidence < LINE_MIN_CONFIDENCE:
+            return False
+    return True
+
+
+class KnownLineBoxes:
+    def __init__(self, limit: int = LINE_BOX_MEMORY_LIMIT):
+        self.limit = max(1, int(limit))
+        self._entries: OrderedDict[Hashable, tuple[str, tuple[OCRBox, ...], int]] = OrderedDict()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_serial = 0
+        self._lock = threading.Lock()
+        self.line_only_hits = 0
+        self.fallbacks = 0
+        self.lines_recognized = 0
+
+    def bind_frame(self, frame: np.ndarray) -> None:
+        with self._lock:
+            if frame is self._frame:
+                return
+            self._frame = frame
+            self._frame_serial += 1
+
+    def remember(self, key: Hashable, result: Optional[OCRResult]) -> None:
+        with self._lock:
+            if result is None or not result.lines:
+                self._entries.pop(key, None)
+                return
+            bands = tuple(merge_line_bands([line.box for line in result.lines]))
+            self._entries[key] = (result.backend_name, bands, self._frame_serial)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.limit:
+                self._entries.popitem(last=False)
+
+    def lookup(self, key: Hashable) -> Optional[tuple[str, tuple[OCRBox, ...]]]:
+        # 只給之後的截圖用；同一張圖的閥值/角度候選都要走同一套完整流程，分數才比得起來
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] == self._frame_serial:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def record(self, accepted: bool, lines: int = 0) -> None:
+        with self._lock:
+            if accepted:
+                self.line_only_hits += 1
+                self.lines_recognized += int(lines)
+            else:
+                self.fallbacks += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._frame = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            attempts = self.line_only_hits + self.fallbacks
+            return {
+                "entries": len(self._entries),
+                "line_only_hits": self.line_only_hits,
+                "fallbacks": self.fallbacks,
+                "lines_recognized": self.lines_recognized,
+                "hit_rate": self.line_only_hits / max(1, attempts),
+            }
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from ocr_preprocess import glyph_components
+
+WRITING_HORIZONTAL = "horizontal"
+WRITING_VERTICAL = "vertical"
+WRITING_UNKNOWN = "unknown"
+ORIENTATION_CONFIDENCE_MIN = 0.35
+ORIENTATION_MIN_PAIRS = 20
+ORIENTATION_SAMPLE_LIMIT = 800
+ORIENTATION_NEIGHBOR_REACH = 1.8
+ORIENTATION_AXIS_RATIO = 1.5
+# 直排日文逆時針轉 90 度後，上到下變成左到右、右邊的行排在最上面
+VERTICAL_TEXT_ORIENTATIONS = (270, 90)
+
+
+@dataclass(frozen=True)
+class OrientationGuess:
+    writing: str
+    confidence: float
+    pairs: int = 0
+
+
+def classify_text_orientation(crop: np.ndarray) -> OrientationGuess:
+    stats, centroids, _ = glyph_components(crop)
+    if len(stats) < ORIENTATION_MIN_PAIRS:
+        return OrientationGuess(WRITING_UNKNOWN, 0.0)
+    if len(stats) > ORIENTATION_SAMPLE_LIMIT:
+        picks = np.linspace(0, len(stats) - 1, ORIENTATION_SAMPLE_LIMIT).astype(np.int64)
+        stats = stats[picks]
+        centroids = centroids[picks]
+
+    # 每個字找最近的鄰居：橫排的鄰居在左右，直排的鄰居在上下
+    points = centroids.astype(np.float32)
+    sizes = np.maximum(stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]).astype(np.float32)
+    dx = points[None, :, 0] - points[:, None, 0]
+    dy = points[None, :, 1] - points[:, None, 1]
+    distance = np.hypot(dx, dy)
+    np.fill_diagonal(distance, np.inf)
+    size_ratio = sizes[None, :] / sizes[:, None]
+    distance[(size_ratio < 0.5) | (size_ratio > 2.0)] = np.inf
+    nearest = np.argmin(distance, axis=1)
+    rows = np.arange(len(points))
+    reachable = distance[rows, nearest] <= sizes * ORIENTATION_NEIGHBOR_REACH
+    near_dx = np.abs(dx[rows, nearest])[reachable]
+    near_dy = np.abs(dy[rows, nearest])[reachable]
+    horizontal = int(np.count_nonzero(near_dx >= near_dy * ORIENTATION_AXIS_RATIO))
+    vertical = int(np.count_nonzero(near_dy >= near_dx * ORIENTATION_AXIS_RATIO))
+    pairs = horizontal + vertical
+    if pairs < ORIENTATION_MIN_PAIRS:
+        return OrientationGuess(WRITING_UNKNOWN, 0.0, pairs)
+    writing = WRITING_HORIZONTAL if horizontal >= vertical else WRITING_VERTICAL
+    return OrientationGuess(writing, abs(horizontal - vertical) / pairs, pairs)
+
+
+def orientations_for_guess(
+    guess: OrientationGuess,
+    requested: Sequence[int],
+    confidence_min: float = ORIENTATION_CONFIDENCE_MIN,
+) -> list[int]:
+    requested = list(requested)
+    if len(requested) <= 1 or guess.confidence < confidence_min:
+        return requested
+    if guess.writing == WRITING_HORIZONTAL and 0 in requested:
+        return [0]
+    if guess.writing == WRITING_VERTICAL:
+        for orientation in VERTICAL_TEXT_ORIENTATIONS:
+            if orientation in requested:
+                return [orientation]
+    return requested
+
+
+class OrientationClassifier:
+    def __init__(self, confidence_min: float = ORIENTATION_CONFIDENCE_MIN):
+        self.confidence_min = float(confidence_min)
+        self._frame: Optional[np.ndarray] = None
+        self._guesses: dict[Hashable, OrientationGuess] = {}
+        self._lock = threading.Lock()
+        self.orientations_requested = 0
+        self.orientations_kept = 0
+        self.low_confidence = 0
+
+    def bind_frame(self, frame: np.ndarray) -> None:
+        with self._lock:
+            if frame is self._frame:
+                return
+            self._frame = frame
+            self._guesses.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frame = None
+            self._guesses.clear()
+
+    def classify(self, crop_key: Hashable, crop: np.ndarray) -> OrientationGuess:
+        with self._lock:
+            guess = self._guesses.get(crop_key)
+        if guess is None:
+            guess = classify_text_orientation(crop)
+            with self._lock:
+                self._guesses[crop_key] = guess
+        return guess
+
+    def candidates_for(self, crop_key: Hashable, crop: np.ndarray, requested: Sequence[int]) -> list[int]:
+        requested = list(requested)
+        if len(requested) <= 1:
+            return requested
+        guess = self.classify(crop_key, crop)
+        chosen = orientations_for_guess(guess, requested, self.confidence_min)
+        with self._lock:
+            self.orientations_requested += len(requested)
+            self.orientations_kept += len(chosen)
+            if len(chosen) == len(requested):
+                self.low_confidence += 1
+        return chosen
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "orientations_requested": self.orientations_requested,
+            "orientations_kept": self.orientations_kept,
+            "low_confidence": self.low_confidence,
+            "saved_ratio": 1.0 - self.orientations_kept / max(1, self.orientations_requested),
+        }
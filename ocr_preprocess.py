@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Hashable, Optional
+
+import cv2
+import numpy as np
+
+PREPROCESS_BUFFER_LIMIT = 16
+TEXT_HEIGHT_SAMPLE_MAX_SIDE = 1280
+TEXT_HEIGHT_MIN_COMPONENTS = 6
+TEXT_HEIGHT_PERCENTILE = 75
+OCR_SCALE_STEP = 0.25
+
+
+def rotate_for_ocr(img: np.ndarray, orientation: int) -> np.ndarray:
+    if orientation == 90:
+        return cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 270:
+        return cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return img
+
+
+def glyph_components(crop: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    # 回傳像字的連通元件 (x, y, w, h, area) 與中心點，座標是取樣後的比例
+    gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape[:2]
+    empty = np.zeros((0, 5), dtype=np.int32), np.zeros((0, 2), dtype=np.float64), 1.0
+    if h < 8 or w < 8:
+        return empty
+    sample_scale = min(1.0, TEXT_HEIGHT_SAMPLE_MAX_SIDE / max(h, w))
+    if sample_scale < 1.0:
+        gray = cv2.resize(gray, (max(1, int(w * sample_scale)), max(1, int(h * sample_scale))), interpolation=cv2.INTER_AREA)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # 字通常是少數的那一邊，前景超過一半就反過來看
+    if cv2.countNonZero(binary) > binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    count, _, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return empty[0], empty[1], sample_scale
+    stats = stats[1:]
+    widths = stats[:, cv2.CC_STAT_WIDTH].astype(np.float32)
+    heights = stats[:, cv2.CC_STAT_HEIGHT].astype(np.float32)
+    areas = stats[:, cv2.CC_STAT_AREA].astype(np.float32)
+    fill = areas / np.maximum(1.0, widths * heights)
+    glyphs = (
+        (heights >= 3)
+        & (heights <= gray.shape[0] / 3)
+        & (widths <= heights * 4)
+        & (areas >= 6)
+        & (fill >= 0.08)
+        & (fill <= 0.9)
+    )
+    return stats[glyphs], centroids[1:][glyphs], sample_scale
+
+
+def estimate_text_height(crop: np.ndarray) -> Optional[float]:
+    stats, _, sample_scale = glyph_components(crop)
+    if len(stats) < TEXT_HEIGHT_MIN_COMPONENTS:
+        return None
+    # 漢字常被拆成好幾個部件，取偏上的百分位比中位數更接近整個字的高度
+    return float(np.percentile(stats[:, cv2.CC_STAT_HEIGHT], TEXT_HEIGHT_PERCENTILE)) / sample_scale
+
+
+def choose_ocr_scale(
+    width: int,
+    height: int,
+    text_height: Optional[float],
+    max_scale: float,
+    min_scale: float,
+    target_text_height: float,
+    pixel_budget: int,
+) -> float:
+    scale = float(max_scale)
+    if text_height:
+        scale = min(scale, float(target_text_height) / float(text_height))
+    scale = min(scale, math.sqrt(max(1, int(pixel_budget)) / max(1, int(width) * int(height))))
+    # 對齊到固定級距，讓下一張截圖算出來的倍率一樣，快取才接得上
+    scale = math.floor(scale / OCR_SCALE_STEP + 1e-6) * OCR_SCALE_STEP
+    return max(float(min_scale), min(float(max_scale), scale))
+
+
+class OCRPreprocessCache:
+    def __init__(self):
+        self._frame: np.ndarray | None = None
+        self._scaled_gray: dict[Hashable, np.ndarray] = {}
+        self._text_heights: dict[Hashable, Optional[float]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.resize_calls = 0
+        self.resize_avoided = 0
+        self.threshold_calls = 0
+        self.text_height_estimates = 0
+
+    def bind_frame(self, frame: np.ndarray) -> None:
+        # 換了一張截圖才清掉放大後的灰階圖，同一張圖的多輪閥值掃描共用
+        with self._lock:
+            if frame is self._frame:
+                return
+            self._frame = frame
+            self._scaled_gray.clear()
+            self._text_heights.clear()
+
+    def _thread_buffers(self) -> dict[tuple[int, int], tuple[np.ndarray, np.ndarray]]:
+        # buffer 以執行緒為單位，平行掃描時各自寫各自的，不會互相蓋掉
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or len(buffers) > PREPROCESS_BUFFER_LIMIT:
+            buffers = {}
+            self._local.buffers = buffers
+        return buffers
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frame = None
+            self._scaled_gray.clear()
+            self._text_heights.clear()
+        self._local = threading.local()
+
+    def scaled_gray(self, crop_key: Hashable, crop: np.ndarray, orientation: int, scale_factor: float) -> np.ndarray:
+        cache_key = (crop_key, int(orientation), round(float(scale_factor), 3))
+        with self._lock:
+            cached = self._scaled_gray.get(cache_key)
+            if cached is not None:
+                self.resize_avoided += 1
+                return cached
+            frame = self._frame
+        # 放大在鎖外做，平行掃描的其他區塊不用排隊；兩條執行緒同時算到同一張時留先放進去的
+        gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        gray = rotate_for_ocr(gray, orientation)
+        h, w = gray.shape[:2]
+        scaled = cv2.resize(gray, (int(w * scale_factor), int(h * scale_factor)), interpolation=cv2.INTER_CUBIC)
+        with self._lock:
+            self.resize_calls += 1
+            if frame is not self._frame:
+                # 算的途中換了截圖，這張不能留給新截圖用
+                return scaled
+            return self._scaled_gray.setdefault(cache_key, scaled)
+
+    def text_height(self, crop_key: Hashable, crop: np.ndarray) -> Optional[float]:
+        with self._lock:
+            if crop_key in self._text_heights:
+                return self._text_heights[crop_key]
+        estimate = estimate_text_height(crop)
+        with self._lock:
+            self._text_heights[crop_key] = estimate
+            self.text_height_estimates += 1
+        return estimate
+
+    def binarize(self, gray: np.ndarray, threshold: int) -> np.ndarray:
+        # 同尺寸的輸出共用同一組 buffer；回傳的影像在下一次 binarize 前要用完
+        shape = gray.shape[:2]
+        thread_buffers = self._thread_buffers()
+        buffers = thread_buffers.get(shape)
+        if buffers is None:
+            buffers = (
+                np.empty(shape, dtype=np.uint8),
+                np.empty((shape[0], shape[1], 3), dtype=np.uint8),
+            )
+            thread_buffers[shape] = buffers
+        binary, bgr = buffers
+        cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY_INV, dst=binary)
+        cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR, dst=bgr)
+        self.threshold_calls += 1
+        return bgr
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.resize_calls + self.resize_avoided
+        return {
+            "resize_calls": self.resize_calls,
+            "resize_avoided": self.resize_avoided,
+            "threshold_calls": self.threshold_calls,
+            "text_height_estimates": self.text_height_estimates,
+            "reuse_rate": self.resize_avoided / max(1, requests),
+        }
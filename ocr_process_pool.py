@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from ocr_backends import BACKEND_CLASSES, OCRBackend, OCRBox, OCRResult
+
+DEFAULT_OCR_PROCESS_WORKERS = 2
+MAX_OCR_PROCESS_WORKERS = 8
+
+# 子行程裡的後端實例，由 initializer 建立，整個行程共用
+_WORKER_BACKENDS: dict[str, OCRBackend] = {}
+
+
+def _init_worker(backend_names: Sequence[str], backend_options: dict[str, dict[str, Any]]) -> None:
+    for name in backend_names:
+        backend_cls = BACKEND_CLASSES.get(name)
+        if backend_cls is None:
+            continue
+        try:
+            backend = backend_cls()
+        except Exception as exc:
+            print(f"[OCR] worker process failed to create {name}: {exc}")
+            continue
+        lang_map = (backend_options.get(name) or {}).get("lang_map")
+        if lang_map and hasattr(backend, "set_lang_map"):
+            backend.set_lang_map(lang_map)
+        _WORKER_BACKENDS[name] = backend
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # 共享記憶體由主行程建立和回收，子行程只借用，不要讓 resource tracker 接手
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _load_images(frames: Sequence[tuple[str, tuple[int, ...], str]]) -> list[np.ndarray]:
+    images = []
+    for shm_name, shape, dtype in frames:
+        shm = _attach_shared_memory(shm_name)
+        try:
+            # 複製出來再關掉，後端拿到的圖就跟共享記憶體的生命週期無關
+            images.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy())
+        finally:
+            shm.close()
+    return images
+
+
+def _error_result(backend_name: str, method: str, count: int, message: str) -> Any:
+    error = OCRResult(backend_name, (), error=message)
+    return [error] * count if method == "recognize_batch" else error
+
+
+def _run_in_worker(backend_name: str, method: str, frames, args: tuple) -> Any:
+    backend = _WORKER_BACKENDS.get(backend_name)
+    images = _load_images(frames)
+    if backend is None:
+        return _error_result(backend_name, method, len(images), "backend unavailable in worker process")
+    if method == "recognize":
+        return backend.recognize(images[0])
+    if method == "recognize_lines":
+        return backend.recognize_lines(images[0], *args)
+    if method == "recognize_batch":
+        return list(backend.recognize_batch(images))
+    raise ValueError(f"unknown backend method: {method}")
+
+
+class ProcessBackendPool:
+    def __init__(
+        self,
+        backend_names: Sequence[str],
+        max_workers: int = DEFAULT_OCR_PROCESS_WORKERS,
+        backend_options: Optional[dict[str, dict[str, Any]]] = None,
+    ):
+        self.backend_names = tuple(backend_names)
+        self.max_workers = max(1, min(MAX_OCR_PROCESS_WORKERS, int(max_workers)))
+        self.backend_options = dict(backend_options or {})
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.calls = 0
+        self.crashes = 0
+        self.bytes_shared = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._closed:
+                return None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.backend_names, self.backend_options),
+                )
+            return self._executor
+
+    def _discard_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.crashes += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def call(self, backend_name: str, method: str, images: Sequence[np.ndarray], *args) -> Any:
+        # 影像放進共享記憶體，只把名稱、形狀、型別傳過去，不用 pickle 整張陣列
+        if self._closed:
+            return _error_result(backend_name, method, len(images), "OCR worker pool is shut down")
+        segments = []
+        try:
+            frames = []
+            for image in images:
+                image = np.ascontiguousarray(image)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+                segments.append(shm)
+                np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[...] = image
+                frames.append((shm.name, image.shape, image.dtype.str))
+            with self._lock:
+                self.calls += 1
+                self.bytes_shared += sum(image.nbytes for image in images)
+            executor = self._get_executor()
+            if executor is None:
+                return _error_result(backend_name, method, len(images), "OCR worker pool is shut down")
+            try:
+                future = executor.submit(_run_in_worker, backend_name, method, frames, args)
+            except RuntimeError:
+                # 送出前剛好被 shutdown
+                return _error_result(backend_name, method, len(images), "OCR worker pool is shut down")
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # 後端把子行程弄掛了：丟掉整個 pool，下次呼叫再重開，主程式不受影響
+                self._discard_executor(executor)
+                print(f"[OCR] {backend_name} worker process crashed; restarting pool")
+                return _error_result(backend_name, method, len(images), "OCR worker process crashed")
+        finally:
+            for shm in segments:
+                shm.close()
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def shutdown(self) -> None:
+        # 關掉之後不再重開，之後的呼叫都直接回錯誤
+        with self._lock:
+            self._closed = True
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": self._executor is not None,
+                "calls": self.calls,
+                "crashes": self.crashes,
+                "bytes_shared": self.bytes_shared,
+            }
+
+
+class ProcessBackendProxy(OCRBackend):
+    # 對 OCRWorker 來說跟原本的後端一樣，實際辨識在子行程裡跑
+    def __init__(self, pool: ProcessBackendPool, backend: OCRBackend):
+        self._pool = pool
+        self.name = backend.name
+        self.max_atlas_side = backend.max_atlas_side
+        self.supports_line_recognition = backend.supports_line_recognition
+        self.supports_batch = backend.supports_batch
+
+    def available(self) -> bool:
+        return True
+
+    def recognize(self, image: np.ndarray) -> OCRResult:
+        return self._pool.call(self.name, "recognize", [image])
+
+    def recognize_lines(self, image: np.ndarray, boxes: Sequence[OCRBox]) -> Optional[OCRResult]:
+        return self._pool.call(self.name, "recognize_lines", [image], tuple(boxes))
+
+    def recognize_batch(self, images: Sequence[np.ndarray]) -> list[OCRResult]:
+        if not images:
+            return []
+        return self._pool.call(self.name, "recognize_batch", list(images))
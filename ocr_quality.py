@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import difflib
 import re
-from typing import Any
+from typing import Any, Optional
 
 NOISE_ONLY_PATTERN = re.compile(r"^[-_=.,|/\\:;~^]+$")
 HAS_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u4e00-\u9fff]")
+DEDUPE_GRID_CELL_PX = 96
+DEDUPE_MIN_OVERLAP = 0.5
+DEDUPE_MIN_SIMILARITY = 0.75
 
 
 def normalize_ocr_text(text: Any) -> str:
@@ -46,6 +50,82 @@ def needs_cjk_tight_join(left_text: str, right_text: str) -> bool:
     )
 
 
+def box_overlap_ratio(first: dict[str, Any], second: dict[str, Any]) -> float:
+    inter_w = min(first["x"] + first["w"], second["x"] + second["w"]) - max(first["x"], second["x"])
+    inter_h = min(first["y"] + first["h"], second["y"] + second["h"]) - max(first["y"], second["y"])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    min_area = max(1, min(first["w"] * first["h"], second["w"] * second["h"]))
+    return (inter_w * inter_h) / min_area
+
+
+def _compact_text(text: Any) -> str:
+    return re.sub(r"\s+", "", normalize_ocr_text(text))
+
+
+def is_near_duplicate_text(first: Any, second: Any) -> bool:
+    first, second = _compact_text(first), _compact_text(second)
+    if not first or not second:
+        return False
+    shorter, longer = sorted((first, second), key=len)
+    if len(shorter) >= 2 and shorter in longer:
+        return True
+    return difflib.SequenceMatcher(None, first, second).ratio() >= DEDUPE_MIN_SIMILARITY
+
+
+def _better_reading(first: dict[str, Any], second: dict[str, Any]) -> dict[str, Any]:
+    first_text, second_text = _compact_text(first["text"]), _compact_text(second["text"])
+    # 一邊是另一邊的一部分時多半是被切片邊界切掉，留完整的那個
+    if first_text != second_text and (first_text in second_text or second_text in first_text):
+        return first if len(first_text) > len(second_text) else second
+    # 各後端的信心值刻度不同（0–1、0–100 或沒有），只有同一個後端讀的才能比
+    first_conf: Optional[float] = first.get("confidence")
+    second_conf: Optional[float] = second.get("confidence")
+    same_backend = first.get("backend") == second.get("backend")
+    if same_backend and first_conf is not None and second_conf is not None and first_conf != second_conf:
+        return first if first_conf > second_conf else second
+    return first if len(first_text) >= len(second_text) else second
+
+
+def _grid_cells(item: dict[str, Any], cell: int):
+    for cell_y in range(int(item["y"]) // cell, int(item["y"] + item["h"]) // cell + 1):
+        for cell_x in range(int(item["x"]) // cell, int(item["x"] + item["w"]) // cell + 1):
+            yield cell_x, cell_y
+
+
+def dedupe_overlapping_items(items: list[dict[str, Any]], cell: int = DEDUPE_GRID_CELL_PX) -> list[dict[str, Any]]:
+    # 重疊切片會把同一行辨識兩次；用格網索引只比對附近的框，框重疊又字幾乎一樣就只留一筆
+    if len(items) < 2:
+        return list(items)
+    kept: list[dict[str, Any]] = []
+    grid: dict[tuple[int, int], list[int]] = {}
+    for item in items:
+        duplicate_of = None
+        seen = set()
+        for key in _grid_cells(item, cell):
+            for index in grid.get(key, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                other = kept[index]
+                if box_overlap_ratio(item, other) >= DEDUPE_MIN_OVERLAP and is_near_duplicate_text(item["text"], other["text"]):
+                    duplicate_of = index
+                    break
+            if duplicate_of is not None:
+                break
+        if duplicate_of is None:
+            duplicate_of = len(kept)
+            kept.append(item)
+        else:
+            better = _better_reading(kept[duplicate_of], item)
+            if better is kept[duplicate_of]:
+                continue
+            kept[duplicate_of] = better
+        for key in _grid_cells(kept[duplicate_of], cell):
+            grid.setdefault(key, []).append(duplicate_of)
+    return kept
+
+
 def merge_horizontal_lines(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     if not items:
         return []
@@ -100,7 +180,7 @@ def merge_horizontal_lines(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
 def score_ocr_items(raw_items: list[dict[str, Any]]) -> tuple[int, list[dict[str, Any]]]:
     if not raw_items:
         return -1, []
-    merged_items = merge_horizontal_lines(raw_items)
+    merged_items = merge_horizontal_lines(dedupe_overlapping_items(raw_items))
     filtered_items = [item for item in merged_items if is_valid_content(item["text"])]
     if not filtered_items:
         return 0, []
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+Rect = tuple[int, int, int, int]
+
+TEXT_REGION_WORK_MAX_SIDE = 1440
+TEXT_REGION_MIN_DENSITY = 0.045
+TEXT_REGION_MERGE_OVERLAP = 0.18
+MANGA_TOP_IGNORES = (120, 100, 80, 60, 40, 0)
+MANGA_WHITE_LEVEL = 220
+MANGA_BRIGHT_LEVEL = 180
+
+
+def clip_rects(rects: np.ndarray, img_w: int, img_h: int) -> tuple[np.ndarray, np.ndarray]:
+    # 跟單筆版本一樣：起點夾進畫面，寬高只裁右下，起點超出畫面的整筆丟掉
+    x = np.maximum(0, rects[:, 0])
+    y = np.maximum(0, rects[:, 1])
+    w = np.maximum(1, rects[:, 2])
+    h = np.maximum(1, rects[:, 3])
+    valid = (x < img_w) & (y < img_h)
+    w = np.minimum(w, img_w - x)
+    h = np.minimum(h, img_h - y)
+    valid &= (w > 0) & (h > 0)
+    return np.stack([x, y, w, h], axis=1), valid
+
+
+def expand_rects(rects: np.ndarray, pad_x: np.ndarray, pad_y: np.ndarray, img_w: int, img_h: int) -> tuple[np.ndarray, np.ndarray]:
+    grown = np.stack(
+        [rects[:, 0] - pad_x, rects[:, 1] - pad_y, rects[:, 2] + pad_x * 2, rects[:, 3] + pad_y * 2],
+        axis=1,
+    )
+    return clip_rects(grown, img_w, img_h)
+
+
+def box_sums(integral: np.ndarray, rects: np.ndarray) -> np.ndarray:
+    x1, y1 = rects[:, 0], rects[:, 1]
+    x2, y2 = x1 + rects[:, 2], y1 + rects[:, 3]
+    return integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+
+
+def merge_candidates(existing: np.ndarray, rect: np.ndarray) -> np.ndarray:
+    ex1, ey1, ew, eh = existing[:, 0], existing[:, 1], existing[:, 2], existing[:, 3]
+    rx1, ry1, rw, rh = (int(v) for v in rect)
+    ex2, ey2 = ex1 + ew, ey1 + eh
+    rx2, ry2 = rx1 + rw, ry1 + rh
+
+    inter_w = np.minimum(ex2, rx2) - np.maximum(ex1, rx1)
+    inter_h = np.minimum(ey2, ry2) - np.maximum(ey1, ry1)
+    overlapping = (inter_w > 0) & (inter_h > 0)
+    min_area = np.maximum(1, np.minimum(ew * eh, rw * rh))
+    overlap_ratio = np.where(overlapping, np.maximum(inter_w, 0) * np.maximum(inter_h, 0) / min_area, 0.0)
+
+    horizontal_gap = np.maximum(0, np.maximum(rx1 - ex2, ex1 - rx2))
+    vertical_gap = np.maximum(0, np.maximum(ry1 - ey2, ey1 - ry2))
+    avg_h = np.maximum(1, (eh + rh) // 2)
+    return (
+        (overlap_ratio >= TEXT_REGION_MERGE_OVERLAP)
+        | ((horizontal_gap <= avg_h * 2) & (vertical_gap <= avg_h))
+        | ((vertical_gap <= avg_h * 2) & (np.minimum(ew, rw) >= avg_h * 4))
+    )
+
+
+def merge_region_rects(rects: np.ndarray, scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # 依分數由高到低，每個框併進第一個夠近的既有框；比對一次對整批既有框做
+    order = np.argsort(-scores, kind="stable")
+    merged = np.zeros((len(rects), 4), dtype=np.int64)
+    merged_scores = np.zeros(len(rects), dtype=np.float64)
+    count = 0
+    for index in order:
+        rect = rects[index]
+        score = float(scores[index])
+        hits = np.flatnonzero(merge_candidates(merged[:count], rect)) if count else ()
+        if len(hits):
+            target = int(hits[0])
+            x1 = min(merged[target, 0], rect[0])
+            y1 = min(merged[target, 1], rect[1])
+            x2 = max(merged[target, 0] + merged[target, 2], rect[0] + rect[2])
+            y2 = max(merged[target, 1] + merged[target, 3], rect[1] + rect[3])
+            merged[target] = (x1, y1, x2 - x1, y2 - y1)
+            previous = merged_scores[target]
+            merged_scores[target] = max(previous, score) + min(previous, score) * 0.35
+        else:
+            merged[count] = rect
+            merged_scores[count] = score
+            count += 1
+    return merged[:count], merged_scores[:count]
+
+
+def text_region_morphology(img: np.ndarray) -> tuple[np.ndarray, float]:
+    img_h, img_w = img.shape[:2]
+    scale = 1.0
+    # 先轉灰階再縮小，INTER_AREA 只需要處理單通道
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    max_side = max(img_w, img_h)
+    if max_side > TEXT_REGION_WORK_MAX_SIDE:
+        scale = float(TEXT_REGION_WORK_MAX_SIDE) / max_side
+        gray = cv2.resize(gray, (int(img_w * scale), int(img_h * scale)), interpolation=cv2.INTER_AREA)
+
+    work_h, work_w = gray.shape[:2]
+    grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    gradient = cv2.convertScaleAbs(cv2.addWeighted(cv2.convertScaleAbs(grad_x), 0.7, cv2.convertScaleAbs(grad_y), 0.3, 0))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    kernel_w = max(12, int(work_w * 0.018))
+    kernel_h = max(3, int(work_h * 0.008))
+    close_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, kernel_h))
+    morph = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, close_kernel, iterations=2)
+    morph = cv2.dilate(morph, cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, kernel_w // 3), max(2, kernel_h))), iterations=1)
+    return morph, scale
+
+
+def contour_rects(mask: np.ndarray) -> np.ndarray:
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return np.zeros((0, 4), dtype=np.int64)
+    return np.array([cv2.boundingRect(contour) for contour in contours], dtype=np.int64)
+
+
+def detect_text_dense_regions(
+    img: np.ndarray,
+    min_area_ratio: float,
+    max_area_ratio: float,
+    max_regions: int,
+) -> list[Rect]:
+    img_h, img_w = img.shape[:2]
+    if img_h <= 0 or img_w <= 0:
+        return []
+
+    morph, scale = text_region_morphology(img)
+    work_h, work_w = morph.shape[:2]
+    rects = contour_rects(morph)
+    if not len(rects):
+        return []
+
+    x, y, w, h = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    area = w * h
+    keep = (
+        (area >= max(600, int(work_w * work_h * 0.0022)))
+        & (w >= max(40, int(work_w * 0.08)))
+        & (h >= max(16, int(work_h * 0.025)))
+        & (h <= int(work_h * 0.55))
+    )
+    # 密度用積分圖一次查完，不用每個輪廓各自 countNonZero
+    integral = cv2.integral(morph, sdepth=cv2.CV_32S)
+    density = box_sums(integral, rects) / 255.0 / np.maximum(1, area)
+    area_ratio = area / max(1, work_w * work_h)
+    keep &= (density >= TEXT_REGION_MIN_DENSITY) & (area_ratio <= 0.88)
+    if not keep.any():
+        return []
+
+    x, y, w, h = x[keep], y[keep], w[keep], h[keep]
+    density, area_ratio = density[keep], area_ratio[keep]
+    center_y_ratio = (y + h / 2) / max(1, work_h)
+    edge_penalty = np.where((center_y_ratio < 0.10) | (center_y_ratio > 0.93), 8.0, 0.0)
+    edge_penalty += np.where((x < work_w * 0.04) | ((x + w) > work_w * 0.96), 4.0, 0.0)
+    wide_bonus = np.where((w / np.maximum(1, h)) >= 3.0, 10.0, 0.0)
+    dialogue_bonus = np.where((center_y_ratio >= 0.58) & (w >= work_w * 0.28), 8.0, 0.0)
+    scores = (density * 140.0) + (area_ratio * 100.0) + wide_bonus + dialogue_bonus - edge_penalty
+
+    full_rects = np.stack(
+        [
+            (x / scale).astype(np.int64),
+            (y / scale).astype(np.int64),
+            np.maximum(1, (w / scale).astype(np.int64)),
+            np.maximum(1, (h / scale).astype(np.int64)),
+        ],
+        axis=1,
+    )
+    pad_x = np.maximum(10, (full_rects[:, 2] * 0.06).astype(np.int64))
+    pad_y = np.maximum(8, (full_rects[:, 3] * 0.20).astype(np.int64))
+    expanded, valid = expand_rects(full_rects, pad_x, pad_y, img_w, img_h)
+    if not valid.any():
+        return []
+
+    merged, merged_scores = merge_region_rects(expanded[valid], scores[valid])
+    pad = np.full(len(merged), 6, dtype=np.int64)
+    refined, valid = expand_rects(merged, pad, pad, img_w, img_h)
+    area_ratio = refined[:, 2] * refined[:, 3] / max(1, img_w * img_h)
+    valid &= area_ratio >= min_area_ratio
+    if not valid.any():
+        return []
+
+    refined, merged_scores, area_ratio = refined[valid], merged_scores[valid], area_ratio[valid]
+    order = np.lexsort((-(refined[:, 2] * refined[:, 3]), -merged_scores))
+    top = order[:max_regions]
+    total_area_ratio = float(area_ratio[top].sum())
+    if total_area_ratio < min_area_ratio or total_area_ratio > max_area_ratio:
+        return []
+    return [tuple(int(v) for v in refined[index]) for index in top]
+
+
+def detect_manga_page_region(img: np.ndarray, top_ignores: Sequence[int] = MANGA_TOP_IGNORES) -> Optional[Rect]:
+    img_h, img_w = img.shape[:2]
+    if img_h <= 0 or img_w <= 0:
+        return None
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    img_area = img_w * img_h
+    # 模糊、白色遮罩、閉運算都只做一次；各個上緣忽略量只是從同一張遮罩往下切
+    blur = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, white_mask = cv2.threshold(blur, MANGA_WHITE_LEVEL, 255, cv2.THRESH_BINARY)
+    white_mask = cv2.morphologyEx(white_mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (21, 21)), iterations=2)
+    white_mask = cv2.dilate(white_mask, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9)), iterations=1)
+    bright = cv2.integral((gray > MANGA_BRIGHT_LEVEL).astype(np.uint8), sdepth=cv2.CV_32S)
+
+    best_rect = None
+    best_score = None
+    for top_ignore in top_ignores:
+        if top_ignore >= img_h - 20:
+            continue
+        rects = contour_rects(white_mask[top_ignore:, :])
+        if not len(rects):
+            continue
+        w, h = rects[:, 2], rects[:, 3]
+        area = w * h
+        aspect = w / np.maximum(1, h)
+        keep = (area >= img_area * 0.05) & (area <= img_area * 0.90) & (aspect >= 0.25) & (aspect <= 1.25)
+        if not keep.any():
+            continue
+        rects, area = rects[keep].copy(), area[keep]
+        rects[:, 1] += top_ignore
+        bright_ratio = box_sums(bright, rects) / np.maximum(1, area)
+        keep = bright_ratio >= 0.60
+        if not keep.any():
+            continue
+        scores = (area[keep] / max(1, img_area)) * 120.0 + bright_ratio[keep] * 80.0
+        index = int(np.argmax(scores))
+        if best_score is None or scores[index] > best_score:
+            best_score = float(scores[index])
+            best_rect = tuple(int(v) for v in rects[keep][index])
+
+    if best_rect is None:
+        return None
+    x, y, w, h = best_rect
+    pad_x = max(8, int(w * 0.015))
+    pad_y = max(8, int(h * 0.015))
+    x = max(0, x - pad_x)
+    y = max(0, y - pad_y)
+    w = min(img_w - x, w + pad_x * 2)
+    h = min(img_h - y, h + pad_y * 2)
+    return (x, y, w, h)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from ocr_backends import OCRBox, OCRLine, OCRResult, OCRWord
+
+RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+RESULT_CACHE_DISK_MAX_BYTES = 128 * 1024 * 1024
+RESULT_CACHE_DIRNAME = "ocr_result_cache"
+RESULT_CACHE_ENTRY_OVERHEAD = 256
+RESULT_CACHE_LINE_OVERHEAD = 160
+
+
+def result_cache_key(digest: bytes, backend_chain: Sequence[str], backend_config: str = "") -> str:
+    # 後端設定（例如 Tesseract 的語言對照）會改變辨識結果，也要算進 key，不然磁碟上的舊結果會一直被拿出來用
+    hasher = hashlib.blake2b(digest, digest_size=16)
+    hasher.update("|".join(backend_chain).encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(str(backend_config).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def estimate_result_bytes(result: Optional[OCRResult]) -> int:
+    if result is None:
+        return RESULT_CACHE_ENTRY_OVERHEAD
+    size = RESULT_CACHE_ENTRY_OVERHEAD
+    for line in result.lines:
+        size += RESULT_CACHE_LINE_OVERHEAD + len(line.text) * 4
+        for word in line.words:
+            size += RESULT_CACHE_LINE_OVERHEAD + len(word.text) * 4
+    return size
+
+
+def _box_payload(box: OCRBox) -> list[int]:
+    return [box.x, box.y, box.w, box.h]
+
+
+def result_to_payload(result: Optional[OCRResult]) -> Optional[dict[str, Any]]:
+    if result is None:
+        return None
+    return {
+        "backend": result.backend_name,
+        "lines": [
+            {
+                "text": line.text,
+                "box": _box_payload(line.box),
+                "confidence": line.confidence,
+                "words": [[word.text, _box_payload(word.box), word.confidence] for word in line.words],
+            }
+            for line in result.lines
+        ],
+    }
+
+
+def result_from_payload(payload: Optional[dict[str, Any]]) -> Optional[OCRResult]:
+    if payload is None:
+        return None
+    lines = []
+    for line in payload.get("lines", []):
+        words = tuple(OCRWord(str(text), OCRBox(*box), confidence) for text, box, confidence in line.get("words", []))
+        lines.append(OCRLine(str(line["text"]), OCRBox(*line["box"]), line.get("confidence"), words))
+    return OCRResult(str(payload.get("backend", "")), tuple(lines))
+
+
+class OCRResultCache:
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = RESULT_CACHE_DISK_MAX_BYTES,
+    ):
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+        self.disk_dir: Optional[str] = None
+        self._entries: OrderedDict[str, tuple[Optional[OCRResult], int]] = OrderedDict()
+        self._bytes = 0
+        self._disk_entries: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+        if disk_dir:
+            self.set_disk_dir(disk_dir)
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            self._evict_memory()
+
+    def set_disk_dir(self, disk_dir: Optional[str]) -> None:
+        # 掃一次既有的檔案，照修改時間排好，超過容量時從最舊的刪
+        entries: list[tuple[float, str, int]] = []
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+                with os.scandir(disk_dir) as it:
+                    for entry in it:
+                        if entry.is_file() and entry.name.endswith(".json"):
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+            except OSError:
+                disk_dir = None
+                entries = []
+        with self._lock:
+            self.disk_dir = disk_dir or None
+            self._disk_entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._disk_bytes = sum(self._disk_entries.values())
+            self._evict_disk()
+
+    def lookup(self, key: str) -> tuple[bool, Optional[OCRResult]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return True, entry[0]
+            on_disk = self.disk_dir is not None and key in self._disk_entries
+        if on_disk:
+            result = self._read_disk(key)
+            if result is not False:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store_memory(key, result)
+                return True, result
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def remember(self, key: str, result: Optional[OCRResult]) -> None:
+        # 沒結果（後端全掛或被期限截斷）、出錯或沒讀到字的結果都不留，下次還要重跑
+        if result is None or result.error or not result.lines:
+            return
+        with self._lock:
+            self._store_memory(key, result)
+            write_disk = self.disk_dir is not None and key not in self._disk_entries
+        if write_disk:
+            self._write_disk(key, result)
+
+    def clear(self, include_disk: bool = False) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            keys = list(self._disk_entries) if include_disk else []
+            if include_disk:
+                self._disk_entries.clear()
+                self._disk_bytes = 0
+            disk_dir = self.disk_dir
+        for key in keys:
+            try:
+                os.remove(os.path.join(disk_dir, key + ".json"))
+            except OSError:
+                pass
+
+    def _store_memory(self, key: str, result: Optional[OCRResult]) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        size = estimate_result_bytes(result)
+        self._entries[key] = (result, size)
+        self._bytes += size
+        self._evict_memory()
+
+    def _evict_memory(self) -> None:
+        while self._entries and self._bytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def _evict_disk(self) -> list[str]:
+        removed = []
+        while self._disk_entries and self._disk_bytes > self.disk_max_bytes:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_bytes -= size
+            removed.append(key)
+        if removed and self.disk_dir:
+            for key in removed:
+                try:
+                    os.remove(os.path.join(self.disk_dir, key + ".json"))
+                except OSError:
+                    pass
+        return removed
+
+    def _read_disk(self, key: str):
+        path = os.path.join(self.disk_dir or "", key + ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                result = result_from_payload(json.load(fp))
+            if result is None:
+                # 舊版會把 None 寫成 null，當成沒有這筆
+                raise ValueError("empty cache entry")
+            return result
+        except Exception:
+            with self._lock:
+                self.disk_errors += 1
+                size = self._disk_entries.pop(key, 0)
+                self._disk_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+
+    def _write_disk(self, key: str, result: Optional[OCRResult]) -> None:
+        disk_dir = self.disk_dir
+        if not disk_dir:
+            return
+        path = os.path.join(disk_dir, key + ".json")
+        temp_path = path + ".tmp"
+        try:
+            data = json.dumps(result_to_payload(result), ensure_ascii=False).encode("utf-8")
+            with open(temp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            with self._lock:
+                self.disk_errors += 1
+            return
+        with self._lock:
+            self._disk_entries[key] = len(data)
+            self._disk_entries.move_to_end(key)
+            self._disk_bytes += len(data)
+            self._evict_disk()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / max(1, lookups),
+                "disk_entries": len(self._disk_entries),
+                "disk_bytes": self._disk_bytes,
+                "disk_errors": self.disk_errors,
+            }
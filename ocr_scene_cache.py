@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+import cv2
+import numpy as np
+
+SCENE_HISTOGRAM_BINS = 32
+SCENE_SAMPLE_MAX_SIDE = 256
+SCENE_DRIFT_TOLERANCE = 0.18
+SCENE_CACHE_LIMIT = 32
+
+
+@dataclass(frozen=True)
+class SceneSignature:
+    histogram: np.ndarray
+
+    def distance(self, other: "SceneSignature") -> float:
+        if self.histogram.shape != other.histogram.shape:
+            return 1.0
+        return float(np.abs(self.histogram - other.histogram).sum()) * 0.5
+
+
+def compute_scene_signature(
+    img: np.ndarray,
+    regions: Optional[Sequence[Sequence[int]]] = None,
+    bins: int = SCENE_HISTOGRAM_BINS,
+) -> SceneSignature:
+    img_h, img_w = img.shape[:2]
+    histogram = np.zeros(bins, dtype=np.float64)
+    for region_x, region_y, region_w, region_h in regions or [(0, 0, img_w, img_h)]:
+        crop = img[region_y:region_y + region_h, region_x:region_x + region_w]
+        if crop.size == 0:
+            continue
+        gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        # 只看亮度分布，先縮小再算直方圖就夠用了
+        max_side = max(gray.shape[:2])
+        if max_side > SCENE_SAMPLE_MAX_SIDE:
+            scale = SCENE_SAMPLE_MAX_SIDE / max_side
+            gray = cv2.resize(gray, (max(1, int(gray.shape[1] * scale)), max(1, int(gray.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+        histogram += cv2.calcHist([gray], [0], None, [bins], [0, 256]).ravel()
+    total = histogram.sum()
+    if total > 0:
+        histogram /= total
+    return SceneSignature(histogram.astype(np.float32))
+
+
+class SceneThresholdCache:
+    def __init__(self, tolerance: float = SCENE_DRIFT_TOLERANCE, limit: int = SCENE_CACHE_LIMIT):
+        self.tolerance = float(tolerance)
+        self.limit = int(limit)
+        self._entries: OrderedDict[int, tuple[SceneSignature, int]] = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _nearest(self, signature: SceneSignature) -> Optional[int]:
+        best_id = None
+        best_distance = self.tolerance
+        for entry_id, (known, _) in self._entries.items():
+            distance = signature.distance(known)
+            if distance <= best_distance:
+                best_id = entry_id
+                best_distance = distance
+        return best_id
+
+    def lookup(self, signature: SceneSignature) -> Optional[int]:
+        entry_id = self._nearest(signature)
+        if entry_id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][1]
+
+    def remember(self, signature: SceneSignature, threshold: int) -> None:
+        entry_id = self._nearest(signature)
+        if entry_id is None:
+            entry_id = self._next_id
+            self._next_id += 1
+        self._entries[entry_id] = (signature, int(threshold))
+        self._entries.move_to_end(entry_id)
+        while len(self._entries) > self.limit:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "scenes": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / max(1, lookups),
+        }
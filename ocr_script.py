@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Mapping, Optional
+
+import cv2
+import numpy as np
+
+from ocr_preprocess import glyph_components
+
+SCRIPT_LATIN = "latin"
+SCRIPT_JAPANESE = "japanese"
+SCRIPT_CHINESE = "chinese"
+SCRIPT_MIXED = "mixed"
+
+DEFAULT_TESSERACT_LANG_MAP: dict[str, str] = {
+    SCRIPT_LATIN: "eng",
+    SCRIPT_JAPANESE: "jpn",
+    SCRIPT_CHINESE: "chi_tra",
+    SCRIPT_MIXED: "chi_tra+jpn+eng",
+}
+
+SCRIPT_MIN_COMPONENTS = 8
+SCRIPT_PRIOR_MIN_CHARS = 30
+SCRIPT_PRIOR_DECAY = 0.98
+SCRIPT_KANA_SHARE = 0.2
+SCRIPT_HAN_ONLY_SHARE = 0.02
+
+
+def text_script_counts(text: str) -> tuple[int, int, int]:
+    latin = kana = han = 0
+    for ch in str(text or ""):
+        code = ord(ch)
+        if 0x3040 <= code <= 0x30FF or 0x31F0 <= code <= 0x31FF or 0xFF66 <= code <= 0xFF9D:
+            kana += 1
+        elif 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0xF900 <= code <= 0xFAFF:
+            han += 1
+        elif ("a" <= ch <= "z") or ("A" <= ch <= "Z"):
+            latin += 1
+    return latin, kana, han
+
+
+def crop_looks_latin(crop: np.ndarray) -> Optional[bool]:
+    # True = 拉丁字母、False = 方塊字、None = 看不出來（交給合併語言模型）
+    stats, _, _ = glyph_components(crop)
+    if len(stats) < SCRIPT_MIN_COMPONENTS:
+        return None
+    heights = stats[:, cv2.CC_STAT_HEIGHT].astype(np.float32)
+    widths = stats[:, cv2.CC_STAT_WIDTH].astype(np.float32)
+    full_height = float(np.percentile(heights, 90))
+    if full_height < 4:
+        return None
+    # 小寫字母大多只有 x-height 高、寬度約半個字高；方塊字常有整字寬或比高度還寬的部件
+    x_height = np.count_nonzero((heights >= full_height * 0.4) & (heights <= full_height * 0.75)) / len(stats)
+    tall = np.count_nonzero(heights > full_height * 0.85) / len(stats)
+    full_width = np.count_nonzero(widths >= full_height * 0.8) / len(stats)
+    wide = np.count_nonzero(widths > heights * 1.1) / len(stats)
+    if x_height >= 0.35 and tall >= 0.1 and full_width <= 0.1 and wide <= 0.1:
+        return True
+    if full_width >= 0.25 or wide >= 0.2:
+        return False
+    return None
+
+
+class ScriptRouter:
+    def __init__(self, lang_map: Optional[Mapping[str, str]] = None):
+        self.lang_map = dict(DEFAULT_TESSERACT_LANG_MAP)
+        self._lock = threading.Lock()
+        self._kana = 0.0
+        self._han = 0.0
+        self._latency: dict[str, dict[str, float]] = {}
+        if lang_map:
+            self.set_lang_map(lang_map)
+
+    def set_lang_map(self, lang_map: Mapping[str, str]) -> None:
+        merged = dict(DEFAULT_TESSERACT_LANG_MAP)
+        for script, lang in dict(lang_map or {}).items():
+            script = str(script or "").strip().lower()
+            lang = str(lang or "").strip()
+            if script in merged and lang:
+                merged[script] = lang
+        self.lang_map = merged
+
+    @property
+    def fallback_lang(self) -> str:
+        return self.lang_map[SCRIPT_MIXED]
+
+    def cjk_script(self) -> str:
+        # 方塊字分不出日文或中文，看這段時間讀到的字裡假名佔多少
+        with self._lock:
+            kana, han = self._kana, self._han
+        if kana + han < SCRIPT_PRIOR_MIN_CHARS:
+            return SCRIPT_MIXED
+        share = kana / (kana + han)
+        if share >= SCRIPT_KANA_SHARE:
+            return SCRIPT_JAPANESE
+        if share <= SCRIPT_HAN_ONLY_SHARE:
+            return SCRIPT_CHINESE
+        return SCRIPT_MIXED
+
+    def route(self, image: np.ndarray) -> tuple[str, str]:
+        looks_latin = crop_looks_latin(image)
+        if looks_latin is None:
+            script = SCRIPT_MIXED
+        elif looks_latin:
+            script = SCRIPT_LATIN
+        else:
+            script = self.cjk_script()
+        return script, self.lang_map[script]
+
+    def observe(self, text: str) -> None:
+        _, kana, han = text_script_counts(text)
+        if kana + han == 0:
+            return
+        with self._lock:
+            self._kana = self._kana * SCRIPT_PRIOR_DECAY + kana
+            self._han = self._han * SCRIPT_PRIOR_DECAY + han
+
+    def record(self, lang: str, elapsed_ms: float, fallback: bool = False) -> None:
+        with self._lock:
+            entry = self._latency.setdefault(lang, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "fallbacks": 0})
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            if fallback:
+                entry["fallbacks"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._kana = 0.0
+            self._han = 0.0
+            self._latency.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            langs = {
+                lang: {
+                    "calls": int(entry["calls"]),
+                    "mean_ms": entry["total_ms"] / max(1, entry["calls"]),
+                    "max_ms": entry["max_ms"],
+                    "fallbacks": int(entry["fallbacks"]),
+                }
+                for lang, entry in self._latency.items()
+            }
+            kana, han = self._kana, self._han
+        return {
+            "lang_map": dict(self.lang_map),
+            "cjk_script": self.cjk_script(),
+            "kana_share": kana / max(1e-9, kana + han) if kana + han else 0.0,
+            "langs": langs,
+        }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Hashable, Optional
+
+import cv2
+import numpy as np
+
+TEXT_GATE_SAMPLE_MAX_SIDE = 640
+TEXT_GATE_GLYPH_TARGET = 4
+TEXT_GATE_NOISE_DENSITY = 0.25
+DEFAULT_TEXT_GATE_THRESHOLD = 0.25
+
+
+def text_likelihood(crop: np.ndarray) -> float:
+    gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape[:2]
+    if h < 4 or w < 4:
+        return 0.0
+    scale = min(1.0, TEXT_GATE_SAMPLE_MAX_SIDE / max(h, w))
+    if scale < 1.0:
+        gray = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    edges = cv2.Canny(gray, 50, 150)
+    edge_density = cv2.countNonZero(edges) / max(1, edges.size)
+    if edge_density <= 0.0:
+        return 0.0
+
+    # 字的邊緣會斷成很多小而方正的片段；純色、漸層、大塊插畫都湊不出來
+    count, _, stats, _ = cv2.connectedComponentsWithStats(edges, connectivity=8)
+    heights = stats[1:count, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:count, cv2.CC_STAT_WIDTH]
+    areas = stats[1:count, cv2.CC_STAT_AREA]
+    glyphs = int(np.count_nonzero(
+        (heights >= 3)
+        & (heights <= max(3, gray.shape[0] / 4))
+        & (widths <= heights * 4)
+        & (areas >= 4)
+    ))
+    likelihood = min(1.0, glyphs / TEXT_GATE_GLYPH_TARGET)
+    if edge_density > TEXT_GATE_NOISE_DENSITY:
+        likelihood *= TEXT_GATE_NOISE_DENSITY / edge_density
+    return float(likelihood)
+
+
+class TextPresenceGate:
+    def __init__(self, threshold: float = DEFAULT_TEXT_GATE_THRESHOLD):
+        self.threshold = max(0.0, min(1.0, float(threshold)))
+        self._frame: Optional[np.ndarray] = None
+        self._likelihoods: dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.crops_checked = 0
+        self.rejections = 0
+        self.calls_saved = 0
+        self.scan_rejections = 0
+        self.scan_calls_saved = 0
+
+    def set_threshold(self, threshold: float) -> None:
+        self.threshold = max(0.0, min(1.0, float(threshold)))
+
+    def bind_frame(self, frame: np.ndarray) -> None:
+        # 每張截圖重新計一次「這輪省了幾次」
+        with self._lock:
+            if frame is self._frame:
+                return
+            self._frame = frame
+            self._likelihoods.clear()
+            self.scan_rejections = 0
+            self.scan_calls_saved = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frame = None
+            self._likelihoods.clear()
+
+    def likelihood(self, crop_key: Hashable, crop: np.ndarray) -> float:
+        with self._lock:
+            cached = self._likelihoods.get(crop_key)
+        if cached is None:
+            cached = text_likelihood(crop)
+            with self._lock:
+                self._likelihoods[crop_key] = cached
+                self.crops_checked += 1
+        return cached
+
+    def allows(self, crop_key: Hashable, crop: np.ndarray, backend_calls: int = 1) -> bool:
+        if self.threshold <= 0.0:
+            return True
+        if self.likelihood(crop_key, crop) >= self.threshold:
+            return True
+        with self._lock:
+            self.rejections += 1
+            self.calls_saved += int(backend_calls)
+            self.scan_rejections += 1
+            self.scan_calls_saved += int(backend_calls)
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "crops_checked": self.crops_checked,
+            "rejections": self.rejections,
+            "calls_saved": self.calls_saved,
+            "scan_rejections": self.scan_rejections,
+            "scan_calls_saved": self.scan_calls_saved,
+        }
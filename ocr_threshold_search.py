@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, Optional, Sequence
+
+THRESHOLD_SEARCH_GRID = "grid"
+THRESHOLD_SEARCH_GOLDEN = "golden"
+THRESHOLD_SEARCH_STRATEGIES = (THRESHOLD_SEARCH_GOLDEN, THRESHOLD_SEARCH_GRID)
+DEFAULT_THRESHOLD_SEARCH_STRATEGY = THRESHOLD_SEARCH_GOLDEN
+GOLDEN_RATIO = (1 + math.sqrt(5)) / 2
+
+ThresholdEvaluator = Callable[[Sequence[int]], Dict[int, int]]
+
+
+def best_threshold_of(scores: Dict[int, int]) -> Optional[int]:
+    best_threshold = None
+    best_score = None
+    for threshold in sorted(scores):
+        if best_score is None or scores[threshold] > best_score:
+            best_threshold = threshold
+            best_score = scores[threshold]
+    return best_threshold
+
+
+class ThresholdSearchStrategy:
+    name = "unknown"
+
+    def __init__(self, low: int, high: int):
+        self.low = int(low)
+        self.high = int(high)
+
+    def clamp(self, value: float) -> int:
+        return max(self.low, min(self.high, int(round(value))))
+
+    def search(self, evaluate: ThresholdEvaluator, base_threshold: int) -> None:
+        raise NotImplementedError
+
+
+class GridThresholdSearch(ThresholdSearchStrategy):
+    name = THRESHOLD_SEARCH_GRID
+
+    def __init__(self, low: int, high: int, candidates: Sequence[int], local_offsets: Sequence[int]):
+        super().__init__(low, high)
+        self.candidates = tuple(int(value) for value in candidates)
+        self.local_offsets = tuple(int(value) for value in local_offsets)
+
+    def search(self, evaluate: ThresholdEvaluator, base_threshold: int) -> None:
+        scores = evaluate(sorted({self.clamp(value) for value in self.candidates}))
+        best = best_threshold_of(scores)
+        if best is None:
+            return
+        local_candidates = sorted({self.clamp(best + offset) for offset in self.local_offsets})
+        if len(local_candidates) > 1:
+            evaluate(local_candidates)
+
+
+class GoldenSectionThresholdSearch(ThresholdSearchStrategy):
+    name = THRESHOLD_SEARCH_GOLDEN
+
+    def __init__(self, low: int, high: int, min_bracket: int = 10, plateau_rounds: int = 2, max_evaluations: int = 9):
+        super().__init__(low, high)
+        self.min_bracket = max(2, int(min_bracket))
+        self.plateau_rounds = max(1, int(plateau_rounds))
+        self.max_evaluations = max(3, int(max_evaluations))
+
+    def search(self, evaluate: ThresholdEvaluator, base_threshold: int) -> None:
+        # 分數對閥值大致是單峰：先夾出區間再往高分那側收斂，分數連續幾輪沒進步就提早收工
+        low, high = self.low, self.high
+        left = self.clamp(high - (high - low) / GOLDEN_RATIO)
+        right = self.clamp(low + (high - low) / GOLDEN_RATIO)
+        scores = dict(evaluate(sorted({left, right, self.clamp(base_threshold)})))
+        best_score = max(scores.values())
+        plateau = 0
+
+        while (high - low) > self.min_bracket and len(scores) < self.max_evaluations:
+            if scores[left] >= scores[right]:
+                high = right
+                right = left
+                left = self.clamp(high - (high - low) / GOLDEN_RATIO)
+                probe = left
+            else:
+                low = left
+                left = right
+                right = self.clamp(low + (high - low) / GOLDEN_RATIO)
+                probe = right
+            if left >= right:
+                break
+            if probe not in scores:
+                scores.update(evaluate([probe]))
+            if scores[probe] > best_score:
+                best_score = scores[probe]
+                plateau = 0
+            else:
+                plateau += 1
+                if plateau >= self.plateau_rounds:
+                    break
+
+
+def create_threshold_search(
+    name: str,
+    low: int,
+    high: int,
+    grid_candidates: Sequence[int],
+    grid_local_offsets: Sequence[int],
+) -> ThresholdSearchStrategy:
+    name = normalize_threshold_search_name(name)
+    if name == THRESHOLD_SEARCH_GRID:
+        return GridThresholdSearch(low, high, grid_candidates, grid_local_offsets)
+    return GoldenSectionThresholdSearch(low, high)
+
+
+def normalize_threshold_search_name(name: str) -> str:
+    name = str(name or "").strip().lower()
+    return name if name in THRESHOLD_SEARCH_STRATEGIES else DEFAULT_THRESHOLD_SEARCH_STRATEGY
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+import cv2
+import numpy as np
+
+TILE_SIZE_PX = 160
+TILE_SAMPLE = 8
+TILE_TOLERANCE = 18
+TILE_MAX_DIRTY_RATIO = 0.6
+TILE_CACHE_LIMIT = 64
+
+
+@dataclass(frozen=True)
+class TilePlan:
+    thumbnail: np.ndarray
+    grid: tuple[int, int]
+    full: bool
+    dirty_rects: tuple[tuple[int, int, int, int], ...] = ()
+    kept_items: tuple[dict[str, Any], ...] = ()
+    dirty_tiles: int = 0
+
+
+@dataclass
+class _TileEntry:
+    thumbnail: np.ndarray
+    items: list[dict[str, Any]]
+
+
+def tile_grid_for(width: int, height: int, tile_size: int = TILE_SIZE_PX) -> tuple[int, int]:
+    rows = max(1, int(math.ceil(height / max(1, tile_size))))
+    cols = max(1, int(math.ceil(width / max(1, tile_size))))
+    return rows, cols
+
+
+def tile_thumbnail(crop: np.ndarray, grid: tuple[int, int]) -> np.ndarray:
+    gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    rows, cols = grid
+    return cv2.resize(gray, (cols * TILE_SAMPLE, rows * TILE_SAMPLE), interpolation=cv2.INTER_AREA)
+
+
+def dirty_tile_mask(previous: np.ndarray, current: np.ndarray, grid: tuple[int, int], tolerance: int = TILE_TOLERANCE) -> np.ndarray:
+    rows, cols = grid
+    diff = cv2.absdiff(previous, current)
+    return diff.reshape(rows, TILE_SAMPLE, cols, TILE_SAMPLE).max(axis=(1, 3)) > int(tolerance)
+
+
+def grow_dirty_mask(mask: np.ndarray) -> np.ndarray:
+    # 往外多抓一格，讓跨格的文字行能整行重新辨識
+    return cv2.dilate(mask.astype(np.uint8), np.ones((3, 3), np.uint8), iterations=1)
+
+
+def dirty_tile_rects(grown: np.ndarray, width: int, height: int) -> list[tuple[int, int, int, int]]:
+    rows, cols = grown.shape
+    count, _, stats, _ = cv2.connectedComponentsWithStats(grown, connectivity=8)
+    rects = []
+    for index in range(1, count):
+        col, row, span_cols, span_rows = (int(v) for v in stats[index][:4])
+        x1 = int(col * width / cols)
+        y1 = int(row * height / rows)
+        x2 = int(math.ceil((col + span_cols) * width / cols))
+        y2 = int(math.ceil((row + span_rows) * height / rows))
+        rects.append((x1, y1, max(1, min(width, x2) - x1), max(1, min(height, y2) - y1)))
+    return rects
+
+
+def _overlaps(item: dict[str, Any], rect: tuple[int, int, int, int]) -> bool:
+    x, y, w, h = rect
+    return item["x"] < x + w and x < item["x"] + item["w"] and item["y"] < y + h and y < item["y"] + item["h"]
+
+
+def absorb_overlapping_items(
+    rect: tuple[int, int, int, int],
+    items: list[dict[str, Any]],
+    width: int,
+    height: int,
+) -> tuple[int, int, int, int]:
+    # 跟髒區塊只擦到邊的舊文字行也一起重辨識，避免半行殘影被當成另一筆
+    x1, y1, w, h = rect
+    x2, y2 = x1 + w, y1 + h
+    for item in items:
+        if not _overlaps(item, (x1, y1, x2 - x1, y2 - y1)):
+            continue
+        x1 = min(x1, int(item["x"]))
+        y1 = min(y1, int(item["y"]))
+        x2 = max(x2, int(item["x"] + item["w"]))
+        y2 = max(y2, int(item["y"] + item["h"]))
+    x1, y1 = max(0, x1), max(0, y1)
+    x2, y2 = min(width, x2), min(height, y2)
+    return (x1, y1, max(1, x2 - x1), max(1, y2 - y1))
+
+
+class DirtyTileCache:
+    def __init__(
+        self,
+        tile_size: int = TILE_SIZE_PX,
+        tolerance: int = TILE_TOLERANCE,
+        max_dirty_ratio: float = TILE_MAX_DIRTY_RATIO,
+        limit: int = TILE_CACHE_LIMIT,
+    ):
+        self.tile_size = int(tile_size)
+        self.tolerance = int(tolerance)
+        self.max_dirty_ratio = float(max_dirty_ratio)
+        self.limit = int(limit)
+        self._entries: OrderedDict[Hashable, _TileEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.tiles_seen = 0
+        self.tiles_reocr = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def plan(self, cache_key: Hashable, crop: np.ndarray, origin_x: int, origin_y: int) -> TilePlan:
+        crop_h, crop_w = crop.shape[:2]
+        grid = tile_grid_for(crop_w, crop_h, self.tile_size)
+        thumbnail = tile_thumbnail(crop, grid)
+        tile_count = grid[0] * grid[1]
+        with self._lock:
+            self.tiles_seen += tile_count
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+        if entry is None or entry.thumbnail.shape != thumbnail.shape:
+            self._count_reocr(tile_count)
+            return TilePlan(thumbnail, grid, True, dirty_tiles=tile_count)
+
+        mask = dirty_tile_mask(entry.thumbnail, thumbnail, grid, self.tolerance)
+        dirty_count = int(mask.sum())
+        if dirty_count == 0:
+            return TilePlan(thumbnail, grid, False, (), tuple(entry.items), 0)
+        if dirty_count / max(1, tile_count) > self.max_dirty_ratio:
+            self._count_reocr(tile_count)
+            return TilePlan(thumbnail, grid, True, dirty_tiles=dirty_count)
+
+        grown = grow_dirty_mask(mask)
+        rects = dirty_tile_rects(grown, crop_w, crop_h)
+        self._count_reocr(int(grown.sum()))
+        local_items = [
+            {**item, "x": item["x"] - origin_x, "y": item["y"] - origin_y}
+            for item in entry.items
+        ]
+        rects = [absorb_overlapping_items(rect, local_items, crop_w, crop_h) for rect in rects]
+        kept = tuple(
+            item for item, local in zip(entry.items, local_items)
+            if not any(_overlaps(local, rect) for rect in rects)
+        )
+        return TilePlan(thumbnail, grid, False, tuple(rects), kept, dirty_count)
+
+    def _count_reocr(self, tiles: int) -> None:
+        with self._lock:
+            self.tiles_reocr += tiles
+
+    def commit(self, cache_key: Hashable, plan: TilePlan, items: list[dict[str, Any]]) -> None:
+        entry = _TileEntry(plan.thumbnail, [dict(item) for item in items])
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.limit:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, cache_key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(cache_key, None)
+
+    def stats(self) -> dict[str, Any]:
+        seen = max(1, self.tiles_seen)
+        return {
+            "tiles_seen": self.tiles_seen,
+            "tiles_reocr": self.tiles_reocr,
+            "reocr_ratio": self.tiles_reocr / seen,
+        }
@@ -0,0 +1,37 @@
+import numpy as np
+
+from ocr_atlas import plan_atlases, render_atlas, split_atlas_result
+from ocr_backends import OCRBox, OCRLine, OCRResult
+
+
+def _crop(w, h, background):
+    crop = np.full((h, w, 3), background, dtype=np.uint8)
+    crop[h // 3:2 * h // 3, 2:w - 2] = 255 - background
+    return crop
+
+
+def test_plan_atlases_stacks_with_gaps_and_respects_limits():
+    atlases = plan_atlases([(100, 20), (60, 30), (80, 40)], max_side=200, max_pixels=10**6, gap=10)
+    assert len(atlases) == 1
+    assert [slot.y for slot in atlases[0].slots] == [0, 30, 70]
+    assert (atlases[0].width, atlases[0].height) == (100, 110)
+    assert len(plan_atlases([(100, 20), (60, 30), (80, 40)], max_side=100, max_pixels=10**6, gap=10)) == 2
+
+
+def test_render_atlas_pads_each_crop_with_its_own_background():
+    crops = [_crop(100, 20, 0), _crop(60, 30, 255)]
+    atlas = plan_atlases([(c.shape[1], c.shape[0]) for c in crops], 500, 10**6, gap=10)[0]
+    canvas = render_atlas(atlas, crops)
+    first, second = atlas.slots
+    assert (canvas[first.y:first.y + first.h] == crops[0]).all()
+    assert (canvas[20:25] == 0).all()
+    assert (canvas[25:30] == 255).all()
+    assert (canvas[second.y:second.y + second.h, 60:] == 255).all()
+
+
+def test_split_atlas_result_maps_lines_back_to_their_slot():
+    atlas = plan_atlases([(100, 20), (100, 20)], 500, 10**6, gap=10)[0]
+    lines = (OCRLine("a", OCRBox(5, 2, 50, 15)), OCRLine("b", OCRBox(5, 32, 50, 15)))
+    split = split_atlas_result(OCRResult("fake", lines), atlas)
+    assert [line.text for line in split[0].lines] == ["a"]
+    assert split[1].lines[0].box == OCRBox(5, 2, 50, 15)
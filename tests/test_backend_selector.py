@@ -0,0 +1,65 @@
+import numpy as np
+
+from ocr_backend_selector import BackendSelector
+from ocr_scene_cache import SceneSignature
+
+
+class _Backend:
+    def __init__(self, name):
+        self.name = name
+
+
+BACKENDS = [_Backend("windows"), _Backend("rapidocr")]
+
+
+def _scan(selector, context, winner, crops=3):
+    selector.begin_scan(context, BACKENDS)
+    chosen, exploring = selector.choose(context, BACKENDS)
+    for _ in range(crops):
+        selector.tally(context, winner)
+    selector.finish_scan(context)
+    return [backend.name for backend in chosen], exploring
+
+
+def test_explores_until_a_leader_is_settled_then_runs_only_it():
+    selector = BackendSelector(min_trials=4, explore_rate=0.0, seed=1)
+    # 舊回合會衰減，累積到 4 回合要跑 5 次
+    for _ in range(5):
+        assert _scan(selector, "ctx", "rapidocr") == (["windows", "rapidocr"], True)
+    assert _scan(selector, "ctx", "rapidocr") == (["rapidocr"], False)
+    stats = selector.stats()["contexts"]["ctx"]
+    assert stats["leader"] == "rapidocr"
+    assert (stats["explores"], stats["exploits"]) == (5, 1)
+
+
+def test_a_scan_counts_as_one_round_however_many_crops():
+    selector = BackendSelector(min_trials=4, explore_rate=0.0, seed=1)
+    _scan(selector, "ctx", "rapidocr", crops=50)
+    assert _scan(selector, "ctx", "rapidocr")[1]
+
+
+def test_choose_without_a_scan_runs_every_backend():
+    selector = BackendSelector()
+    assert selector.choose("ctx", BACKENDS) == (BACKENDS, False)
+    assert selector.choose(None, BACKENDS) == (BACKENDS, False)
+
+
+def test_fallbacks_erode_the_leader():
+    selector = BackendSelector(min_trials=2, min_win_rate=0.7, explore_rate=0.0, seed=1)
+    for _ in range(2):
+        _scan(selector, "ctx", "rapidocr")
+    for _ in range(2):
+        selector.begin_scan("ctx", BACKENDS)
+        selector.tally_fallback("ctx")
+        selector.finish_scan("ctx")
+    assert _scan(selector, "ctx", "rapidocr")[1]
+
+
+def test_similar_scenes_share_a_context():
+    selector = BackendSelector()
+    first = SceneSignature(np.array([0.5, 0.5], dtype=np.float32))
+    close = SceneSignature(np.array([0.55, 0.45], dtype=np.float32))
+    far = SceneSignature(np.array([1.0, 0.0], dtype=np.float32))
+    assert selector.context_for("full", first) == selector.context_for("full", close)
+    assert selector.context_for("full", first) != selector.context_for("full", far)
+    assert selector.context_for("region", first) != selector.context_for("full", first)
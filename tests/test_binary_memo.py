@@ -0,0 +1,46 @@
+import numpy as np
+
+from ocr_binary_memo import BinaryMaskMemo, binary_digest, differing_fraction, binary_thumbnail
+
+
+def _mask(extra=0):
+    mask = np.zeros((100, 200), dtype=np.uint8)
+    mask[20:60, 10:150] = 255
+    mask[70:70 + extra, 0:2] = 255
+    return mask
+
+
+def test_digest_tracks_content_and_shape():
+    assert binary_digest(_mask()) == binary_digest(_mask())
+    assert binary_digest(_mask()) != binary_digest(_mask(2))
+    assert binary_digest(np.zeros((4, 8), np.uint8)) != binary_digest(np.zeros((8, 4), np.uint8))
+
+
+def test_differing_fraction_is_pixel_share():
+    first, second = _mask(), _mask(10)
+    assert differing_fraction(binary_thumbnail(first), binary_thumbnail(first)) == 0.0
+    assert abs(differing_fraction(binary_thumbnail(first), binary_thumbnail(second)) - 20 / 20000) < 1e-6
+
+
+def test_exact_hits_within_a_round_near_hits_only_from_earlier_rounds():
+    memo = BinaryMaskMemo(tolerance=0.01)
+    memo.begin_round()
+    hit, _, fingerprint = memo.lookup("key", _mask())
+    assert not hit
+    memo.remember("key", fingerprint, "first")
+    assert memo.lookup("key", _mask())[:2] == (True, "first")
+    assert not memo.lookup("key", _mask(2))[0]
+    memo.begin_round()
+    assert memo.lookup("key", _mask(2))[:2] == (True, "first")
+    assert not memo.lookup("other", _mask(2))[0]
+
+
+def test_new_frame_clears_entries_and_key_limit_drops_oldest():
+    memo = BinaryMaskMemo(tolerance=0.0, key_limit=2)
+    memo.bind_frame(np.zeros(1))
+    for extra, result in ((0, "a"), (2, "b"), (4, "c")):
+        memo.remember("key", memo.lookup("key", _mask(extra))[2], result)
+    assert not memo.lookup("key", _mask(0))[0]
+    assert memo.lookup("key", _mask(4))[:2] == (True, "c")
+    memo.bind_frame(np.zeros(1))
+    assert not memo.lookup("key", _mask(4))[0]
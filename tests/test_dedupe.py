@@ -0,0 +1,34 @@
+from ocr_quality import box_overlap_ratio, dedupe_overlapping_items, is_near_duplicate_text
+
+
+def _item(text, x, y, w=200, h=30, confidence=None, backend="rapidocr"):
+    return {"text": text, "x": x, "y": y, "w": w, "h": h, "confidence": confidence, "backend": backend}
+
+
+def test_overlap_ratio_uses_the_smaller_box():
+    assert box_overlap_ratio(_item("a", 0, 0), _item("b", 0, 0, 100, 30)) == 1.0
+    assert box_overlap_ratio(_item("a", 0, 0), _item("b", 500, 0)) == 0.0
+
+
+def test_near_duplicate_text():
+    assert is_near_duplicate_text("Hello world", "Hello  world")
+    assert is_near_duplicate_text("Hello world again", "world again")
+    assert not is_near_duplicate_text("Hello world", "Goodbye moon")
+
+
+def test_overlapping_tiles_keep_the_complete_reading():
+    items = [_item("The door is lo", 10, 100), _item("The door is locked.", 12, 101, 260)]
+    kept = dedupe_overlapping_items(items)
+    assert [item["text"] for item in kept] == ["The door is locked."]
+
+
+def test_distinct_lines_and_distant_repeats_are_kept():
+    items = [_item("Press any key", 10, 10), _item("Press any key", 10, 400), _item("Quest updated", 10, 12)]
+    assert len(dedupe_overlapping_items(items)) == 3
+
+
+def test_confidence_only_breaks_ties_within_one_backend():
+    same = [_item("Hel1o world", 10, 10, confidence=0.6), _item("Hello world", 10, 10, confidence=0.9)]
+    assert dedupe_overlapping_items(same)[0]["text"] == "Hello world"
+    mixed = [_item("Hello world", 10, 10, confidence=0.95, backend="easyocr"), _item("Hel1o world", 10, 10, confidence=90, backend="tesseract")]
+    assert dedupe_overlapping_items(mixed)[0]["text"] == "Hello world"
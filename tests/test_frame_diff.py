@@ -0,0 +1,34 @@
+import numpy as np
+
+from ocr_frame_diff import FrameChangeDetector, compute_frame_fingerprint, hamming_distance, tile_difference_mask
+
+
+def _frame(value=60):
+    img = np.full((240, 320, 3), value, dtype=np.uint8)
+    img[100:140, 40:280] = 220
+    return img
+
+
+def test_fingerprint_is_stable_for_identical_frames():
+    first, second = compute_frame_fingerprint(_frame()), compute_frame_fingerprint(_frame())
+    assert hamming_distance(first.dhash, second.dhash) == 0
+    assert not tile_difference_mask(first, second).any()
+
+
+def test_small_change_marks_only_its_tile():
+    changed = _frame()
+    changed[10:30, 10:30] = 255
+    mask = tile_difference_mask(compute_frame_fingerprint(_frame()), compute_frame_fingerprint(changed))
+    assert mask[0, 0] and mask.sum() == 1
+
+
+def test_detector_skips_only_same_frame_in_same_context():
+    detector = FrameChangeDetector()
+    reference = compute_frame_fingerprint(_frame())
+    assert not detector.is_unchanged(reference, "ctx")
+    detector.remember(reference, "ctx")
+    assert detector.is_unchanged(compute_frame_fingerprint(_frame()), "ctx")
+    assert not detector.is_unchanged(compute_frame_fingerprint(_frame()), "other")
+    assert not detector.is_unchanged(compute_frame_fingerprint(_frame(120)), "ctx")
+    detector.reset()
+    assert not detector.is_unchanged(compute_frame_fingerprint(_frame()), "ctx")
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+
+from ocr_backends import OCRBackend, OCRBox, OCRLine, OCRResult, OCRWord
+from ocr_line_boxes import KnownLineBoxes, accept_line_result, fit_line_boxes, merge_line_bands
+
+
+def _result(*boxes, backend="lines"):
+    return OCRResult(backend, tuple(OCRLine("text", box, 0.9) for box in boxes))
+
+
+def test_merge_line_bands_joins_segments_on_the_same_row():
+    bands = merge_line_bands([OCRBox(100, 10, 50, 20), OCRBox(0, 12, 40, 20), OCRBox(0, 60, 80, 20)])
+    assert bands == [OCRBox(0, 10, 150, 22), OCRBox(0, 60, 80, 20)]
+
+
+def test_fit_line_boxes_rejects_ink_outside_known_lines():
+    image = np.full((100, 200), 255, dtype=np.uint8)
+    image[20:30, 10:150] = 0
+    assert fit_line_boxes(image, [OCRBox(10, 20, 100, 10)]) is not None
+    image[70:90, 10:150] = 0
+    assert fit_line_boxes(image, [OCRBox(10, 20, 100, 10)]) is None
+
+
+def test_accept_line_result_needs_every_line():
+    assert accept_line_result(_result(OCRBox(0, 0, 10, 10)), 1)
+    assert not accept_line_result(_result(OCRBox(0, 0, 10, 10)), 2)
+    assert not accept_line_result(None, 1)
+
+
+def test_known_lines_are_only_reused_on_a_later_frame():
+    boxes = KnownLineBoxes()
+    first, second = np.zeros((2, 2)), np.zeros((2, 2))
+    boxes.bind_frame(first)
+    boxes.remember("key", _result(OCRBox(0, 0, 10, 10)))
+    assert boxes.lookup("key") is None
+    boxes.bind_frame(second)
+    assert boxes.lookup("key") == ("lines", (OCRBox(0, 0, 10, 10),))
+
+
+def test_known_lines_forget_empty_results_and_evict_oldest():
+    boxes = KnownLineBoxes(limit=2)
+    boxes.remember("a", _result(OCRBox(0, 0, 10, 10)))
+    boxes.remember("b", _result(OCRBox(0, 0, 10, 10)))
+    boxes.remember("c", _result(OCRBox(0, 0, 10, 10)))
+    boxes.remember("b", None)
+    boxes.bind_frame(np.zeros((1, 1)))
+    assert boxes.lookup("a") is None
+    assert boxes.lookup("b") is None
+    assert boxes.lookup("c") is not None
+
+
+class _LineBackend(OCRBackend):
+    name = "lines"
+    supports_line_recognition = True
+
+    def __init__(self):
+        self.calls = 0
+        self.line_calls = 0
+
+    def available(self):
+        return True
+
+    def recognize(self, image):
+        self.calls += 1
+        gray = image[:, :, 0]
+        rows = np.flatnonzero((gray < 128).any(axis=1))
+        if rows.size == 0:
+            return OCRResult(self.name, ())
+        box = OCRBox(0, int(rows[0]), gray.shape[1], int(rows[-1] - rows[0] + 1))
+        return OCRResult(self.name, (OCRLine("line", box, 0.9, (OCRWord("line", box, 0.9),)),))
+
+    def recognize_lines(self, image, boxes):
+        self.line_calls += 1
+        return OCRResult(self.name, tuple(OCRLine("line", box, 0.9) for box in boxes))
+
+
+def _frame(text):
+    img = np.full((200, 400, 3), 40, dtype=np.uint8)
+    cv2.putText(img, text, (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (230, 230, 230), 3)
+    return img
+
+
+def test_threshold_sweep_never_mixes_line_only_results():
+    CloudHime = pytest.importorskip("CloudHime")
+    backend = _LineBackend()
+    worker = CloudHime.OCRWorker()
+    worker.ocr_backends = [backend]
+    worker.ocr_backend_chain = [backend.name]
+    worker.set_ocr_worker_count(1)
+    worker.set_binary_memo_tolerance(0)
+    worker.set_two_phase_threshold_enabled(False)
+    worker.result_cache.set_disk_dir(None)
+    worker.run_ocr_with_best_threshold(_frame("Dialogue line"), 0, 0, None, [90, 110, 130], [0])
+    assert backend.line_calls == 0
+    # 下一張截圖才沿用已知的行位置，而且只辨識行的結果不寫進結果快取
+    entries = worker.result_cache.stats()["entries"]
+    worker.run_ocr_with_best_threshold(_frame("Dialogue lane"), 0, 0, None, [90, 110, 130], [0])
+    assert backend.line_calls > 0
+    assert worker.result_cache.stats()["entries"] == entries
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+import pytest
+
+from ocr_backends import OCRBackend, OCRBox, OCRLine, OCRResult, OCRWord
+
+CloudHime = pytest.importorskip("CloudHime")
+
+
+class _RowBackend(OCRBackend):
+    name = "rows"
+
+    def available(self):
+        return True
+
+    def recognize(self, image):
+        ink = image[:, :, 0] > 127
+        rows = ink.any(axis=1)
+        lines = []
+        y = 0
+        while y < len(rows):
+            if not rows[y]:
+                y += 1
+                continue
+            start = y
+            while y < len(rows) and rows[y]:
+                y += 1
+            columns = np.flatnonzero(ink[start:y].any(axis=0))
+            box = OCRBox(int(columns[0]), start, int(columns[-1] - columns[0] + 1), y - start)
+            density = float(ink[start:y, columns[0]:columns[-1] + 1].mean())
+            text = "字" * max(1, int(box.w / max(1, box.h) * min(1.0, density * 3)))
+            lines.append(OCRLine(text, box, 0.9, (OCRWord(text, box, 0.9),)))
+        return OCRResult(self.name, tuple(lines))
+
+
+def _frame(seed):
+    rng = np.random.default_rng(seed)
+    img = np.full((360, 640, 3), 230, dtype=np.uint8)
+    for index, level in enumerate((40, 90, 130, 170, 200)):
+        text = "".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz "), size=18))
+        cv2.putText(img, text, (20, 50 + index * 65), cv2.FONT_HERSHEY_SIMPLEX, 1.1, (level,) * 3, 2)
+    return img
+
+
+def _winners(worker_count):
+    worker = CloudHime.OCRWorker()
+    worker.ocr_backends = [_RowBackend()]
+    worker.ocr_backend_chain = ["rows"]
+    worker.set_ocr_worker_count(worker_count)
+    worker.set_two_phase_threshold_enabled(False)
+    worker.result_cache.set_disk_dir(None)
+    regions = [(0, 0, 640, 180), (0, 180, 640, 180)]
+    thresholds = list(range(60, 221, 10))
+    winners = []
+    try:
+        for seed in range(4):
+            threshold, items = worker.run_ocr_with_best_threshold(_frame(seed), 0, 0, regions, thresholds, [0])
+            winners.append((threshold, sorted((item["text"], item["x"], item["y"]) for item in items)))
+    finally:
+        worker.shutdown_ocr_pool()
+    return winners
+
+
+def test_parallel_sweep_picks_the_same_threshold_as_sequential():
+    sequential = _winners(1)
+    assert len({threshold for threshold, _ in sequential}) >= 1
+    for _ in range(3):
+        assert _winners(4) == sequential
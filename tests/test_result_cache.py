@@ -0,0 +1,67 @@
+import os
+
+from ocr_backends import OCRBox, OCRLine, OCRResult, OCRWord
+from ocr_result_cache import OCRResultCache, estimate_result_bytes, result_cache_key
+
+
+def _result(text="hello"):
+    box = OCRBox(1, 2, 30, 10)
+    return OCRResult("fake", (OCRLine(text, box, 0.9, (OCRWord(text, box, 0.9),)),))
+
+
+def test_key_depends_on_digest_chain_and_config():
+    base = result_cache_key(b"digest", ["windows", "tesseract"], "{}")
+    assert base == result_cache_key(b"digest", ["windows", "tesseract"], "{}")
+    assert base != result_cache_key(b"other", ["windows", "tesseract"], "{}")
+    assert base != result_cache_key(b"digest", ["tesseract", "windows"], "{}")
+    assert base != result_cache_key(b"digest", ["windows", "tesseract"], '{"lang": "jpn"}')
+
+
+def test_memory_tier_evicts_least_recently_used():
+    size = estimate_result_bytes(_result())
+    cache = OCRResultCache(max_bytes=size * 2)
+    cache.remember("a", _result("a"))
+    cache.remember("b", _result("b"))
+    assert cache.lookup("a")[0]
+    cache.remember("c", _result("c"))
+    assert cache.lookup("a")[0]
+    assert not cache.lookup("b")[0]
+    assert cache.lookup("c")[0]
+
+
+def test_empty_and_failed_results_are_not_cached():
+    cache = OCRResultCache()
+    cache.remember("none", None)
+    cache.remember("blank", OCRResult("fake", ()))
+    cache.remember("error", OCRResult("fake", (), error="boom"))
+    assert cache.stats()["entries"] == 0
+    assert cache.lookup("blank") == (False, None)
+
+
+def test_disk_tier_round_trip(tmp_path):
+    cache = OCRResultCache(disk_dir=str(tmp_path))
+    cache.remember("key", _result())
+    fresh = OCRResultCache(disk_dir=str(tmp_path))
+    hit, result = fresh.lookup("key")
+    assert hit and result == _result()
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_null_disk_entry_is_a_miss_and_removed(tmp_path):
+    (tmp_path / "stale.json").write_text("null", encoding="utf-8")
+    cache = OCRResultCache(disk_dir=str(tmp_path))
+    assert cache.lookup("stale") == (False, None)
+    assert not os.path.exists(tmp_path / "stale.json")
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_disk_tier_evicts_oldest_and_clear_removes_files(tmp_path):
+    cache = OCRResultCache(disk_dir=str(tmp_path))
+    cache.remember("a", _result("a"))
+    one_entry = cache.stats()["disk_bytes"]
+    cache = OCRResultCache(disk_dir=str(tmp_path), disk_max_bytes=one_entry)
+    cache.remember("b", _result("b"))
+    assert sorted(os.listdir(tmp_path)) == ["b.json"]
+    cache.clear(include_disk=True)
+    assert os.listdir(tmp_path) == []
+    assert cache.lookup("b") == (False, None)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+
+import CloudHime  # noqa: E402
+
+
+def _frame(value):
+    img = np.full((120, 320, 3), value, dtype=np.uint8)
+    img[40:80, 20 + value // 4:200 + value // 4] = 255 - value
+    return img
+
+
+def _worker(monkeypatch, frames, texts):
+    worker = CloudHime.OCRWorker()
+    worker.ocr_backends = [object()]
+    worker.set_scan_mode(CloudHime.SCAN_MODE_REGION)
+    worker.set_scan_region((0, 0, 320, 120))
+    queue = list(zip(frames, texts))
+    current = {}
+
+    def capture():
+        current["img"], current["text"] = queue.pop(0)
+        return current["img"], 0, 0
+
+    def run_ocr(*args, **kwargs):
+        return 100, [{"text": current["text"], "x": 10, "y": 10, "w": 100, "h": 20}]
+
+    def remember_preferred_text(text, translated, provider):
+        if text == "beta":
+            raise RuntimeError("translation store failed")
+
+    monkeypatch.setattr(worker, "capture_scan_area", capture)
+    monkeypatch.setattr(worker, "run_ocr_with_best_threshold", run_ocr)
+    monkeypatch.setattr(worker, "build_ai_image_parts", lambda img: [])
+    monkeypatch.setattr(worker, "translate_items_with_ai_and_providers", lambda texts, parts: (["T:" + t for t in texts], ["google"] * len(texts)))
+    monkeypatch.setattr(worker, "get_best_known_translation", lambda text: (None, None))
+    monkeypatch.setattr(worker, "remember_translation", lambda key, text: None)
+    monkeypatch.setattr(worker, "remember_hud_observation", lambda *args: None)
+    monkeypatch.setattr(worker, "remember_preferred_text", remember_preferred_text)
+    emitted = []
+    worker.finished.connect(emitted.append)
+    return worker, emitted
+
+
+def test_failed_translation_is_not_replayed_for_an_earlier_frame(monkeypatch):
+    frame_a, frame_b = _frame(30), _frame(200)
+    worker, emitted = _worker(monkeypatch, [frame_a, frame_b, frame_a], ["alpha", "beta", "alpha"])
+    for _ in range(3):
+        worker.run_scan_once()
+    assert [results[0][0] for results in emitted] == ["T:alpha", "beta", "T:alpha"]
+
+
+def test_unchanged_frame_replays_its_own_results(monkeypatch):
+    frame_a = _frame(30)
+    worker, emitted = _worker(monkeypatch, [frame_a, frame_a], ["alpha", "alpha"])
+    worker.run_scan_once()
+    worker.run_scan_once()
+    assert emitted[0] == emitted[1]
+    assert worker.frame_change_detector.skipped_scans == 1
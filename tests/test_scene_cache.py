@@ -0,0 +1,43 @@
+import numpy as np
+
+from ocr_scene_cache import SceneThresholdCache, compute_scene_signature
+
+
+def _scene(background, text=230):
+    img = np.full((200, 300, 3), background, dtype=np.uint8)
+    img[80:120, 20:280] = text
+    return img
+
+
+def test_signature_distance_tracks_brightness_distribution():
+    dark = compute_scene_signature(_scene(20))
+    assert dark.distance(compute_scene_signature(_scene(20))) == 0.0
+    assert dark.distance(compute_scene_signature(_scene(200, 10))) > 0.5
+
+
+def test_signature_uses_only_the_given_regions():
+    img = _scene(20)
+    img[:, 150:] = 250
+    left = compute_scene_signature(img, [(0, 0, 150, 200)])
+    assert left.distance(compute_scene_signature(_scene(20)[:, :150])) < 0.05
+
+
+def test_cache_returns_threshold_for_similar_scene_and_misses_on_drift():
+    cache = SceneThresholdCache()
+    cache.remember(compute_scene_signature(_scene(20)), 140)
+    assert cache.lookup(compute_scene_signature(_scene(22))) == 140
+    assert cache.lookup(compute_scene_signature(_scene(200, 10))) is None
+    cache.remember(compute_scene_signature(_scene(21)), 150)
+    assert cache.stats()["scenes"] == 1
+    assert cache.lookup(compute_scene_signature(_scene(20))) == 150
+
+
+def test_cache_evicts_least_recently_used_scene():
+    cache = SceneThresholdCache(limit=2)
+    scenes = [compute_scene_signature(_scene(value, 255 - value)) for value in (10, 120, 240)]
+    cache.remember(scenes[0], 100)
+    cache.remember(scenes[1], 120)
+    assert cache.lookup(scenes[0]) == 100
+    cache.remember(scenes[2], 140)
+    assert cache.lookup(scenes[1]) is None
+    assert cache.lookup(scenes[0]) == 100
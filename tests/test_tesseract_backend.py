@@ -0,0 +1,23 @@
+import ocr_backends
+
+
+class _FakeTesserocr:
+    def __init__(self):
+        self.engines = []
+
+    def PyTessBaseAPI(self, lang):
+        self.engines.append(lang)
+        raise RuntimeError("no language data")
+
+
+def test_available_does_not_build_an_engine(monkeypatch):
+    backend = ocr_backends.TesseractBackend()
+    fake = _FakeTesserocr()
+    backend._tesserocr = fake
+    backend._available = True
+    monkeypatch.setattr(ocr_backends, "probe_tesseract_runtime", lambda refresh=False: True)
+    assert backend.available()
+    assert fake.engines == []
+    monkeypatch.setattr(ocr_backends, "probe_tesseract_runtime", lambda refresh=False: False)
+    assert not backend.available()
+    assert fake.engines == []
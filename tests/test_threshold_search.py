@@ -0,0 +1,46 @@
+import pytest
+
+from ocr_threshold_search import (
+    GoldenSectionThresholdSearch,
+    GridThresholdSearch,
+    best_threshold_of,
+    create_threshold_search,
+    normalize_threshold_search_name,
+)
+
+LOW, HIGH = 50, 250
+GRID_CANDIDATES = (50, 70, 90, 110, 130, 150, 170, 190, 220, 250)
+GRID_OFFSETS = (-10, 0, 10)
+
+
+def _run(search, peak, base=127):
+    evaluated = {}
+
+    def evaluate(thresholds):
+        for value in thresholds:
+            evaluated[value] = 1000 - abs(value - peak) * 3
+        return {value: evaluated[value] for value in thresholds}
+
+    search.search(evaluate, base)
+    return best_threshold_of(evaluated), len(evaluated)
+
+
+def test_best_threshold_prefers_lowest_on_ties():
+    assert best_threshold_of({90: 5, 70: 5, 110: 3}) == 70
+    assert best_threshold_of({}) is None
+
+
+@pytest.mark.parametrize("peak", [60, 95, 128, 163, 200, 240])
+def test_golden_search_lands_near_the_grid_winner_with_fewer_evaluations(peak):
+    grid_best, grid_calls = _run(GridThresholdSearch(LOW, HIGH, GRID_CANDIDATES, GRID_OFFSETS), peak)
+    golden_best, golden_calls = _run(GoldenSectionThresholdSearch(LOW, HIGH), peak)
+    assert abs(grid_best - peak) <= 10
+    assert abs(golden_best - peak) <= abs(grid_best - peak) + 10
+    assert golden_calls < grid_calls
+
+
+def test_strategy_names_fall_back_to_golden():
+    assert normalize_threshold_search_name("GRID") == "grid"
+    assert normalize_threshold_search_name("bogus") == "golden"
+    assert isinstance(create_threshold_search("grid", LOW, HIGH, GRID_CANDIDATES, GRID_OFFSETS), GridThresholdSearch)
+    assert isinstance(create_threshold_search("", LOW, HIGH, GRID_CANDIDATES, GRID_OFFSETS), GoldenSectionThresholdSearch)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from ocr_tile_cache import DirtyTileCache
+
+
+def _crop():
+    crop = np.full((480, 960, 3), 40, dtype=np.uint8)
+    crop[20:60, 20:140] = 220
+    crop[360:400, 700:900] = 220
+    return crop
+
+
+ITEMS = [
+    {"text": "top", "x": 20, "y": 20, "w": 120, "h": 40},
+    {"text": "bottom", "x": 700, "y": 360, "w": 200, "h": 40},
+]
+
+
+def test_first_plan_is_full_and_unchanged_crop_reuses_items():
+    cache = DirtyTileCache()
+    plan = cache.plan("key", _crop(), 0, 0)
+    assert plan.full
+    cache.commit("key", plan, ITEMS)
+    plan = cache.plan("key", _crop(), 0, 0)
+    assert not plan.full and plan.dirty_rects == ()
+    assert [item["text"] for item in plan.kept_items] == ["top", "bottom"]
+
+
+def test_partial_change_reocrs_only_the_dirty_area():
+    cache = DirtyTileCache()
+    cache.commit("key", cache.plan("key", _crop(), 0, 0), ITEMS)
+    changed = _crop()
+    changed[360:400, 700:900] = 90
+    plan = cache.plan("key", changed, 0, 0)
+    assert not plan.full
+    assert [item["text"] for item in plan.kept_items] == ["top"]
+    assert any(x <= 700 and y <= 360 and x + w >= 900 and y + h >= 400 for x, y, w, h in plan.dirty_rects)
+    assert all(x >= 160 or y >= 160 for x, y, _, _ in plan.dirty_rects)
+
+
+def test_large_change_falls_back_to_full_and_invalidate_forgets():
+    cache = DirtyTileCache()
+    cache.commit("key", cache.plan("key", _crop(), 0, 0), ITEMS)
+    assert cache.plan("key", 255 - _crop(), 0, 0).full
+    cache.invalidate("key")
+    assert cache.plan("key", _crop(), 0, 0).full
+
+
+def test_cache_keeps_at_most_limit_entries():
+    cache = DirtyTileCache(limit=1)
+    cache.commit("a", cache.plan("a", _crop(), 0, 0), ITEMS)
+    cache.commit("b", cache.plan("b", _crop(), 0, 0), ITEMS)
+    assert cache.plan("a", _crop(), 0, 0).full
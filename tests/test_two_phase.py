@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+import pytest
+
+from ocr_backends import OCRBackend, OCRBox, OCRLine, OCRResult, OCRWord
+
+CloudHime = pytest.importorskip("CloudHime")
+
+
+class _LowResOnlyBackend(OCRBackend):
+    name = "lowres"
+
+    def __init__(self, max_width):
+        self.max_width = max_width
+        self.widths = []
+
+    def available(self):
+        return True
+
+    def recognize(self, image):
+        self.widths.append(image.shape[1])
+        if image.shape[1] > self.max_width:
+            return OCRResult(self.name, ())
+        rows = np.flatnonzero((image[:, :, 0] > 127).any(axis=1))
+        if rows.size == 0:
+            return OCRResult(self.name, ())
+        box = OCRBox(0, int(rows[0]), image.shape[1], int(rows[-1] - rows[0] + 1))
+        return OCRResult(self.name, (OCRLine("字字字字", box, 0.9, (OCRWord("字字字字", box, 0.9),)),))
+
+
+def _worker(backend):
+    worker = CloudHime.OCRWorker()
+    worker.ocr_backends = [backend]
+    worker.ocr_backend_chain = [backend.name]
+    worker.set_ocr_worker_count(1)
+    worker.result_cache.set_disk_dir(None)
+    worker.set_two_phase_threshold_enabled(True)
+    return worker
+
+
+def _frame():
+    img = np.full((120, 400, 3), 230, dtype=np.uint8)
+    cv2.putText(img, "Dialogue line", (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (30, 30, 30), 2)
+    return img
+
+
+def test_empty_full_scale_pass_keeps_the_low_resolution_items():
+    selection_width = int(400 * CloudHime.OCR_SELECTION_SCALE_FACTOR)
+    backend = _LowResOnlyBackend(max_width=selection_width)
+    worker = _worker(backend)
+    threshold, items = worker.run_ocr_with_best_threshold(_frame(), 0, 0, None, [90, 130], [0])
+    assert max(backend.widths) > selection_width
+    assert [item["text"] for item in items] == ["字字字字"]
+    assert threshold in (90, 130)